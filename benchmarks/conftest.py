@@ -0,0 +1,130 @@
+import contextlib
+import multiprocessing
+from collections.abc import Iterator
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+import psycopg
+import pytest
+from httpx_folio.auth import FolioParams
+from psycopg import sql
+
+from tests.synthetic_folio import SyntheticFolio, SyntheticRecords, connect
+
+from .datasets import dataset, dataset_path
+
+if TYPE_CHECKING:
+    from ldlite import LDLite
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--pg-host", action="store")
+    parser.addoption(
+        "--records",
+        action="store",
+        default="10000",
+        help="Comma separated numbers of records to benchmark.",
+    )
+    parser.addoption(
+        "--depths",
+        action="store",
+        default="1,2,3,4",
+        help="Comma separated json depths to benchmark.",
+    )
+    parser.addoption(
+        "--rounds",
+        action="store",
+        default="3",
+        help="The number of times each benchmark is run.",
+    )
+    parser.addoption(
+        "--latency",
+        action="store",
+        default="0",
+        help="Seconds the synthetic FOLIO waits before responding.",
+    )
+
+
+def _ints(config: pytest.Config, option: str) -> list[int]:
+    return [int(v) for v in str(config.getoption(option)).split(",")]
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "records" in metafunc.fixturenames:
+        metafunc.parametrize("records", _ints(metafunc.config, "records"))
+    if "depth" in metafunc.fixturenames:
+        metafunc.parametrize("depth", _ints(metafunc.config, "depths"))
+    if "backend" in metafunc.fixturenames:
+        metafunc.parametrize("backend", ["duckdb", "postgres"])
+
+
+@pytest.fixture(scope="session")
+def rounds(pytestconfig: pytest.Config) -> int:
+    return _ints(pytestconfig, "rounds")[0]
+
+
+def _serve(
+    datasets: dict[str, SyntheticRecords], latency: float, c: Connection
+) -> None:
+    with SyntheticFolio(datasets, latency) as folio:
+        c.send(folio.url)
+        # serve until the benchmarks close their end of the pipe
+        with contextlib.suppress(EOFError):
+            c.recv()
+
+
+@pytest.fixture(scope="session")
+def folio(pytestconfig: pytest.Config) -> Iterator[FolioParams]:
+    # The server runs in its own process so that generating records
+    # isn't competing with the client being benchmarked for the GIL.
+    datasets = {
+        dataset_path(r, d): dataset(r, d)
+        for r in _ints(pytestconfig, "records")
+        for d in _ints(pytestconfig, "depths")
+    }
+    ctx = multiprocessing.get_context("spawn")
+    (parent, child) = ctx.Pipe()
+    server = ctx.Process(
+        target=_serve,
+        args=(datasets, float(pytestconfig.getoption("latency")), child),
+        daemon=True,
+    )
+    server.start()
+    try:
+        yield FolioParams(parent.recv(), "tenant", "user", "password")
+    finally:
+        parent.close()
+        server.join(timeout=5)
+        server.kill()
+
+
+@pytest.fixture
+def ld(
+    pytestconfig: pytest.Config,
+    tmp_path: Path,
+    folio: FolioParams,
+    backend: str,
+) -> Iterator["LDLite"]:
+    from ldlite import LDLite
+
+    ld = LDLite()
+    ld.quiet(enable=True)
+    connect(ld, folio)
+    if backend == "duckdb":
+        ld.connect_db(str(tmp_path / "ldlite.duckdb"))
+        yield ld
+        return
+
+    host = pytestconfig.getoption("pg_host")
+    if host is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    base_dsn = f"host={host} user=ldlite password=ldlite"
+    db = "bench" + str(uuid4()).split("-")[0]
+    with contextlib.closing(psycopg.connect(base_dsn, autocommit=True)) as conn:
+        conn.execute(sql.SQL("CREATE DATABASE {db};").format(db=sql.Identifier(db)))
+
+    ld.connect_db_postgresql(base_dsn + f" dbname={db}")
+    yield ld
@@ -0,0 +1,10 @@
+from tests.synthetic_folio import SyntheticRecords
+
+
+def dataset_path(records: int, depth: int) -> str:
+    return f"/synthetic/instances/{records}/{depth}"
+
+
+def dataset(records: int, depth: int) -> SyntheticRecords:
+    # The nested arrays go as deep as the transform
+    return SyntheticRecords("instances", records, seed=depth, nesting=depth)
@@ -0,0 +1,98 @@
+import json
+import re
+from collections import Counter
+from contextlib import closing
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING, cast
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from _typeshed import dbapi
+
+# The legacy transform keeps timestamps and json as text
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+
+def _normalize(v: object) -> object:
+    if isinstance(v, UUID):
+        return str(v)
+    if isinstance(v, float):
+        return Decimal(str(v))
+    if isinstance(v, datetime):
+        return v if v.tzinfo is not None else v.replace(tzinfo=timezone.utc)
+    if isinstance(v, (dict, list)):
+        return json.dumps(v, sort_keys=True)
+    if isinstance(v, str):
+        return _normalize_str(v)
+    return v
+
+
+def _normalize_str(v: str) -> object:
+    s = v.strip()
+    if _TIMESTAMP.match(s):
+        try:
+            return _normalize(datetime.fromisoformat(s.replace("Z", "+00:00")))
+        except ValueError:
+            return v
+    if s[:1] in ("{", "["):
+        try:
+            return _normalize(json.loads(s))
+        except ValueError:
+            return v
+    return v.lower() if len(v) == 36 and v.count("-") == 4 else v
+
+
+def _columns(conn: "dbapi.DBAPIConnection", table: str) -> list[str]:
+    with closing(conn.cursor()) as cur:
+        cur.execute(f'SELECT * FROM "{table}" LIMIT 0')
+        return [d[0] for d in cur.description or []]
+
+
+def _rows(
+    conn: "dbapi.DBAPIConnection",
+    table: str,
+    columns: list[str],
+) -> Counter[tuple[object, ...]]:
+    with closing(conn.cursor()) as cur:
+        cur.execute(
+            "SELECT " + ",".join(f'"{c}"' for c in columns) + f' FROM "{table}"',
+        )
+        return Counter(
+            tuple(_normalize(v) for v in row)
+            for row in cast("list[tuple[object, ...]]", cur.fetchall())
+        )
+
+
+def differences(
+    conn: "dbapi.DBAPIConnection",
+    expected: dict[str, str],
+) -> list[str]:
+    """Describes how each pair of tables differ, ignoring types and row order.
+
+    Columns only in the first table of a pair are ignored, the SQL transform
+    keeps arrays past the json_depth as json where the legacy transform drops them.
+
+    Args:
+        conn: A connection to the database holding both sets of tables.
+        expected: The tables to compare keyed by the tables to compare them to.
+    """
+    found = []
+    for left, right in sorted(expected.items()):
+        # The __id columns are surrogate keys assigned in different orders
+        (lcols, rcols) = (
+            {c for c in _columns(conn, t) if c != "__id"} for t in (left, right)
+        )
+        if missing := rcols - lcols:
+            found.append(f"{left} is missing columns {sorted(missing)} of {right}")
+            continue
+
+        columns = sorted(rcols)
+        (lrows, rrows) = (_rows(conn, t, columns) for t in (left, right))
+        if lrows != rrows:
+            found.append(
+                f"{left} has {(lrows - rrows).total()} rows not in {right}, "
+                f"{right} has {(rrows - lrows).total()} rows not in {left}",
+            )
+
+    return found
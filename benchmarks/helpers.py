@@ -0,0 +1,30 @@
+from typing import TYPE_CHECKING, cast
+
+from ldlite._sqlx import DBType
+
+if TYPE_CHECKING:
+    import psycopg
+    from _typeshed import dbapi
+
+    from ldlite import LDLite
+    from ldlite.database import Database
+
+
+def database(ld: "LDLite") -> "Database":
+    if ld._database is None:  # noqa: SLF001
+        msg = "No active database connection."
+        raise RuntimeError(msg)
+    return ld._database  # noqa: SLF001
+
+
+def connection(ld: "LDLite") -> "dbapi.DBAPIConnection":
+    if ld.db is None:
+        msg = "No active database connection."
+        raise RuntimeError(msg)
+    return ld.db
+
+
+def release(ld: "LDLite") -> None:
+    if ld.dbtype == DBType.POSTGRES:
+        # The open transaction would hold locks blocking the next transform
+        cast("psycopg.Connection", ld.db).rollback()
@@ -0,0 +1,49 @@
+import json
+from collections.abc import Callable, Iterator
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from .datasets import dataset
+
+
+def _keys(value: object) -> Iterator[str]:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield k
+            yield from _keys(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _keys(v)
+
+
+@pytest.mark.parametrize("function", ["decode_camel_case", "snake_case"])
+@pytest.mark.parametrize("cached", [True, False])
+def test_camelcase(  # noqa: PLR0913
+    benchmark: BenchmarkFixture,
+    records: int,
+    depth: int,
+    rounds: int,
+    function: str,
+    cached: bool,
+) -> None:
+    from ldlite import _camelcase
+
+    # Every key of every record is decoded, the same way the transforms see them
+    keys = [
+        k
+        for r in dataset(min(records, 10_000), depth).records()
+        for k in _keys(json.loads(r))
+    ]
+    decode = getattr(_camelcase, function)
+    convert: Callable[[str], str] = decode if cached else decode.__wrapped__
+
+    def run() -> None:
+        for k in keys:
+            convert(k)
+
+    decode.cache_clear()
+    benchmark.group = f"camelcase-{function}-{records}-{depth}"
+    benchmark.pedantic(run, rounds=rounds)
+    benchmark.extra_info["keys"] = len(keys)
+    benchmark.extra_info["distinct_keys"] = len(set(keys))
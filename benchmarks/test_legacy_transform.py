@@ -0,0 +1,96 @@
+import tracemalloc
+from collections.abc import Callable
+from contextlib import closing
+from typing import TYPE_CHECKING
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from .datasets import dataset, dataset_path
+from .equivalence import differences
+from .helpers import connection, database, release
+
+if TYPE_CHECKING:
+    from ldlite import LDLite
+
+# Both transforms read the same raw records copied into two tables
+SQL = "sql"
+LEGACY = "legacy"
+
+
+def _load_raw(ld: "LDLite", records: int, depth: int) -> None:
+    db = database(ld)
+    db.prepare_history(SQL, dataset_path(records, depth), None)
+    db.ingest_records(SQL, dataset(records, depth).records())
+    conn = connection(ld)
+    with closing(conn.cursor()) as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {LEGACY}")
+        cur.execute(f"CREATE TABLE {LEGACY} AS SELECT * FROM {SQL}")
+    conn.commit()
+
+
+def _sql(ld: "LDLite", depth: int) -> list[str]:
+    return database(ld).expand_prefix(SQL, depth, keep_raw=True)
+
+
+def _legacy(ld: "LDLite", records: int, depth: int) -> list[str]:
+    from ldlite._jsonx import transform_json
+    from ldlite._sqlx import autocommit
+
+    conn = connection(ld)
+    # This mirrors LDLite.query(use_legacy_transform=True) without indexing
+    database(ld).drop_extracted_tables(LEGACY)
+    try:
+        autocommit(conn, ld.dbtype, False)
+        (tables, _) = transform_json(conn, ld.dbtype, LEGACY, records, True, depth)
+    finally:
+        autocommit(conn, ld.dbtype, True)
+    return tables
+
+
+def _python_peak(transform: Callable[[], object]) -> int:
+    # tracemalloc only sees allocations made by python, not by the database
+    tracemalloc.start()
+    try:
+        transform()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("transform", [SQL, LEGACY])
+def test_transform(  # noqa: PLR0913
+    benchmark: BenchmarkFixture,
+    ld: "LDLite",
+    backend: str,
+    records: int,
+    depth: int,
+    rounds: int,
+    transform: str,
+) -> None:
+    _load_raw(ld, records, depth)
+
+    def run() -> object:
+        return _sql(ld, depth) if transform == SQL else _legacy(ld, records, depth)
+
+    benchmark.group = f"transform-{backend}-{records}-{depth}"
+    benchmark.pedantic(run, rounds=rounds)
+    benchmark.extra_info["python_peak_bytes"] = _python_peak(run)
+
+
+def test_equivalent(ld: "LDLite", records: int, depth: int) -> None:
+    _load_raw(ld, records, depth)
+    sql_tables = set(_sql(ld, depth))
+    legacy_tables = {
+        t.replace(LEGACY, SQL, 1)
+        for t in _legacy(ld, records, depth)
+        if not t.endswith("__tcatalog")
+    }
+    assert sql_tables == legacy_tables
+
+    found = differences(
+        connection(ld),
+        {t: t.replace(SQL, LEGACY, 1) for t in sql_tables},
+    )
+    release(ld)
+    assert found == []
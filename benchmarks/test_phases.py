@@ -0,0 +1,178 @@
+from contextlib import closing
+from datetime import timedelta
+from itertools import cycle, islice
+from statistics import fmean
+from typing import TYPE_CHECKING, cast
+
+from httpx_folio.auth import FolioParams
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from .datasets import dataset, dataset_path
+from .helpers import connection, database, release
+
+if TYPE_CHECKING:
+    from ldlite import LDLite
+
+PREFIX = "bench"
+
+
+def _fetch(ld: "LDLite", query: str) -> tuple[object, ...]:
+    with closing(connection(ld).cursor()) as cur:
+        cur.execute(query)
+        row = cast("tuple[object, ...]", cur.fetchone())
+    release(ld)
+    return row
+
+
+def _seconds(v: object) -> float:
+    return v.total_seconds() if isinstance(v, timedelta) else 0
+
+
+def _load_raw(ld: "LDLite", records: int, depth: int) -> None:
+    db = database(ld)
+    db.prepare_history(PREFIX, dataset_path(records, depth), None)
+    db.ingest_records(PREFIX, dataset(records, depth).records())
+
+
+def test_download(
+    benchmark: BenchmarkFixture,
+    folio: FolioParams,
+    records: int,
+    depth: int,
+    rounds: int,
+) -> None:
+    from ldlite._folio import FolioClient
+
+    client = FolioClient(folio)
+
+    def download() -> int:
+        (_, downloaded) = client.iterate_records(
+            dataset_path(records, depth),
+            timeout=60,
+            retries=2,
+            page_size=1000,
+        )
+        return sum(1 for _ in downloaded)
+
+    assert benchmark.pedantic(download, rounds=rounds) == records
+
+
+def test_ingest(
+    benchmark: BenchmarkFixture,
+    ld: "LDLite",
+    records: int,
+    depth: int,
+    rounds: int,
+) -> None:
+    db = database(ld)
+    db.prepare_history(PREFIX, dataset_path(records, depth), None)
+    # Serializing every record up front could take more memory than is available
+    raw = list(dataset(min(records, 10_000), depth).records())
+
+    def ingest() -> int:
+        return db.ingest_records(PREFIX, islice(cycle(raw), records))
+
+    assert benchmark.pedantic(ingest, rounds=rounds) == records
+
+
+def test_transform(
+    benchmark: BenchmarkFixture,
+    ld: "LDLite",
+    records: int,
+    depth: int,
+    rounds: int,
+) -> None:
+    _load_raw(ld, records, depth)
+    db = database(ld)
+
+    scan: list[float] = []
+    create: list[float] = []
+
+    def transform() -> None:
+        db.expand_prefix(PREFIX, depth, keep_raw=True)
+        (s, c) = _fetch(
+            ld,
+            'SELECT "scan_time", "create_time" FROM ldlite_system.load_history_v2 '
+            f"WHERE \"table_prefix\" = '{PREFIX}'",
+        )
+        scan.append(_seconds(s))
+        create.append(_seconds(c))
+
+    benchmark.pedantic(transform, rounds=rounds)
+    # The transform scans the json before creating the tables
+    benchmark.extra_info["scan_seconds"] = fmean(scan)
+    benchmark.extra_info["create_seconds"] = fmean(create)
+    benchmark.extra_info["tables"] = _fetch(
+        ld,
+        f"SELECT COUNT(*) FROM {PREFIX}__tcatalog",
+    )[0]
+
+
+def test_index(
+    benchmark: BenchmarkFixture,
+    ld: "LDLite",
+    records: int,
+    depth: int,
+    rounds: int,
+) -> None:
+    from ldlite import IndexPolicy
+
+    _load_raw(ld, records, depth)
+    db = database(ld)
+
+    def setup() -> None:
+        db.expand_prefix(PREFIX, depth, keep_raw=True)
+
+    benchmark.pedantic(
+        db.index_prefix,
+        args=(PREFIX,),
+        kwargs={"policy": IndexPolicy()},
+        setup=setup,
+        rounds=rounds,
+    )
+    benchmark.extra_info["indexes"] = _fetch(
+        ld,
+        'SELECT "indexes_created" FROM ldlite_system.load_history_v2 '
+        f"WHERE \"table_prefix\" = '{PREFIX}'",
+    )[0]
+
+
+def test_load(
+    benchmark: BenchmarkFixture,
+    ld: "LDLite",
+    records: int,
+    depth: int,
+    rounds: int,
+) -> None:
+    from ldlite import IndexPolicy, Listener
+
+    phases: dict[str, list[float]] = {}
+
+    class Phases(Listener):
+        def phase_finished(self, table: str, phase: str, duration: float) -> None:  # noqa: ARG002
+            phases.setdefault(phase, []).append(duration)
+
+    ld.add_listener(Phases())
+
+    def load() -> None:
+        ld.query(
+            table=PREFIX,
+            path=dataset_path(records, depth),
+            json_depth=depth,
+            index_policy=IndexPolicy(),
+        )
+
+    benchmark.pedantic(load, rounds=rounds)
+    for phase, durations in phases.items():
+        benchmark.extra_info[f"{phase}_seconds"] = fmean(durations)
+    benchmark.extra_info["records_per_second"] = float(
+        cast(
+            "float",
+            _fetch(
+                ld,
+                'SELECT "records_per_second" FROM ldlite_system.load_history_v2 '
+                f"WHERE \"table_prefix\" = '{PREFIX}'",
+            )[0],
+        ),
+    )
+    assert _fetch(ld, f"SELECT COUNT(*) FROM {PREFIX}__t")[0] == records
@@ -0,0 +1,27 @@
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from tests.wide_schema import wide_tree
+
+
+@pytest.mark.parametrize("width", [100, 1000])
+def test_wide_schema(
+    benchmark: BenchmarkFixture,
+    depth: int,
+    rounds: int,
+    width: int,
+) -> None:
+    from ldlite.database._expansion.recursive_nodes import ArrayNode
+
+    def run() -> int:
+        # The memoized properties are per tree so each round builds its own
+        root = wide_tree(width, depth)
+        statements = [
+            root.create_statement[1].as_string(),
+            *[a.create_statement[1].as_string() for a in root.descendents(ArrayNode)],
+        ]
+        return len(statements)
+
+    benchmark.group = f"wide-schema-{width}-{depth}"
+    statements = benchmark.pedantic(run, rounds=rounds)
+    benchmark.extra_info["statements"] = statements
@@ -3,8 +3,6 @@ from __future__ import annotations
 
 import sys
 
-import httpx
-
 import ldlite
 
 # Demo sites
@@ -190,20 +188,17 @@ queries: list[tuple[str, ...] | tuple[str, str, object, int]] = [
     ("folio_users.users", "/users"),
 ]
 
-errors: list[tuple[str, BaseException]] = []
-tables: list[str] = []
-for q in queries:
-    try:
-        if len(q) == 3:
-            tables += ld.query(
-                table=q[0],
-                path=q[1],
-                json_depth=int(q[2]),
-            )
-        else:
-            tables += ld.query(table=q[0], path=q[1])
-    except (ValueError, RuntimeError, httpx.HTTPError) as e:
-        errors += [(q[1], e)]
+results = ld.run_manifest(
+    [
+        {"table": q[0], "path": q[1]}
+        if len(q) == 2
+        else {"table": q[0], "path": q[1], "json_depth": int(q[2])}
+        for q in queries
+    ],
+    folio_concurrency=4,
+)
+errors = [(r.entry.path, r.error) for r in results if r.error is not None]
+tables = [t for r in results for t in r.tables]
 print()
 print("Tables:")
 for t in tables:
@@ -34,29 +34,94 @@ Example:
 
 """
 
+from __future__ import annotations
+
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
 from typing import TYPE_CHECKING, NoReturn, cast
 
-import duckdb
-import psycopg
-from httpx_folio.auth import FolioParams
-from psycopg import sql
-from tqdm import tqdm
-
-from ._folio import FolioClient
-from ._jsonx import Attr, transform_json
-from ._sqlx import (
-    DBType,
-    autocommit,
-    sqlid,
-)
-from .database import Database
+# The database drivers, http client, and legacy transform are imported when they
+# are first used so that importing ldlite stays quick for short scheduled jobs.
+from ._listener import Listener as Listener
+from ._listener import _Listeners, _TqdmListener
+from ._manifest import Manifest, largest_first, read_manifest
+from ._manifest import ManifestEntry as ManifestEntry
+from ._manifest import ManifestResult as ManifestResult
+from ._sqlx import DBType
+
+# This is re-exported for users customizing how their tables are indexed
+from .database import IndexPolicy as IndexPolicy  # noqa: TC001
+from .database._telemetry import DownloadStats
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable
 
+    import duckdb
+    import psycopg
     from _typeshed import dbapi
     from httpx_folio.query import QueryType
+    from psycopg import sql
+    from tqdm import tqdm
+
+    from ._folio import FolioClient
+    from .database import Database
+
+
+_COPY_BUFFER_SIZE = 1 << 20
+_CSV_COMPRESSION = frozenset([None, "gzip", "zstd"])
+_PARQUET_COMPRESSION = frozenset(
+    ["uncompressed", "snappy", "gzip", "zstd", "brotli", "lz4", "lz4_raw"],
+)
+
+
+def _duckdb_str(s: str) -> str:
+    return "'" + s.replace("'", "''") + "'"
+
+
+def _copy_csv(
+    db: psycopg.Connection,
+    filename: str,
+    table: str,
+    header: bool,
+    compression: str | None,
+) -> None:
+    import gzip  # noqa: PLC0415
+    from pathlib import Path  # noqa: PLC0415
+
+    from psycopg import sql  # noqa: PLC0415
+
+    copy = sql.SQL(
+        "COPY (SELECT * FROM {table}) TO STDOUT (FORMAT csv, HEADER {header})",
+    ).format(
+        table=sql.Identifier(*table.split(".")),
+        header=sql.SQL(str(header).lower()),
+    )
+    write: Callable[[bytearray], object]
+    with ExitStack() as stack:
+        if compression == "gzip":
+            # The default level of 9 is several times slower for little gain
+            write = stack.enter_context(gzip.open(filename, "wb", 6)).write
+        elif compression == "zstd" and sys.version_info >= (3, 14):
+            from compression import zstd  # noqa: PLC0415
+
+            write = stack.enter_context(zstd.open(filename, "wb")).write
+        else:
+            write = stack.enter_context(Path(filename).open("wb")).write
+
+        # The server sends each row separately, they're written in larger blocks
+        buf = bytearray()
+        try:
+            with db.cursor() as cur, cur.copy(copy) as rows:
+                for data in rows:
+                    buf += data
+                    if len(buf) >= _COPY_BUFFER_SIZE:
+                        write(buf)
+                        buf.clear()
+            write(buf)
+        finally:
+            # The read transaction would block dropping the table in the next load
+            db.rollback()
 
 
 class LDLite:
@@ -76,10 +141,14 @@ class LDLite:
         self.dbtype: DBType = DBType.UNDEFINED
         self.db: dbapi.DBAPIConnection | None = None
         self._database: Database | None = None
+        self._duckdb_extension: str | None = None
+        self._attached: duckdb.DuckDBPyConnection | None = None
         self._folio: FolioClient | None = None
         self.page_size = 1000
         self._okapi_timeout = 60
         self._okapi_max_retries = 2
+        self._listeners: list[Listener] = []
+        self._tqdm = _TqdmListener()
 
     def _set_page_size(self, page_size: int) -> None:
         self.page_size = page_size
@@ -87,6 +156,10 @@ class LDLite:
     def connect_db(
         self,
         filename: str | None = None,
+        stream_arrays: bool = False,
+        native_expansion: bool = False,
+        raw_json: bool = False,
+        profile_statements: bool = False,
     ) -> duckdb.DuckDBPyConnection:
         """Connects to an embedded database for storing data.
 
@@ -95,6 +168,21 @@ class LDLite:
         If *filename* is not specified, the database will be stored in memory
         and will not be persisted to disk.
 
+        If *stream_arrays* is True, JSON arrays are unnested each time they
+        are read instead of being copied into temporary tables.  This uses
+        less memory and temporary disk space but reads the data more often.
+
+        If *native_expansion* is True, JSON is transformed using DuckDB's own
+        JSON functions, which is several times faster.  Columns of the
+        transformed tables are in the order they first appear in the data.
+
+        If *raw_json* is True, downloaded records are stored using DuckDB's
+        JSON type instead of text.  This validates the records as they are
+        downloaded and makes transforming them faster.
+
+        If *profile_statements* is True, the statements run while transforming
+        each table are timed and kept in ldlite_system.statement_profile_v1.
+
         This method returns a connection to the database which can be used to
         submit SQL queries.
 
@@ -102,11 +190,21 @@ class LDLite:
             db = ld.connect_db(filename='ldlite.db')
 
         """
-        return self._connect_db_duckdb(filename)
+        return self._connect_db_duckdb(
+            filename,
+            stream_arrays,
+            native_expansion,
+            raw_json,
+            profile_statements,
+        )
 
     def _connect_db_duckdb(
         self,
         filename: str | None = None,
+        stream_arrays: bool = False,
+        native_expansion: bool = False,
+        raw_json: bool = False,
+        profile_statements: bool = False,
     ) -> duckdb.DuckDBPyConnection:
         """Connects to an embedded DuckDB database for storing data.
 
@@ -122,34 +220,99 @@ class LDLite:
             db = ld.connect_db_duckdb(filename='ldlite.db')
 
         """
+        import duckdb  # noqa: PLC0415
+
         from .database._duckdb import DuckDbDatabase  # noqa: PLC0415
 
+        self._detach()
         self.dbtype = DBType.DUCKDB
         fn = filename if filename is not None else ":memory:"
         db = duckdb.connect(database=fn)
         self.db = cast("dbapi.DBAPIConnection", db.cursor())
-        self._database = DuckDbDatabase(db)
+        self._database = DuckDbDatabase(
+            db,
+            stream_arrays,
+            native_expansion,
+            raw_json,
+            profile_statements,
+        )
 
         return db.cursor()
 
-    def connect_db_postgresql(self, dsn: str) -> psycopg.Connection:
+    def connect_db_postgresql(  # noqa: PLR0913
+        self,
+        dsn: str,
+        concurrency: int = 1,
+        stream_arrays: bool = False,
+        maintenance_work_mem: str | None = None,
+        max_parallel_maintenance_workers: int | None = None,
+        pool_size: int | None = None,
+        profile_statements: bool = False,
+        explain_slowest: int = 0,
+        duckdb_extension: str | None = None,
+    ) -> psycopg.Connection:
         """Connects to a PostgreSQL database for storing data.
 
         The data source name is specified by *dsn*.  This method returns a
         connection to the database which can be used to submit SQL queries.
         The returned connection defaults to autocommit mode.
 
+        If *concurrency* is greater than 1, up to that many connections
+        are used to create the transformed tables and their indexes in
+        parallel.
+
+        If *stream_arrays* is True, JSON arrays are unnested each time they
+        are read instead of being copied into temporary tables.  This uses
+        less temporary disk space but reads the data more often.
+
+        The optional *maintenance_work_mem* and
+        *max_parallel_maintenance_workers* override the server's settings
+        for the connections building indexes, e.g. maintenance_work_mem='1GB'.
+        Keep in mind that each of the *concurrency* connections can use
+        that much memory.
+
+        Connections used while loading data are reused across loads and
+        up to *pool_size* of them are kept open, by default *concurrency*
+        plus one.  Use pool_size=0 to open a new connection each time.
+
+        If *profile_statements* is True, the statements run while transforming
+        each table are timed and kept in ldlite_system.statement_profile_v1.
+        The EXPLAIN (ANALYZE, BUFFERS) plans of the *explain_slowest* slowest
+        statements are kept with them, their queries are run a second time.
+
+        The select and export methods read PostgreSQL through a DuckDB session
+        which is attached the first time they are used and kept for later calls.
+        DuckDB's postgres extension is loaded from the *duckdb_extension* path
+        if given, otherwise from DuckDB's extension directory where it is
+        installed the first time.
+
         Example:
             db = ld.connect_db_postgresql(dsn='dbname=ld host=localhost user=ldlite')
 
         """
+        import psycopg  # noqa: PLC0415
+
         from .database._postgres import PostgresDatabase  # noqa: PLC0415
 
+        if concurrency < 1:
+            raise ValueError("invalid value for concurrency: " + str(concurrency))
+
+        self._detach()
         self.dbtype = DBType.POSTGRES
         self._dsn = dsn
+        self._duckdb_extension = duckdb_extension
         db = psycopg.connect(dsn)
         self.db = cast("dbapi.DBAPIConnection", db)
-        self._database = PostgresDatabase(dsn)
+        self._database = PostgresDatabase(
+            dsn,
+            concurrency,
+            stream_arrays,
+            maintenance_work_mem,
+            max_parallel_maintenance_workers,
+            pool_size,
+            profile_statements,
+            explain_slowest,
+        )
 
         ret_db = psycopg.connect(dsn)
         ret_db.rollback()
@@ -187,6 +350,10 @@ class LDLite:
                              password='admin')
 
         """
+        from httpx_folio.auth import FolioParams  # noqa: PLC0415
+
+        from ._folio import FolioClient  # noqa: PLC0415
+
         if not url.startswith("https://"):
             msg = 'url must begin with "https://"'
             raise ValueError(msg)
@@ -239,7 +406,7 @@ class LDLite:
     def _set_okapi_timeout(self, timeout: int) -> None:
         self._okapi_timeout = timeout
 
-    def query(  # noqa: C901, PLR0912, PLR0913, PLR0915
+    def query(  # noqa: PLR0913
         self,
         table: str,
         path: str,
@@ -249,6 +416,7 @@ class LDLite:
         transform: bool | None = None,
         keep_raw: bool = True,
         use_legacy_transform: bool = False,
+        index_policy: IndexPolicy | None = None,
     ) -> list[str]:
         """Submits a query to a FOLIO module, and transforms and stores the result.
 
@@ -277,6 +445,17 @@ class LDLite:
 
         If *keep_raw* is set to False, then the raw table of
         __id, json will be dropped saving an estimated 20% disk space.
+        The raw table is still written in full and transformed afterwards,
+        but it is kept in transient storage which isn't crash safe: an unlogged
+        table on PostgreSQL and an in-memory catalog on DuckDB which spills to
+        DuckDB's temp directory when it doesn't fit in memory.
+
+        The optional *index_policy* configures which columns of the
+        transformed tables are indexed and how, e.g.
+        index_policy=IndexPolicy(exclude=('*_by_user_id',), brin_id=True).
+        It is not used by the legacy transformation.
+        DuckDB tables are also sorted by id, indexing them can be skipped with
+        index_policy=IndexPolicy(include=(), uuids=False).
 
         *use_legacy_transform* will use the pre 4.0 transformation logic.
         This parameter is deprecated and will not function in a future release.
@@ -292,6 +471,56 @@ class LDLite:
             ld.query(table='g', path='/groups')
 
         """
+        return self._query(
+            table,
+            path,
+            query,
+            json_depth,
+            limit,
+            transform,
+            keep_raw,
+            use_legacy_transform,
+            index_policy,
+        )
+
+    def _query(  # noqa: PLR0913
+        self,
+        table: str,
+        path: str,
+        query: str | dict[str, str] | None = None,
+        json_depth: int = 3,
+        limit: int | None = None,
+        transform: bool | None = None,
+        keep_raw: bool = True,
+        use_legacy_transform: bool = False,
+        index_policy: IndexPolicy | None = None,
+    ) -> list[str]:
+        return self._download(
+            table,
+            path,
+            query,
+            json_depth,
+            limit,
+            transform,
+            keep_raw,
+            use_legacy_transform,
+            index_policy,
+        )()
+
+    def _download(  # noqa: C901, PLR0913, PLR0915
+        self,
+        table: str,
+        path: str,
+        query: str | dict[str, str] | None = None,
+        json_depth: int = 3,
+        limit: int | None = None,
+        transform: bool | None = None,
+        keep_raw: bool = True,
+        use_legacy_transform: bool = False,
+        index_policy: IndexPolicy | None = None,
+    ) -> Callable[[], list[str]]:
+        # The records are transformed and indexed when the returned function is called
+        # so that run_manifest can download and transform on separate threads.
         if transform is not None:
             msg = (
                 "transform is no longer supported: "
@@ -302,12 +531,14 @@ class LDLite:
             raise ValueError("invalid value for json_depth: " + str(json_depth))
         if self._folio is None:
             self._check_folio()
-            return []
+            return list
         if self.db is None or self._database is None:
             self._check_db()
-            return []
+            return list
+        database = self._database
+        db = self.db
 
-        self._database.prepare_history(
+        database.prepare_history(
             table,
             path,
             query if query and isinstance(query, str) else None,
@@ -315,12 +546,21 @@ class LDLite:
         if not self._quiet:
             print("ldlite: querying: " + path, file=sys.stderr)
 
+        listeners = _Listeners(
+            self._listeners if self._quiet else [*self._listeners, self._tqdm],
+        )
+
+        def page_fetched(latency: float, size: int) -> None:
+            listeners.page_fetched(table, size, latency)
+
+        stats = DownloadStats(on_request=page_fetched if listeners else None)
         (total_records, records) = self._folio.iterate_records(
             path,
             self._okapi_timeout,
             self._okapi_max_retries,
             self.page_size,
             query=cast("QueryType", query),
+            stats=stats,
         )
         if limit is not None:
             total_records = min(total_records, limit)
@@ -331,137 +571,242 @@ class LDLite:
                 file=sys.stderr,
             )
 
-        processed = self._database.ingest_records(
-            table,
-            cast(
-                "Iterator[bytes]",
-                tqdm(
-                    records,
-                    desc="downloading",
-                    leave=False,
-                    total=total_records,
-                    mininterval=5,
-                    disable=self._quiet,
-                    unit=table.split(".")[-1],
-                    unit_scale=True,
-                    delay=5,
-                ),
-            ),
-        )
-
-        if not use_legacy_transform:
-            no_iters_format = (
-                "{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+        with listeners.phase(table, "download") as download:
+            download.total = total_records
+            processed = database.ingest_records(
+                table,
+                download.iterate(records) if listeners else records,
+                transient=not (keep_raw or use_legacy_transform),
+                stats=stats,
             )
-            with (
-                tqdm(
-                    desc="scanning",
-                    leave=False,
-                    disable=self._quiet,
-                    bar_format=no_iters_format,
-                ) as scan_progress,
-                tqdm(
-                    desc="transforming",
-                    leave=False,
-                    disable=self._quiet,
-                    bar_format=no_iters_format,
-                ) as transform_progress,
-            ):
-                newtables = self._database.expand_prefix(
-                    table,
-                    json_depth,
-                    keep_raw,
-                    scan_progress,
-                    transform_progress,
-                )
-            if keep_raw:
-                newtables = [table, *newtables]
+        listeners.records_ingested(table, processed)
 
-            with tqdm(
-                desc="indexing",
-                leave=False,
-                disable=self._quiet,
-                bar_format=no_iters_format,
-            ) as progress:
-                self._database.index_prefix(table, progress)
+        def transform_records() -> list[str]:  # noqa: C901, PLR0912
+            if not use_legacy_transform:
+                # Without listeners the database skips reporting progress and timings
+                def on_create_statement(statement: str, duration: float) -> None:
+                    listeners.create_statement_executed(table, statement, duration)
 
-        else:
-            try:
-                self._database.drop_extracted_tables(table)
-                newtables = [table]
-                newattrs = {}
-                if json_depth > 0:
-                    autocommit(self.db, self.dbtype, False)
-                    (jsontables, jsonattrs) = transform_json(
-                        self.db,
-                        self.dbtype,
+                with (
+                    listeners.phase(table, "scan") as scan_progress,
+                    listeners.phase(
+                        table,
+                        "transform",
+                        after=scan_progress,
+                    ) as transform_progress,
+                ):
+                    newtables = database.expand_prefix(
                         table,
-                        processed,
-                        self._quiet,
                         json_depth,
+                        keep_raw,
+                        cast("tqdm[NoReturn]", scan_progress) if listeners else None,
+                        cast("tqdm[NoReturn]", transform_progress)
+                        if listeners
+                        else None,
+                        on_create_statement if listeners else None,
+                        index_policy.skip_unused if index_policy else None,
                     )
-                    newtables += jsontables
-                    newattrs = jsonattrs
-                    for t in newattrs:
-                        newattrs[t]["__id"] = Attr("__id", "bigint")
-                    newattrs[table] = {"__id": Attr("__id", "bigint")}
-
-                if not keep_raw:
-                    self._database.drop_raw_table(table)
-
-                indexable_attrs = [
-                    (t, a)
-                    for t, attrs in newattrs.items()
-                    for n, a in attrs.items()
-                    if n in ["__id", "id"]
-                    or n.endswith(("_id", "__o"))
-                    or a.datatype == "uuid"
-                ]
-
-            finally:
-                autocommit(self.db, self.dbtype, True)
-
-            # Create indexes on id columns (for postgres)
-            if self.dbtype == DBType.POSTGRES:
-
-                class PbarNoop:
-                    def update(self, _: int) -> None: ...
-                    def close(self) -> None: ...
-
-                pbar: tqdm | PbarNoop = PbarNoop()  # type:ignore[type-arg]
-
-                index_total = len(indexable_attrs)
-                if not self._quiet:
-                    pbar = tqdm(
-                        desc="indexing",
-                        total=index_total,
-                        leave=False,
-                        mininterval=3,
-                        smoothing=0,
-                        colour="#A9A9A9",
-                        bar_format="{desc} {bar}{postfix}",
+                if keep_raw:
+                    newtables = [table, *newtables]
+
+                with listeners.phase(table, "index") as progress:
+                    database.index_prefix(
+                        table,
+                        cast("tqdm[NoReturn]", progress) if listeners else None,
+                        index_policy,
+                        on_create_statement if listeners else None,
                     )
-                for t, attr in indexable_attrs:
-                    cur = self.db.cursor()
-                    try:
-                        cur.execute(
-                            "CREATE INDEX ON "
-                            + sqlid(t)
-                            + " ("
-                            + sqlid(attr.name)
-                            + ")",
+
+            else:
+                import psycopg  # noqa: PLC0415
+                from tqdm import tqdm  # noqa: PLC0415
+
+                from ._jsonx import Attr, transform_json  # noqa: PLC0415
+                from ._sqlx import autocommit, sqlid  # noqa: PLC0415
+
+                try:
+                    database.drop_extracted_tables(table)
+                    newtables = [table]
+                    newattrs = {}
+                    if json_depth > 0:
+                        autocommit(db, self.dbtype, False)
+                        (jsontables, jsonattrs) = transform_json(
+                            db,
+                            self.dbtype,
+                            table,
+                            processed,
+                            self._quiet,
+                            json_depth,
                         )
-                    except (RuntimeError, psycopg.Error):
-                        pass
-                    finally:
-                        cur.close()
-                    pbar.update(1)
-                pbar.close()
-
-        # Return table names
-        if not self._quiet:
-            print("ldlite: created tables: " + ", ".join(newtables), file=sys.stderr)
-        return newtables
+                        newtables += jsontables
+                        newattrs = jsonattrs
+                        for t in newattrs:
+                            newattrs[t]["__id"] = Attr("__id", "bigint")
+                        newattrs[table] = {"__id": Attr("__id", "bigint")}
+
+                    if not keep_raw:
+                        database.drop_raw_table(table)
+
+                    indexable_attrs = [
+                        (t, a)
+                        for t, attrs in newattrs.items()
+                        for n, a in attrs.items()
+                        if n in ["__id", "id"]
+                        or n.endswith(("_id", "__o"))
+                        or a.datatype == "uuid"
+                    ]
+
+                finally:
+                    autocommit(db, self.dbtype, True)
+
+                # Create indexes on id columns (for postgres)
+                if self.dbtype == DBType.POSTGRES:
+
+                    class PbarNoop:
+                        def update(self, _: int) -> None: ...
+                        def close(self) -> None: ...
+
+                    pbar: tqdm | PbarNoop = PbarNoop()  # type:ignore[type-arg]
+
+                    index_total = len(indexable_attrs)
+                    if not self._quiet:
+                        pbar = tqdm(
+                            desc="indexing",
+                            total=index_total,
+                            leave=False,
+                            mininterval=3,
+                            smoothing=0,
+                            colour="#A9A9A9",
+                            bar_format="{desc} {bar}{postfix}",
+                        )
+                    for t, attr in indexable_attrs:
+                        cur = db.cursor()
+                        try:
+                            cur.execute(
+                                "CREATE INDEX ON "
+                                + sqlid(t)
+                                + " ("
+                                + sqlid(attr.name)
+                                + ")",
+                            )
+                        except (RuntimeError, psycopg.Error):
+                            pass
+                        finally:
+                            cur.close()
+                        pbar.update(1)
+                    pbar.close()
+
+            # Return table names
+            if not self._quiet:
+                print(
+                    "ldlite: created tables: " + ", ".join(newtables), file=sys.stderr
+                )
+            return newtables
+
+        return transform_records
+
+    def run_manifest(
+        self,
+        manifest: Manifest,
+        folio_concurrency: int = 1,
+        db_concurrency: int = 1,
+    ) -> list[ManifestResult]:
+        """Loads every table of a manifest, running loads in parallel.
+
+        The *manifest* is a list of dictionaries or the path to a toml or
+        yaml file containing one.  Each entry has a *table* and *path*,
+        and optionally a *query*, *json_depth*, and *keep_raw*, which are
+        passed to query().  Toml files list the entries as [[tables]].
+
+        Up to *folio_concurrency* tables are downloaded from FOLIO at once
+        and up to *db_concurrency* tables are transformed and indexed at
+        once, downloaded tables wait for the database without holding up
+        the next download.  Tables with the most records in their previous load are
+        started first so that the longest loads don't hold up the run.
+
+        A failed load doesn't stop the others.  This method returns the
+        result of every entry in the order they were started, failures
+        include the error that stopped them.
+
+        Example:
+            ld.run_manifest([
+                {'table': 'g', 'path': '/groups'},
+                {'table': 'u', 'path': '/users', 'json_depth': 2},
+            ], folio_concurrency=4)
+
+        """
+        if folio_concurrency < 1:
+            msg = "invalid value for folio_concurrency: " + str(folio_concurrency)
+            raise ValueError(msg)
+        if db_concurrency < 1:
+            raise ValueError("invalid value for db_concurrency: " + str(db_concurrency))
+        entries = read_manifest(manifest)
+        if self._folio is None:
+            self._check_folio()
+            return []
+        if self.db is None or self._database is None:
+            self._check_db()
+            return []
+
+        entries = largest_first(self._database, entries)
+
+        # Downloads hand their records to the database workers instead of waiting
+        # for one so the next download starts while earlier tables are transformed.
+        with (
+            ThreadPoolExecutor(max_workers=folio_concurrency) as downloads,
+            ThreadPoolExecutor(max_workers=db_concurrency) as transforms,
+        ):
+
+            def download(entry: ManifestEntry) -> Future[list[str]]:
+                transform = self._download(
+                    entry.table,
+                    entry.path,
+                    entry.query,
+                    entry.json_depth,
+                    keep_raw=entry.keep_raw,
+                )
+                return transforms.submit(transform)
+
+            started = [(e, downloads.submit(download, e)) for e in entries]
+            results: list[ManifestResult] = []
+            for entry, downloaded in started:
+                try:
+                    tables = downloaded.result().result()
+                except Exception as e:  # noqa: BLE001
+                    if not self._quiet:
+                        print(f"ldlite: failed: {entry.table}: {e}", file=sys.stderr)
+                    results.append(ManifestResult(entry, [], e))
+                    continue
+
+                results.append(ManifestResult(entry, tables))
+
+        return results
+
+    def add_listener(self, listener: Listener) -> None:
+        """Sends the events of future loads to *listener*.
+
+        Listeners receive the phases, requests, and statements of each load and
+        can be used to export metrics.  The progress bars shown unless LDLite is
+        quiet are drawn by a listener of their own.
+
+        Example:
+            class Timings(ldlite.Listener):
+                def phase_finished(self, table, phase, duration):
+                    print(table, phase, duration)
+
+            ld.add_listener(Timings())
+
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        """Stops sending events to *listener*.
+
+        Example:
+            ld.remove_listener(timings)
+
+        """
+        self._listeners.remove(listener)
 
     def quiet(self, enable: bool) -> None:
         """Configures suppression of progress messages.
@@ -478,6 +823,58 @@ class LDLite:
             raise ValueError(msg)
         self._quiet = enable
 
+    def _detach(self) -> None:
+        if self._attached is not None:
+            self._attached.close()
+            self._attached = None
+        if self._database is not None:
+            self._database.close()
+            self._database = None
+
+    def _attach(self) -> duckdb.DuckDBPyConnection:
+        # Loading the extension and attaching take longer than most exports
+        if self._attached is not None:
+            # Tables created or replaced since the last call aren't in the cache
+            self._attached.execute("CALL pg_clear_cache()")
+            return self._attached
+
+        import duckdb  # noqa: PLC0415
+
+        duck = duckdb.connect()
+        try:
+            if self._duckdb_extension is not None:
+                duck.execute("LOAD " + _duckdb_str(self._duckdb_extension))
+            else:
+                duck.execute("LOAD postgres")
+            duck.execute(
+                "ATTACH "
+                + _duckdb_str(self._dsn)
+                + " AS pg (TYPE postgres, READ_ONLY)",
+            )
+        except duckdb.Error:
+            duck.close()
+            raise
+
+        self._attached = duck
+        return duck
+
+    def _duck_table(
+        self,
+        db: dbapi.DBAPIConnection,
+        table: str,
+    ) -> tuple[duckdb.DuckDBPyConnection, sql.Identifier]:
+        from psycopg import sql  # noqa: PLC0415
+
+        if self.dbtype == DBType.POSTGRES:
+            if len(prefix := table.split(".")) == 1:
+                return (self._attach(), sql.Identifier("pg", "public", prefix[0]))
+            return (self._attach(), sql.Identifier("pg", *prefix))
+
+        return (
+            cast("duckdb.DuckDBPyConnection", db.cursor()),
+            sql.Identifier(*table.split(".")),
+        )
+
     def select(
         self,
         table: str,
@@ -500,18 +897,9 @@ class LDLite:
             self._check_db()
             return
 
-        if self.dbtype == DBType.POSTGRES:
-            duck = duckdb.connect()
-            duck.sql("INSTALL postgres;")
-            duck.sql("LOAD postgres;")
-            duck.sql(f"ATTACH '{self._dsn}' AS pg (TYPE postgres)")
-            if len(prefix := table.split(".")) == 1:
-                table_id = sql.Identifier("pg", "public", prefix[0])
-            else:
-                table_id = sql.Identifier("pg", *prefix)
-        else:
-            duck = cast("duckdb.DuckDBPyConnection", self.db.cursor())
-            table_id = sql.Identifier(*table.split("."))
+        from psycopg import sql  # noqa: PLC0415
+
+        (duck, table_id) = self._duck_table(self.db, table)
 
         cols = (
             sql.SQL("*")
@@ -524,52 +912,198 @@ class LDLite:
         ) + (
             sql.SQL("LIMIT ") + sql.Literal(limit) if limit is not None else sql.SQL("")
         )
-        print(export.as_string())
         duck.sql(export.as_string()).show()
 
-    def export_csv(self, filename: str, table: str, header: bool = True) -> None:
+    def export_csv(
+        self,
+        filename: str,
+        table: str,
+        header: bool = True,
+        compression: str | None = None,
+        use_copy: bool = False,
+    ) -> None:
         """Export a table in the reporting database to a CSV file.
 
-        All rows of *table* are exported to *filename*, or *filename*.csv if
-        *filename* does not have an extension.
+        All rows of *table* are exported to *filename*.
 
         If *header* is True (the default), the CSV file will begin with a
         header line containing the column names.
 
+        If *compression* is gzip or zstd the file is compressed as it is
+        written.
+
+        If *use_copy* is True and the database is PostgreSQL, the rows are
+        copied straight from the server into the file without DuckDB.  This is
+        quicker for small tables but slower for large ones, and values are
+        written the way PostgreSQL formats them (t and f for booleans).
+        Writing zstd this way requires python 3.14.
+
         Example:
-            ld.to_csv(table='g', filename='g.csv')
+            ld.export_csv(table='g', filename='g.csv')
 
         """
         if self.db is None:
             self._check_db()
             return
 
-        if self.dbtype == DBType.POSTGRES:
-            duck = duckdb.connect()
-            duck.sql("INSTALL postgres;")
-            duck.sql("LOAD postgres;")
-            duck.sql(f"ATTACH '{self._dsn}' AS pg (TYPE postgres)")
-            if len(prefix := table.split(".")) == 1:
-                table_id = sql.Identifier("pg", "public", prefix[0])
-            else:
-                table_id = sql.Identifier("pg", *prefix)
-        else:
-            duck = cast("duckdb.DuckDBPyConnection", self.db.cursor())
-            table_id = sql.Identifier(*table.split("."))
-
-        print(type(filename))
-        export = (
-            sql.SQL("COPY (SELECT * FROM {table}) TO {file} WITH ").format(
-                table=table_id,
-                file=sql.Literal(filename),
+        if compression not in _CSV_COMPRESSION:
+            raise ValueError("invalid value for compression: " + str(compression))
+
+        if use_copy and self.dbtype == DBType.POSTGRES:
+            if compression == "zstd" and sys.version_info < (3, 14):
+                msg = "zstd compression with use_copy requires python 3.14"
+                raise ValueError(msg)
+            _copy_csv(
+                cast("psycopg.Connection", self.db),
+                filename,
+                table,
+                header,
+                compression,
             )
-            + sql.SQL("(HEADER, DELIMITER ',')")
-            if header
-            else sql.SQL("(DELIMETER ',')")
+            return
+
+        from psycopg import sql  # noqa: PLC0415
+
+        (duck, table_id) = self._duck_table(self.db, table)
+
+        options = [sql.SQL("FORMAT csv"), sql.SQL("HEADER " + str(header).lower())]
+        if compression is not None:
+            options.append(sql.SQL("COMPRESSION " + compression))
+
+        export = sql.SQL("COPY (SELECT * FROM {table}) TO {file} ({options})").format(
+            table=table_id,
+            file=sql.SQL(_duckdb_str(filename)),
+            options=sql.SQL(", ").join(options),
+        )
+        duck.execute(export.as_string())
+
+    def export_parquet(
+        self,
+        filename: str,
+        table: str,
+        partition_by: list[str] | None = None,
+        compression: str = "zstd",
+        row_group_size: int | None = None,
+    ) -> None:
+        """Export a table in the reporting database to a Parquet file.
+
+        All rows of *table* are exported to *filename* using DuckDB.
+
+        If *partition_by* is given, *filename* is a directory which is filled
+        with a hive partitioned dataset, one folder for each value of the
+        columns.  The directory must be empty or not exist.
+
+        The *compression* codec is one of zstd (the default), snappy, gzip,
+        brotli, lz4, lz4_raw, or uncompressed.  The optional *row_group_size*
+        is the number of rows in each row group of the file, DuckDB rounds it
+        up to a multiple of 2048.
+
+        Example:
+            ld.export_parquet(table='g__t', filename='g__t.parquet')
+
+        """
+        if self.db is None:
+            self._check_db()
+            return
+
+        if compression not in _PARQUET_COMPRESSION:
+            raise ValueError("invalid value for compression: " + compression)
+        if row_group_size is not None and row_group_size < 1:
+            msg = "invalid value for row_group_size: " + str(row_group_size)
+            raise ValueError(msg)
+
+        from psycopg import sql  # noqa: PLC0415
+
+        (duck, table_id) = self._duck_table(self.db, table)
+
+        options: list[sql.Composable] = [
+            sql.SQL("FORMAT parquet"),
+            sql.SQL("COMPRESSION " + compression),
+        ]
+        if row_group_size is not None:
+            options.append(sql.SQL("ROW_GROUP_SIZE {n}").format(n=row_group_size))
+        if partition_by:
+            options.append(
+                sql.SQL("PARTITION_BY ({cols})").format(
+                    cols=sql.SQL(",").join([sql.Identifier(c) for c in partition_by]),
+                ),
+            )
+
+        export = sql.SQL("COPY (SELECT * FROM {table}) TO {file} ({options})").format(
+            table=table_id,
+            # psycopg would escape the backslashes of windows paths as E''
+            file=sql.SQL(_duckdb_str(filename)),
+            options=sql.SQL(", ").join(options),
         )
-        print(export.as_string())
         duck.execute(export.as_string())
 
+    def export_parquet_tables(
+        self,
+        directory: str,
+        table: str,
+        partition_by: list[str] | None = None,
+        compression: str = "zstd",
+        row_group_size: int | None = None,
+    ) -> list[str]:
+        """Export the tables created by a query to Parquet files.
+
+        Each table listed in the *table*__tcatalog table is exported to
+        *directory*/<table name>.parquet, see export_parquet() for the other
+        parameters.  Tables with all of the *partition_by* columns are
+        partitioned into the directory *directory*/<table name> instead, the
+        other tables are exported without partitioning.  The directory is
+        created if it doesn't exist.  This method returns the names of the
+        exported tables.
+
+        Example:
+            ld.query(table='g', path='/groups')
+            ld.export_parquet_tables(directory='exports', table='g')
+
+        """
+        if self.db is None:
+            self._check_db()
+            return []
+
+        from pathlib import Path  # noqa: PLC0415
+
+        from psycopg import sql  # noqa: PLC0415
+
+        (duck, catalog_id) = self._duck_table(self.db, table + "__tcatalog")
+        tables = [
+            cast("str", t)
+            for (t,) in duck.execute(
+                sql.SQL("SELECT table_name FROM {catalog} ORDER BY 1")
+                .format(catalog=catalog_id)
+                .as_string(),
+            ).fetchall()
+        ]
+
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        for t in tables:
+            (duck, table_id) = self._duck_table(self.db, t)
+            columns = {
+                d[0]
+                for d in duck.execute(
+                    sql.SQL("SELECT * FROM {table} LIMIT 0")
+                    .format(table=table_id)
+                    .as_string(),
+                ).description
+                or []
+            }
+            partitioned = (
+                partition_by if columns.issuperset(partition_by or []) else None
+            )
+            self.export_parquet(
+                # Partitioned tables are exported to a directory of files
+                str(Path(directory) / (t if partitioned else t + ".parquet")),
+                t,
+                partitioned,
+                compression,
+                row_group_size,
+            )
+
+        return tables
+
     def to_csv(self) -> NoReturn:  # pragma: nocover
         """Deprecated; use export_csv()."""
         msg = "to_csv() is no longer supported: use export_csv()"
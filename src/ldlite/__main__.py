@@ -0,0 +1,7 @@
+"""Runs the ldlite command, e.g. python -m ldlite manifest.toml."""
+
+import sys
+
+from ._cli import main
+
+sys.exit(main())
@@ -1,55 +1,10 @@
-def _decode_triple(c1: str, c2: str, c3: str) -> str:  # noqa: C901
-    """Decodes a sliding window of character triples.
+from functools import lru_cache
 
-    Examines a sequence of three characters c1, c2, and c3; decodes c2; and
-    returns the decoded output.
-    """
-    b = ""
-    c1u = c1.isupper()
-    c2u = c2.isupper()
-    c3u = c3.isupper()
-    write = chr(0)
-    write_break = False
-    # First check triples that include zeros
-    if c2 == chr(0):
-        return b
-    if c1 == chr(0) and c2 != chr(0):
-        write = c2.lower()
-    elif c1 != chr(0) and c2 != chr(0) and c3 == chr(0):
-        if not c1u and c2u:
-            write_break = True
-            write = c2.lower()
-        elif c1u and c2u:
-            write = c2.lower()
-        elif (not c1u and not c2u) or (c1u and not c2u):
-            write = c2
-    # Check triples having no zeros
-    elif (
-        (not c1u and not c2u and not c3u)
-        or (c1u and not c2u and not c3u)
-        or (not c1u and not c2u and c3u)
-        or (c1u and not c2u and c3u)
-    ):
-        write = c2
-    elif (
-        (not c1u and c2u and not c3u)
-        or (c1u and c2u and not c3u)
-        or (not c1u and c2u and c3u)
-    ):
-        write_break = True
-        write = c2.lower()
-    elif c1u and c2u and c3u:
-        write = c2.lower()
-    else:
-        # All cases should have been checked by this point
-        raise ValueError('unexpected state: ("' + c1 + '", "' + c2 + '", "' + c3 + '")')
-    # Write decoded characters
-    if write_break:
-        b += "_"
-    b += write
-    return b
+# The same few hundred keys are decoded for every record
+_CACHE_SIZE = 4096
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def decode_camel_case(s: str) -> str:
     """Parses camel case string into lowercase words separated by underscores.
 
@@ -57,20 +12,34 @@ def decode_camel_case(s: str) -> str:
     last uppercase letter of a sequence is considered the start of a new word
     if it is followed by a lowercase letter.
     """
-    b = ""
-    # c1, c2, and c3 are a sliding window of character triples
-    c1 = chr(0)
-    _ = c1
-    c2 = chr(0)
-    c3 = chr(0)
-    for c in s:
-        c1 = c2
-        c2 = c3
-        c3 = c
-        b += _decode_triple(c1, c2, c3)
-    # Last character
-    c1 = c2
-    c2 = c3
-    c3 = chr(0)
-    b += _decode_triple(c1, c2, c3)
+    if s == "":
+        return s
+
+    b = [s[0].lower()]
+    last = len(s) - 1
+    for i in range(1, len(s)):
+        c = s[i]
+        if not c.isupper():
+            b.append(c)
+            continue
+        # An uppercase letter only continues a word between uppercase letters,
+        # the end of the string counts as uppercase
+        if not s[i - 1].isupper() or (i < last and not s[i + 1].isupper()):
+            b.append("_")
+        b.append(c.lower())
+    return "".join(b)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def snake_case(s: str) -> str:
+    """Parses camel case string into lowercase words separated by underscores.
+
+    Unlike decode_camel_case every uppercase letter starts a new word.
+    A leading uppercase letter, after any underscores, doesn't add an underscore.
+    """
+    b = "".join("_" + c.lower() if c.isupper() else c for c in s)
+
+    # there's also sorts of weird edge cases here that don't come up in practice
+    if (naked := s.lstrip("_")) and naked[0].isupper():
+        b = b.removeprefix("_")
     return b
@@ -0,0 +1,209 @@
+"""The ldlite command runs a manifest of loads from cron or another scheduler."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from contextlib import closing
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from ._manifest import ManifestEntry, ManifestResult
+
+
+def _positive(value: str) -> int:
+    if (i := int(value)) < 1:
+        msg = f"must be at least 1: {value}"
+        raise argparse.ArgumentTypeError(msg)
+    return i
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ldlite",
+        description="Loads the tables of a manifest from FOLIO into PostgreSQL.",
+        epilog="The FOLIO password is read from the LDLITE_FOLIO_PASSWORD variable.",
+    )
+    parser.add_argument("manifest", help="toml or yaml file listing the tables")
+    parser.add_argument(
+        "--dsn",
+        default=os.environ.get("LDLITE_DSN"),
+        help="PostgreSQL connection string (default: $LDLITE_DSN)",
+    )
+    parser.add_argument(
+        "--folio-url",
+        default=os.environ.get("LDLITE_FOLIO_URL"),
+        help="(default: $LDLITE_FOLIO_URL)",
+    )
+    parser.add_argument(
+        "--folio-tenant",
+        default=os.environ.get("LDLITE_FOLIO_TENANT"),
+        help="(default: $LDLITE_FOLIO_TENANT)",
+    )
+    parser.add_argument(
+        "--folio-user",
+        default=os.environ.get("LDLITE_FOLIO_USER"),
+        help="(default: $LDLITE_FOLIO_USER)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=_positive,
+        default=1,
+        help="connections used to transform and index each table",
+    )
+    parser.add_argument(
+        "--folio-concurrency",
+        type=_positive,
+        default=1,
+        help="tables downloaded from FOLIO at once",
+    )
+    parser.add_argument(
+        "--db-concurrency",
+        type=_positive,
+        default=1,
+        help="tables transformed and indexed at once",
+    )
+    parser.add_argument(
+        "--incremental",
+        type=float,
+        metavar="HOURS",
+        help="only load tables without a complete load in the last HOURS",
+    )
+    parser.add_argument(
+        "--resume",
+        type=Path,
+        metavar="SUMMARY",
+        help="skip the tables which didn't fail in a previous run's summary",
+    )
+    parser.add_argument(
+        "--summary",
+        metavar="PATH",
+        help="write a json summary of the run to PATH, or - for stdout",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true")
+    verbosity.add_argument("-v", "--verbose", action="store_true")
+
+    return parser
+
+
+def _recently_loaded(dsn: str, tables: list[str], hours: float) -> set[str]:
+    import psycopg  # noqa: PLC0415
+
+    with closing(psycopg.connect(dsn)) as conn, conn.cursor() as cur:
+        try:
+            cur.execute(
+                """
+SELECT "table_prefix" FROM "ldlite_system"."load_history_v1"
+WHERE
+    "table_prefix" = ANY(%s) AND
+    "transform_complete" >= "load_start" AND
+    "transform_complete" >= %s;
+""",
+                (tables, datetime.now(timezone.utc) - timedelta(hours=hours)),
+            )
+        except (psycopg.errors.UndefinedTable, psycopg.errors.InvalidSchemaName):
+            # Nothing has been loaded into this database yet
+            return set()
+        return {t for (t,) in cur.fetchall()}
+
+
+def _result(
+    entry: ManifestEntry,
+    status: str,
+    result: ManifestResult | None = None,
+) -> dict[str, Any]:
+    return {
+        "table": entry.table,
+        "path": entry.path,
+        "status": status,
+        "tables": result.tables if result is not None else [],
+        "error": str(result.error)
+        if result is not None and result.error is not None
+        else None,
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Runs the ldlite command, returning its exit code."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    for value, name in [
+        (args.dsn, "--dsn"),
+        (args.folio_url, "--folio-url"),
+        (args.folio_tenant, "--folio-tenant"),
+        (args.folio_user, "--folio-user"),
+    ]:
+        if value is None:
+            parser.error(f"{name} is required")
+    if (password := os.environ.get("LDLITE_FOLIO_PASSWORD")) is None:
+        parser.error("LDLITE_FOLIO_PASSWORD is required")
+
+    # The library is only imported once the arguments are known to be good
+    import psycopg  # noqa: PLC0415
+
+    from . import LDLite  # noqa: PLC0415
+    from ._manifest import read_manifest  # noqa: PLC0415
+
+    started = datetime.now(timezone.utc)
+    try:
+        entries = read_manifest(args.manifest)
+
+        ld = LDLite()
+        ld.quiet(args.quiet)
+        ld.verbose(args.verbose)
+        ld.connect_folio(args.folio_url, args.folio_tenant, args.folio_user, password)
+        ld.connect_db_postgresql(args.dsn, concurrency=args.concurrency).close()
+
+        skipped: dict[str, dict[str, Any]] = {}
+        if args.resume is not None and args.resume.exists():
+            previous = json.loads(args.resume.read_text())
+            # Tables skipped by the previous run weren't loaded by it either
+            skipped.update(
+                {
+                    t["table"]: {**t, "status": "skipped"}
+                    for t in previous["tables"]
+                    if t["status"] == "loaded"
+                },
+            )
+        if args.incremental is not None:
+            recent = _recently_loaded(
+                args.dsn,
+                [e.table for e in entries if e.table not in skipped],
+                args.incremental,
+            )
+            skipped.update(
+                {e.table: _result(e, "skipped") for e in entries if e.table in recent}
+            )
+    except (ValueError, TypeError, RuntimeError, OSError, psycopg.Error) as e:
+        # Connection errors can span several lines
+        parser.error(" ".join(str(e).split()))
+
+    results = {
+        r.entry.table: _result(r.entry, "loaded" if r.error is None else "failed", r)
+        for r in ld.run_manifest(
+            [asdict(e) for e in entries if e.table not in skipped],
+            folio_concurrency=args.folio_concurrency,
+            db_concurrency=args.db_concurrency,
+        )
+    }
+
+    tables = [results.get(e.table) or skipped[e.table] for e in entries]
+    summary = {
+        "started": started.isoformat(),
+        "finished": datetime.now(timezone.utc).isoformat(),
+        "tables": tables,
+    }
+    if args.summary == "-":
+        json.dump(summary, sys.stdout, indent=2)
+    elif args.summary is not None:
+        Path(args.summary).write_text(json.dumps(summary, indent=2))
+
+    return 1 if any(t["status"] == "failed" for t in tables) else 0
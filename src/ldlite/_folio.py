@@ -1,6 +1,8 @@
-from collections.abc import Iterator
+from __future__ import annotations
+
 from itertools import count
-from typing import cast
+from time import perf_counter
+from typing import TYPE_CHECKING, cast
 
 import orjson
 from httpx_folio.factories import (
@@ -10,6 +12,13 @@ from httpx_folio.factories import (
 )
 from httpx_folio.query import QueryParams, QueryType
 
+from .database._telemetry import DownloadStats
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import httpx
+
 _SOURCESTATS = {
     "/source-storage/records": "/source-storage/records",
     "/source-storage/stream/records": "/source-storage/records",
@@ -26,29 +35,45 @@ _SOURCESTREAM = {
 }
 
 
+def _get(
+    stats: DownloadStats,
+    client: httpx.Client,
+    path: str,
+    params: httpx.QueryParams,
+) -> httpx.Response:
+    started = perf_counter()
+    res = client.get(path, params=params)
+    stats.request(perf_counter() - started, res.num_bytes_downloaded)
+    res.raise_for_status()
+    return res
+
+
 class FolioClient:
     def __init__(self, params: FolioParams):
         self._client_factory = default_client_factory(params)
 
-    def iterate_records(
+    def iterate_records(  # noqa: PLR0913
         self,
         path: str,
         timeout: float,
         retries: int,
         page_size: int,
         query: QueryType | None = None,
+        stats: DownloadStats | None = None,
     ) -> tuple[int, Iterator[bytes]]:
         is_srs = path.lower() in _SOURCESTATS
         # this is Java's max size of int because we want all the source records
         params = QueryParams(query, 2_147_483_647 - 1 if is_srs else page_size)
+        stats = stats if stats is not None else DownloadStats()
 
         client_opts = BasicClientOptions(retries=retries, timeout=timeout)
         with self._client_factory(client_opts) as client:
-            res = client.get(
+            res = _get(
+                stats,
+                client,
                 path if not is_srs else _SOURCESTATS[path.lower()],
-                params=params.stats(),
+                params.stats(),
             )
-            res.raise_for_status()
             j = orjson.loads(res.text)
             r = int(j["totalRecords"])
 
@@ -56,7 +81,7 @@ class FolioClient:
             return (0, iter([]))
 
         if is_srs:
-            return (r, self._iterate_records_srs(client_opts, path, params))
+            return (r, self._iterate_records_srs(client_opts, path, params, stats))
 
         # folio records usually have additional keys besides the actual list
         # the items are usually first but not always
@@ -86,6 +111,7 @@ class FolioClient:
                     params,
                     key,
                     nonid_key,
+                    stats,
                 ),
             )
 
@@ -96,6 +122,7 @@ class FolioClient:
                 path,
                 params,
                 key,
+                stats,
             ),
         )
 
@@ -104,7 +131,9 @@ class FolioClient:
         client_opts: BasicClientOptions,
         path: str,
         params: QueryParams,
+        stats: DownloadStats,
     ) -> Iterator[bytes]:
+        started = perf_counter()
         with (
             self._client_factory(client_opts) as client,
             client.stream(
@@ -113,6 +142,7 @@ class FolioClient:
                 params=params.normalized(),
             ) as res,
         ):
+            latency = perf_counter() - started
             res.raise_for_status()
             record = ""
             for f in res.iter_lines():
@@ -124,24 +154,29 @@ class FolioClient:
                 yield orjson.dumps(orjson.Fragment(record))
                 record = ""
 
-    def _iterate_records_offset(
+            # The whole stream is a single request
+            stats.request(latency, res.num_bytes_downloaded)
+
+    def _iterate_records_offset(  # noqa: PLR0913
         self,
         client_opts: BasicClientOptions,
         path: str,
         params: QueryParams,
         key: str,
         nonid_key: str | None,
+        stats: DownloadStats,
     ) -> Iterator[bytes]:
         with self._client_factory(client_opts) as client:
             page = count(start=1)
             while True:
-                res = client.get(
+                res = _get(
+                    stats,
+                    client,
                     path,
-                    params=params.offset_paging(page=next(page))
+                    params.offset_paging(page=next(page))
                     if nonid_key is None
                     else params.offset_paging(key=nonid_key, page=next(page)),
                 )
-                res.raise_for_status()
 
                 last = None
                 for r in (o for o in orjson.loads(res.text)[key] if o is not None):
@@ -157,12 +192,12 @@ class FolioClient:
         path: str,
         params: QueryParams,
         key: str,
+        stats: DownloadStats,
     ) -> Iterator[bytes]:
         with self._client_factory(client_opts) as client:
             last_id: str | None = None
             while True:
-                res = client.get(path, params=params.id_paging(last_id=last_id))
-                res.raise_for_status()
+                res = _get(stats, client, path, params.id_paging(last_id=last_id))
 
                 last = None
                 for r in (o for o in orjson.loads(res.text)[key] if o is not None):
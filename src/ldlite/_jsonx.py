@@ -1,5 +1,6 @@
 import json
 import uuid
+from collections import defaultdict
 from typing import TYPE_CHECKING, Literal, Union
 
 import duckdb
@@ -10,7 +11,7 @@ from ._camelcase import decode_camel_case
 from ._sqlx import (
     DBType,
     cast_to_varchar,
-    encode_sql,
+    placeholder,
     server_cursor,
     sqlid,
     varchar_type,
@@ -101,6 +102,101 @@ def _table_name(parents: list[tuple[int, str]]) -> str:
     return table
 
 
+def _sql_param(data: JsonValue) -> JsonValue:
+    # Values are bound the same way they used to be written as sql literals
+    if data is None or isinstance(data, (str, int)):
+        return data
+    return str(data)
+
+
+def _duckdb_literal(data: JsonValue) -> str:
+    # Every value is quoted so that the rows of a VALUES list don't need a common
+    # type, each value is cast to its column's type the same way a single row was
+    if data is None:
+        return "NULL"
+    if isinstance(data, bool):
+        return "'true'" if data else "'false'"
+    s = data if isinstance(data, str) else str(data)
+    return "'" + s.replace("'", "''") + "'"
+
+
+class _Inserts:
+    # Rows are buffered for each table and inserted in batches.
+    # Every row of a table is inserted into all of its columns,
+    # the columns missing from a record are NULL.
+    def __init__(
+        self,
+        dbtype: DBType,
+        cur: "dbapi.DBAPICursor",
+        newattrs: dict[str, dict[str, Attr]],
+        batch_size: int = 1000,
+    ):
+        self._dbtype = dbtype
+        self._cur = cur
+        self._newattrs = newattrs
+        self._batch_size = batch_size
+        self._columns: dict[str, dict[str, int]] = {}
+        self._rows: defaultdict[str, list[list[JsonValue]]] = defaultdict(list)
+
+    def _table_columns(self, table: str) -> dict[str, int]:
+        if (columns := self._columns.get(table)) is None:
+            names = ["__id", *[a.name for a in self._newattrs[table].values()]]
+            columns = {n: i for i, n in enumerate(names)}
+            self._columns[table] = columns
+        return columns
+
+    def add(self, table: str, row_id: int, row: list[tuple[str, JsonValue]]) -> None:
+        columns = self._table_columns(table)
+        values: list[JsonValue] = [None] * len(columns)
+        values[0] = row_id
+        for name, v in row:
+            if name not in columns:
+                msg = "error buffering SQL: unknown column " + name + " in " + table
+                raise RuntimeError(msg)
+            values[columns[name]] = v
+
+        rows = self._rows[table]
+        rows.append(values)
+        if len(rows) >= self._batch_size:
+            self._flush(table)
+
+    def _flush(self, table: str) -> None:
+        rows = self._rows.pop(table, [])
+        if len(rows) == 0:
+            return
+
+        columns = self._table_columns(table)
+        q = "INSERT INTO " + sqlid(table) + "("
+        q += ",".join([sqlid(c) for c in columns])
+        q += ")VALUES"
+        try:
+            if self._dbtype == DBType.POSTGRES:
+                self._cur.executemany(
+                    q
+                    + "("
+                    + ",".join([placeholder(self._dbtype)] * len(columns))
+                    + ")",
+                    [[_sql_param(v) for v in r] for r in rows],
+                )
+            else:
+                # DuckDB parses a long statement faster than it binds python values
+                self._cur.execute(
+                    q
+                    + ",".join(
+                        [
+                            "(" + ",".join([_duckdb_literal(v) for v in r]) + ")"
+                            for r in rows
+                        ],
+                    ),
+                )
+        except (RuntimeError, psycopg.Error, duckdb.Error) as e:
+            raise RuntimeError("error executing SQL: " + q) from e
+
+    def flush(self) -> None:
+        for table in list(self._rows.keys()):
+            self._flush(table)
+
+
 def _compile_array_attrs(  # noqa: PLR0913
     dbtype: DBType,
     parents: list[tuple[int, str]],
@@ -224,7 +320,7 @@ def _compile_attrs(  # noqa: C901, PLR0912, PLR0913
 def _transform_array_data(  # noqa: PLR0913
     dbtype: DBType,
     prefix: str,
-    cur: "dbapi.DBAPICursor",
+    inserts: _Inserts,
     parents: list[tuple[int, str]],
     jarray: list[JsonValue],
     newattrs: dict[str, dict[str, Attr]],
@@ -246,7 +342,7 @@ def _transform_array_data(  # noqa: PLR0913
             _transform_data(
                 dbtype,
                 prefix,
-                cur,
+                inserts,
                 parents,
                 v,
                 newattrs,
@@ -261,33 +357,22 @@ def _transform_array_data(  # noqa: PLR0913
             continue
         a = newattrs[table][arrayattr]
         a.data = v
-        value = v
-        q = "INSERT INTO " + sqlid(table) + "(__id"
-        q += (
-            ""
-            if len(quasikey) == 0
-            else "," + ",".join([sqlid(kv[1].name) for kv in quasikey.items()])
-        )
-        q += "," + prefix + "o," + sqlid(a.name)
-        q += ")VALUES(" + str(row_ids[table])
-        q += (
-            ""
-            if len(quasikey) == 0
-            else ","
-            + ",".join([encode_sql(dbtype, kv[1].data) for kv in quasikey.items()])
+        inserts.add(
+            table,
+            row_ids[table],
+            [
+                *[(q.name, q.data) for q in quasikey.values()],
+                (prefix + "o", i + 1),
+                (a.name, v),
+            ],
         )
-        q += "," + str(i + 1) + "," + encode_sql(dbtype, value) + ")"
-        try:
-            cur.execute(q)
-        except (RuntimeError, psycopg.Error) as e:
-            raise RuntimeError("error executing SQL: " + q) from e
         row_ids[table] += 1
 
 
 def _compile_data(  # noqa: C901, PLR0912, PLR0913
     dbtype: DBType,
     prefix: str,
-    cur: "dbapi.DBAPICursor",
+    inserts: _Inserts,
     parents: list[tuple[int, str]],
     jdict: Json,
     newattrs: dict[str, dict[str, Attr]],
@@ -329,7 +414,7 @@ def _compile_data(  # noqa: C901, PLR0912, PLR0913
         r = _compile_data(
             dbtype,
             decode_camel_case(b[0]) + "__",
-            cur,
+            inserts,
             parents + p,
             b[1],
             newattrs,
@@ -345,7 +430,7 @@ def _compile_data(  # noqa: C901, PLR0912, PLR0913
         _transform_array_data(
             dbtype,
             decode_camel_case(y[0]) + "__",
-            cur,
+            inserts,
             parents + p,
             y[1],
             newattrs,
@@ -361,7 +446,7 @@ def _compile_data(  # noqa: C901, PLR0912, PLR0913
 def _transform_data(  # noqa: PLR0913
     dbtype: DBType,
     prefix: str,
-    cur: "dbapi.DBAPICursor",
+    inserts: _Inserts,
     parents: list[tuple[int, str]],
     jdict: Json,
     newattrs: dict[str, dict[str, Attr]],
@@ -377,7 +462,7 @@ def _transform_data(  # noqa: PLR0913
     r = _compile_data(
         dbtype,
         prefix,
-        cur,
+        inserts,
         parents,
         jdict,
         newattrs,
@@ -388,15 +473,7 @@ def _transform_data(  # noqa: PLR0913
     )
     if r is not None:
         row += r
-    q = "INSERT INTO " + sqlid(table) + "(__id,"
-    q += ",".join([sqlid(kv[0]) for kv in row])
-    q += ")VALUES(" + str(row_ids[table]) + ","
-    q += ",".join([encode_sql(dbtype, kv[1]) for kv in row])
-    q += ")"
-    try:
-        cur.execute(q)
-    except (RuntimeError, psycopg.Error) as e:
-        raise RuntimeError("error executing SQL: " + q) from e
+    inserts.add(table, row_ids[table], row)
     row_ids[table] += 1
 
 
@@ -540,6 +617,7 @@ def transform_json(  # noqa: C901, PLR0912, PLR0913, PLR0915
                 bar_format="{desc} {bar}{postfix}",
             )
         cur2 = db.cursor()
+        inserts = _Inserts(dbtype, cur2, newattrs)
         while True:
             row = cur.fetchone()
             if row is None:
@@ -558,7 +636,7 @@ def transform_json(  # noqa: C901, PLR0912, PLR0913, PLR0915
                 _transform_data(
                     dbtype,
                     "",
-                    cur2,
+                    inserts,
                     [(1, table_j)],
                     jdict,
                     newattrs,
@@ -570,6 +648,7 @@ def transform_json(  # noqa: C901, PLR0912, PLR0913, PLR0915
             if pbar is not None:
                 pbartotal += 1
                 pbar.update(1)
+        inserts.flush()
         if pbar is not None:
             pbar.close()
     except (
@@ -591,13 +670,14 @@ def transform_json(  # noqa: C901, PLR0912, PLR0913, PLR0915
             + varchar_type(dbtype)
             + " NOT NULL)",
         )
-        for t in newattrs:
-            cur.execute(
+        if len(newattrs) > 0:
+            cur.executemany(
                 "INSERT INTO "
                 + sqlid(tcatalog)
                 + " VALUES("
-                + encode_sql(dbtype, t)
+                + placeholder(dbtype)
                 + ")",
+                [(t,) for t in newattrs],
             )
     except (
         RuntimeError,
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Literal, NoReturn, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from tqdm import tqdm
+    from typing_extensions import Self
+
+Phase = Literal["download", "scan", "transform", "index"]
+T = TypeVar("T")
+
+
+class Listener:
+    """Receives events while LDLite loads tables.
+
+    Every event does nothing by default, subclasses override the events they need.
+    Events are sent from multiple threads when tables are loaded in parallel.
+    """
+
+    def phase_started(self, table: str, phase: Phase) -> None:
+        """A phase of loading the table has started."""
+
+    def phase_progressed(
+        self,
+        table: str,
+        phase: Phase,
+        n: int,
+        total: float | None,
+    ) -> None:
+        """*n* more steps of the phase are done out of the estimated *total*."""
+
+    def phase_finished(self, table: str, phase: Phase, duration: float) -> None:
+        """A phase of loading the table has finished after *duration* seconds."""
+
+    def page_fetched(self, table: str, size: int, latency: float) -> None:
+        """A request to FOLIO returned *size* bytes after *latency* seconds."""
+
+    def records_ingested(self, table: str, n: int) -> None:
+        """*n* records have been downloaded to the raw table."""
+
+    def create_statement_executed(
+        self,
+        table: str,
+        statement: str,
+        duration: float,
+    ) -> None:
+        """A statement creating a transformed table or index took *duration* seconds.
+
+        Other statements, e.g. for the raw table or the load history, aren't sent.
+        """
+
+
+class _Listeners(Listener):
+    # This sends every event to each of the listeners
+    def __init__(self, listeners: Sequence[Listener]):
+        self._listeners = list(listeners)
+
+    def __bool__(self) -> bool:
+        return len(self._listeners) > 0
+
+    def phase(
+        self,
+        table: str,
+        phase: Phase,
+        after: _Progress | None = None,
+    ) -> _Progress:
+        return _Progress(self, table, phase, after)
+
+    def phase_started(self, table: str, phase: Phase) -> None:
+        for li in self._listeners:
+            li.phase_started(table, phase)
+
+    def phase_progressed(
+        self,
+        table: str,
+        phase: Phase,
+        n: int,
+        total: float | None,
+    ) -> None:
+        for li in self._listeners:
+            li.phase_progressed(table, phase, n, total)
+
+    def phase_finished(self, table: str, phase: Phase, duration: float) -> None:
+        for li in self._listeners:
+            li.phase_finished(table, phase, duration)
+
+    def page_fetched(self, table: str, size: int, latency: float) -> None:
+        for li in self._listeners:
+            li.page_fetched(table, size, latency)
+
+    def records_ingested(self, table: str, n: int) -> None:
+        for li in self._listeners:
+            li.records_ingested(table, n)
+
+    def create_statement_executed(
+        self,
+        table: str,
+        statement: str,
+        duration: float,
+    ) -> None:
+        for li in self._listeners:
+            li.create_statement_executed(table, statement, duration)
+
+
+class _Progress:
+    # This stands in for the tqdm progress bars passed to the database.
+    # A phase following another phase starts (and finishes the previous one)
+    # the first time it makes progress instead of when it is created.
+    def __init__(
+        self,
+        listeners: _Listeners,
+        table: str,
+        phase: Phase,
+        after: _Progress | None,
+    ):
+        self.total: float | None = None
+        self._listeners = listeners
+        self._table = table
+        self._phase = phase
+        self._after = after
+        self._started: float | None = None
+        self._finished = False
+        if after is None:
+            self._start()
+
+    def _start(self) -> None:
+        if self._started is not None:
+            return
+        if self._after is not None:
+            self._after.close()
+        self._started = perf_counter()
+        self._listeners.phase_started(self._table, self._phase)
+
+    def update(self, n: float | None = 1) -> None:
+        self._start()
+        self._listeners.phase_progressed(
+            self._table,
+            self._phase,
+            int(n or 0),
+            self.total,
+        )
+
+    def refresh(self) -> None:
+        self.update(0)
+
+    def iterate(self, items: Iterator[T]) -> Iterator[T]:
+        for i in items:
+            yield i
+            self.update(1)
+
+    def close(self) -> None:
+        if self._started is None or self._finished:
+            return
+        self._finished = True
+        self._listeners.phase_finished(
+            self._table,
+            self._phase,
+            perf_counter() - self._started,
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+_NO_ITERS_FORMAT = "{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+_DESCRIPTIONS: dict[Phase, str] = {
+    "download": "downloading",
+    "scan": "scanning",
+    "transform": "transforming",
+    "index": "indexing",
+}
+
+
+class _TqdmListener(Listener):
+    # This draws a progress bar for each phase, it is used unless LDLite is quiet
+    def __init__(self) -> None:
+        self._bars: dict[tuple[str, Phase], tqdm[NoReturn]] = {}
+        self._lock = Lock()
+
+    def phase_started(self, table: str, phase: Phase) -> None:
+        from tqdm import tqdm  # noqa: PLC0415
+
+        bar: tqdm[NoReturn] = (
+            tqdm(
+                desc=_DESCRIPTIONS[phase],
+                leave=False,
+                mininterval=5,
+                unit=table.split(".")[-1],
+                unit_scale=True,
+                delay=5,
+            )
+            if phase == "download"
+            else tqdm(
+                desc=_DESCRIPTIONS[phase],
+                leave=False,
+                bar_format=_NO_ITERS_FORMAT,
+            )
+        )
+        with self._lock:
+            self._bars[(table, phase)] = bar
+
+    def phase_progressed(
+        self,
+        table: str,
+        phase: Phase,
+        n: int,
+        total: float | None,
+    ) -> None:
+        with self._lock:
+            bar = self._bars.get((table, phase))
+        if bar is None:
+            return
+
+        bar.total = total
+        if n == 0:
+            bar.refresh()
+        else:
+            bar.update(n)
+
+    def phase_finished(self, table: str, phase: Phase, duration: float) -> None:  # noqa: ARG002
+        with self._lock:
+            bar = self._bars.pop((table, phase), None)
+        if bar is not None:
+            bar.close()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, fields
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    from .database import Database
+
+Manifest: TypeAlias = "str | PathLike[str] | Sequence[Mapping[str, Any]]"
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """A single load of a manifest, these mirror the parameters of LDLite.query."""
+
+    table: str
+    path: str
+    query: str | dict[str, str] | None = None
+    json_depth: int = 3
+    keep_raw: bool = True
+
+
+class ManifestResult(NamedTuple):
+    """The outcome of loading a single entry of a manifest.
+
+    Attributes:
+        entry: The entry which was loaded.
+        tables: The tables created by the load.
+        error: The error which stopped the load, if any.
+    """
+
+    entry: ManifestEntry
+    tables: list[str]
+    error: BaseException | None = None
+
+
+def _read_file(path: Path) -> object:
+    if path.suffix.lower() in [".yaml", ".yml"]:
+        try:
+            # PyYAML is optional and isn't always installed with its type stubs
+            import yaml  # type: ignore[import-untyped, import-not-found, unused-ignore]  # noqa: PLC0415
+        except ImportError as e:
+            msg = "reading yaml manifests requires PyYAML to be installed"
+            raise RuntimeError(msg) from e
+
+        with path.open("rb") as f:
+            return yaml.safe_load(f)
+
+    if sys.version_info >= (3, 11):
+        import tomllib  # noqa: PLC0415
+    else:
+        try:
+            import tomli as tomllib  # type: ignore[import-not-found, unused-ignore]  # noqa: PLC0415
+        except ImportError as e:
+            msg = "reading toml manifests requires python 3.11 or tomli"
+            raise RuntimeError(msg) from e
+
+    with path.open("rb") as f:
+        return tomllib.load(f)
+
+
+def read_manifest(manifest: Manifest) -> list[ManifestEntry]:
+    """Reads the entries of a toml or yaml file or a list of dictionaries.
+
+    Files contain a list of tables, either at the top level or under a "tables" key.
+    """
+    loaded: object = manifest
+    if isinstance(manifest, (str, PathLike)):
+        loaded = _read_file(Path(cast("str", manifest)))
+    if isinstance(loaded, Mapping):
+        loaded = loaded.get("tables")
+    if not isinstance(loaded, Sequence) or isinstance(loaded, str):
+        msg = "manifest must be a list of tables"
+        raise TypeError(msg)
+
+    known = {f.name for f in fields(ManifestEntry)}
+    entries: list[ManifestEntry] = []
+    for e in loaded:
+        if not isinstance(e, Mapping):
+            msg = f"manifest entries must be tables: {e}"
+            raise TypeError(msg)
+        if unknown := set(e.keys()) - known:
+            msg = f"unknown manifest keys for {e.get('table')}: {sorted(unknown)}"
+            raise ValueError(msg)
+        if "table" not in e or "path" not in e:
+            msg = f"manifest entries require a table and path: {dict(e)}"
+            raise ValueError(msg)
+        entries.append(ManifestEntry(**e))
+
+    if len(tables := [e.table for e in entries]) != len(set(tables)):
+        msg = "manifest tables must be unique"
+        raise ValueError(msg)
+
+    return entries
+
+
+def largest_first(
+    database: Database, entries: list[ManifestEntry]
+) -> list[ManifestEntry]:
+    """Orders entries by the rowcount of their previous load, largest first.
+
+    Tables which haven't been loaded before keep their order after the known tables.
+    """
+    rowcounts = {e.table: database.history_rowcount(e.table) for e in entries}
+    return sorted(
+        entries,
+        key=lambda e: -(rowcounts[e.table] or 0),
+    )
@@ -2,14 +2,11 @@ import secrets
 from enum import Enum
 from typing import TYPE_CHECKING, cast
 
-import duckdb
-import psycopg
-
 if TYPE_CHECKING:
+    import duckdb
+    import psycopg
     from _typeshed import dbapi
 
-    from ._jsonx import JsonValue
-
 
 class DBType(Enum):
     UNDEFINED = 0
@@ -20,7 +17,7 @@ class DBType(Enum):
 def as_duckdb(
     db: "dbapi.DBAPIConnection",
     dbtype: DBType,
-) -> duckdb.DuckDBPyConnection | None:
+) -> "duckdb.DuckDBPyConnection | None":
     if dbtype != DBType.DUCKDB:
         return None
 
@@ -30,7 +27,7 @@ def as_duckdb(
 def as_postgres(
     db: "dbapi.DBAPIConnection",
     dbtype: DBType,
-) -> psycopg.Connection | None:
+) -> "psycopg.Connection | None":
     if dbtype != DBType.POSTGRES:
         return None
 
@@ -69,46 +66,7 @@ def varchar_type(dbtype: DBType) -> str:
     return "varchar"
 
 
-def encode_sql_str(dbtype: DBType, s: str | bytes) -> str:  # noqa: C901, PLR0912
-    if isinstance(s, bytes):
-        s = s.decode("utf-8")
-
-    b = "E'" if dbtype == DBType.POSTGRES else "'"
-    if dbtype == DBType.DUCKDB:
-        for c in s:
-            if c == "'":
-                b += "''"
-            else:
-                b += c
+def placeholder(dbtype: DBType) -> str:
     if dbtype == DBType.POSTGRES:
-        for c in s:
-            if c == "'":
-                b += "''"
-            elif c == "\\":
-                b += "\\\\"
-            elif c == "\n":
-                b += "\\n"
-            elif c == "\r":
-                b += "\\r"
-            elif c == "\t":
-                b += "\\t"
-            elif c == "\f":
-                b += "\\f"
-            elif c == "\b":
-                b += "\\b"
-            else:
-                b += c
-    b += "'"
-    return b
-
-
-def encode_sql(dbtype: DBType, data: "JsonValue") -> str:
-    if data is None:
-        return "NULL"
-    if isinstance(data, str):
-        return encode_sql_str(dbtype, data)
-    if isinstance(data, int):
-        return str(data)
-    if isinstance(data, bool):
-        return "TRUE" if data else "FALSE"
-    return encode_sql_str(dbtype, str(data))
+        return "%s"
+    return "?"
@@ -5,15 +5,23 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, NoReturn
 
+# This is re-exported for users customizing how their tables are indexed
+from ._index_policy import IndexPolicy as IndexPolicy  # noqa: TC001
+
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterator
 
     from tqdm import tqdm
 
+    from ._telemetry import DownloadStats
+
 
 class Database(ABC):
     """The required interface for LDLite to utilite a database."""
 
+    def close(self) -> None:  # noqa: B027
+        """Closes any connections opened by the database."""
+
     @abstractmethod
     def drop_prefix(self, prefix: str) -> None:
         """Drops all tables with the given prefix."""
@@ -33,24 +41,57 @@ class Database(ABC):
         """
 
     @abstractmethod
-    def ingest_records(self, prefix: str, records: Iterator[bytes]) -> int:
-        """Ingests a stream of records dowloaded from FOLIO to the raw table."""
+    def ingest_records(
+        self,
+        prefix: str,
+        records: Iterator[bytes],
+        transient: bool = False,
+        stats: DownloadStats | None = None,
+    ) -> int:
+        """Ingests a stream of records dowloaded from FOLIO to the raw table.
+
+        Transient records go to transient raw storage which isn't crash safe,
+        they are only kept until they are expanded without keep_raw.
+        The stats of the requests made for the records are kept in the load history.
+        """
 
     @abstractmethod
-    def expand_prefix(
+    def expand_prefix(  # noqa: PLR0913
         self,
         prefix: str,
         json_depth: int,
         keep_raw: bool,
         scan_progress: tqdm[NoReturn] | None = None,
         transform_progress: tqdm[NoReturn] | None = None,
+        on_create_statement: Callable[[str, float], None] | None = None,
+        skip_unused: int | None = None,
     ) -> list[str]:
-        """Unnests and explodes the raw data at the given prefix."""
+        """Unnests and explodes the raw data at the given prefix.
+
+        Only the statements creating the transformed tables are passed to
+        on_create_statement with their duration.
+        The usage of the replaced indexes is recorded when skip_unused is given,
+        see IndexPolicy.skip_unused.
+        """
 
     @abstractmethod
-    def index_prefix(self, prefix: str, progress: tqdm[NoReturn] | None = None) -> None:
-        """Finds and indexes all tables at the given prefix."""
+    def index_prefix(
+        self,
+        prefix: str,
+        progress: tqdm[NoReturn] | None = None,
+        policy: IndexPolicy | None = None,
+        on_create_statement: Callable[[str, float], None] | None = None,
+    ) -> None:
+        """Finds and indexes all tables at the given prefix.
+
+        Only the statements creating indexes are passed to on_create_statement
+        with their duration.
+        """
 
     @abstractmethod
     def prepare_history(self, prefix: str, path: str, query: str | None) -> None:
         """Creates an entry with the current parameters in the history table."""
+
+    @abstractmethod
+    def history_rowcount(self, prefix: str) -> int | None:
+        """Returns the number of records downloaded by the last load of a prefix."""
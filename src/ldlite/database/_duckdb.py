@@ -1,26 +1,42 @@
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from datetime import datetime, timezone
 from itertools import count
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, NoReturn, cast
 
 import duckdb
 from psycopg import sql
 
-from ._prefix import Prefix
+from ._expansion import ExpansionStatement, StatementProfile, struct_statements
+from ._index_policy import IndexMethod
+from ._prefix import Prefix, PrefixedTable
+from ._telemetry import DownloadStats
 from ._typed_database import TypedDatabase
 
 if TYPE_CHECKING:
+    from tqdm import tqdm
     from typing_extensions import Self
 
 
 class DuckDbDatabase(TypedDatabase[duckdb.DuckDBPyConnection]):
-    def __init__(self, db: duckdb.DuckDBPyConnection) -> None:
+    def __init__(
+        self,
+        db: duckdb.DuckDBPyConnection,
+        stream_arrays: bool = False,
+        native_expansion: bool = False,
+        raw_json: bool = False,
+        profile_statements: bool = False,
+    ) -> None:
+        self._native_expansion = native_expansion
+        # JSON is parsed once when it is inserted instead of every time it is read
+        self._raw_json = raw_json
         # See the notes below for why we're monkey patching DuckDB
         super().__init__(
             lambda _: cast(
                 "duckdb.DuckDBPyConnection",
                 _MonkeyDBPyConnection(db.cursor()),
             ),
+            stream_arrays=stream_arrays,
+            profile_statements=profile_statements,
         )
 
         with self._conn_factory(True) as cur:
@@ -49,6 +65,10 @@ CREATE OR REPLACE FUNCTION jsonb_each(j) AS TABLE (
     SELECT key, value, rowid AS "ordinality" FROM main.json_each(j)
 );
 
+-- Transient records are kept out of the database file, DuckDB spills them
+-- to its temp directory when they don't fit in memory.
+ATTACH IF NOT EXISTS ':memory:' AS ldlite_transient;
+
 CREATE OR REPLACE FUNCTION scale(n) AS (
     CASE
         WHEN n = n::bigint THEN 0
@@ -62,24 +82,94 @@ CREATE OR REPLACE FUNCTION scale(n) AS (
     def _default_schema(self) -> str:
         return "main"
 
+    # Sorting the tables lets DuckDB skip data using its zonemaps,
+    # ART indexes use a lot of memory and can be skipped with an IndexPolicy.
+    _sort_keys = True
+
     @property
     def _create_raw_table_sql(self) -> sql.SQL:
-        return sql.SQL("CREATE TABLE IF NOT EXISTS {table} (__id integer, jsonb text);")
+        return sql.SQL(
+            "CREATE TABLE IF NOT EXISTS {table} (__id integer, jsonb "
+            + ("JSON" if self._raw_json else "text")
+            + ");",
+        )
+
+    def _index_method(self, method: IndexMethod) -> sql.Composable | None:
+        # DuckDB only has ART indexes, BRIN is already covered by its zonemaps
+        if method == "brin":
+            return None
+        return sql.SQL("")
+
+    def _transient_table(self, prefix: Prefix) -> sql.Identifier:
+        return sql.Identifier("ldlite_transient", "main", prefix.transient_table)
+
+    def _source_table(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        prefix: Prefix,
+    ) -> sql.Identifier:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+SELECT 1 FROM duckdb_tables()
+WHERE database_name = 'ldlite_transient' AND table_name = $1;""",
+                (prefix.transient_table,),
+            )
+            if cur.fetchone() is not None:
+                return self._transient_table(prefix)
+
+        return prefix.raw_table.id
+
+    def _expansion_statements(  # noqa: PLR0913
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        source_table: sql.Identifier,
+        json_depth: int,
+        output_table: Callable[[str | None], PrefixedTable],
+        shadow_schema: str | None,
+        scan_progress: "tqdm[NoReturn]",
+        profile: StatementProfile,
+    ) -> list[ExpansionStatement]:
+        if self._native_expansion and (
+            statements := struct_statements(
+                conn,
+                source_table,
+                output_table,
+                json_depth,
+                scan_progress,
+                self._stream_arrays,
+                self._sort_keys,
+                profile,
+            )
+        ):
+            return statements
+
+        return super()._expansion_statements(
+            conn,
+            source_table,
+            json_depth,
+            output_table,
+            shadow_schema,
+            scan_progress,
+            profile,
+        )
 
     def ingest_records(
         self,
         prefix: str,
         records: Iterator[bytes],
+        transient: bool = False,
+        stats: DownloadStats | None = None,
     ) -> int:
         pfx = Prefix(prefix)
         download_started = datetime.now(timezone.utc)
         pkey = count(1)
         with self._conn_factory(False) as conn:
-            self._prepare_raw_table(conn, pfx)
+            raw_table = self._prepare_raw_table(conn, pfx, transient)
 
             insert_sql = (
                 sql.SQL("INSERT INTO {table} VALUES(?, ?);")
-                .format(table=pfx.raw_table.id)
+                .format(table=raw_table)
                 .as_string()
             )
             # duckdb has better performance bulk inserting in a transaction
@@ -88,7 +178,7 @@ CREATE OR REPLACE FUNCTION scale(n) AS (
                     cur.execute(insert_sql, (next(pkey), r.decode()))
 
                 total = next(pkey) - 1
-                self._download_complete(conn, pfx, total, download_started)
+                self._download_complete(conn, pfx, total, download_started, stats)
                 tx.commit()
 
         return total
@@ -105,15 +195,6 @@ class _MonkeyDBPyCursor:
     def close(self) -> None:
         return None
 
-    """
-    # This exists to quickly print out any sql executed during tests
-    # Uncomment in production at your own peril
-    def execute(self, *args, **kwargs) -> duckdb.DuckDBPyConnection:
-        print(args[0])
-        return self._cur.execute(*args, **kwargs)
-
-    """
-
     def __enter__(self) -> "Self":
         return self
 
@@ -1,27 +1,50 @@
 from __future__ import annotations
 
+import json
 from collections import deque
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple, cast
+from uuid import uuid4
+
+from psycopg import sql
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterator
     from typing import NoReturn
 
-    from psycopg import sql
+    import duckdb
     from tqdm import tqdm
 
 
 from .node import Conn, Node
+from .profile import StatementProfile as StatementProfile
 from .recursive_nodes import ArrayNode, ObjectNode, RootNode
+from .struct_nodes import (
+    StructArrayNode,
+    StructRootNode,
+    specify_types,
+    transform_structure,
+)
+
+
+class ExpansionStatement(NamedTuple):
+    table: str
+    statement: sql.Composed
+    # The output table this statement selects from
+    # which has to be created before this statement can run.
+    parent: str | None
 
 
-def _non_srs_statements(
+def _non_srs_statements(  # noqa: C901, PLR0913
     conn: Conn,
     source_table: sql.Identifier,
     output_table: Callable[[str | None], tuple[str, sql.Identifier]],
     json_depth: int,
     scan_progress: tqdm[NoReturn],
-) -> Iterator[tuple[str, sql.Composed]]:
+    scratch_schema: str | None,
+    stream_arrays: bool,
+    sort_keys: bool,
+    profile: StatementProfile,
+) -> Iterator[ExpansionStatement]:
     # Here be dragons! The nodes have inner state manipulations
     # that violate the space/time continuum:
     # * o.load_columns
@@ -34,7 +57,13 @@ def _non_srs_statements(
     # a transaction is opened to a minimum (which is a leaky abstraction).
     scan_progress.total = scan_progress.total if scan_progress.total is not None else 1
 
-    root = RootNode(source_table, output_table)
+    root = RootNode(
+        source_table,
+        output_table,
+        scratch_schema,
+        stream_arrays,
+        sort_keys,
+    )
     onodes: deque[ObjectNode] = deque([root])
     while onodes:
         o = onodes.popleft()
@@ -44,7 +73,8 @@ def _non_srs_statements(
             scan_progress.update(1)
             continue
 
-        o.load_columns(conn)
+        with profile.step("load_columns", o.prefix):
+            o.load_columns(conn)
         scan_progress.total += len(o.direct(Node))
         scan_progress.update(1)
 
@@ -58,7 +88,13 @@ def _non_srs_statements(
                 scan_progress.update(1)
                 continue
 
-            if n := a.make_temp(conn):
+            if isinstance(a.table_parent, ArrayNode):
+                with profile.step("materialize", a.table_parent.prefix):
+                    a.table_parent.materialize(conn)
+
+            with profile.step("make_temp", a.prefix):
+                n = a.make_temp(conn)
+            if n:
                 if isinstance(n, ObjectNode):
                     onodes.append(n)
                 if isinstance(n, ArrayNode):
@@ -70,21 +106,26 @@ def _non_srs_statements(
             scan_progress.update(1)
 
     for t in root.typed_nodes():
-        t.specify_type(conn)
+        with profile.step("specify_type", t.alias):
+            t.specify_type(conn)
         scan_progress.update(1)
 
-    yield root.create_statement
+    yield ExpansionStatement(*root.create_statement, None)
     for a in root.descendents(ArrayNode):
-        yield a.create_statement
+        yield ExpansionStatement(*a.create_statement, a.parent_table[0])
 
 
-def non_srs_statements(
+def non_srs_statements(  # noqa: PLR0913
     conn: Conn,
     source_table: sql.Identifier,
     output_table: Callable[[str | None], tuple[str, sql.Identifier]],
     json_depth: int,
     scan_progress: tqdm[NoReturn],
-) -> list[tuple[str, sql.Composed]]:
+    scratch_schema: str | None = None,
+    stream_arrays: bool = False,
+    sort_keys: bool = False,
+    profile: StatementProfile | None = None,
+) -> list[ExpansionStatement]:
     return list(
         _non_srs_statements(
             conn,
@@ -92,5 +133,117 @@ def non_srs_statements(
             output_table,
             json_depth,
             scan_progress,
+            scratch_schema,
+            stream_arrays,
+            sort_keys,
+            profile if profile is not None else StatementProfile(enabled=False),
         ),
     )
+
+
+def struct_statements(  # noqa: C901, PLR0913
+    conn: duckdb.DuckDBPyConnection,
+    source_table: sql.Identifier,
+    output_table: Callable[[str | None], tuple[str, sql.Identifier]],
+    json_depth: int,
+    scan_progress: tqdm[NoReturn],
+    stream_arrays: bool = False,
+    sort_keys: bool = False,
+    profile: StatementProfile | None = None,
+) -> list[ExpansionStatement] | None:
+    """Builds the expansion statements using DuckDB's native json functions.
+
+    The structure of the source data is inferred in a single scan,
+    and the data is transformed once into a STRUCT which is unnested directly.
+    None is returned when the source data can't be expanded this way.
+    """
+    scan_progress.total = scan_progress.total if scan_progress.total is not None else 1
+    profile = profile if profile is not None else StatementProfile(enabled=False)
+
+    with profile.step("load_structure", ""), conn.cursor() as cur:
+        cur.execute(
+            sql.SQL("SELECT json_group_structure(jsonb::JSON) FROM {source};")
+            .format(source=source_table)
+            .as_string(),
+        )
+        structure = json.loads(cast("tuple[str | None]", cur.fetchone())[0] or "null")
+    if not isinstance(structure, dict):
+        return None
+
+    transformed = sql.Identifier(str(uuid4()).split("-")[0])
+    root = StructRootNode(
+        transformed,
+        output_table,
+        structure,
+        stream_arrays,
+        sort_keys,
+    )
+    arrays: list[StructArrayNode] = []
+    onodes: deque[ObjectNode] = deque([root])
+    while onodes:
+        o = onodes.popleft()
+
+        if o.depth >= json_depth:
+            o.make_jsonb()
+            scan_progress.update(1)
+            continue
+
+        o.load_columns(conn)
+        scan_progress.total += len(o.direct(Node))
+        scan_progress.update(1)
+
+        onodes.extend(o.direct(ObjectNode))
+        anodes = deque(o.direct(StructArrayNode))
+        while anodes:
+            a = anodes.popleft()
+
+            if a.depth >= json_depth:
+                a.make_jsonb()
+                scan_progress.update(1)
+                continue
+
+            n = a.load_element()
+            if isinstance(n, ObjectNode):
+                onodes.append(n)
+            if isinstance(n, StructArrayNode):
+                anodes.append(n)
+            arrays.append(a)
+            scan_progress.total += 1
+
+    if (transform := transform_structure(root)) is None:
+        return None
+
+    with profile.step("transform_structure", ""), conn.cursor() as cur:
+        cur.execute(
+            sql.SQL("""
+CREATE TEMPORARY TABLE {transformed} AS
+SELECT __id, json_transform(jsonb, {structure}) AS jsonb FROM {source};
+""")
+            .format(
+                transformed=transformed,
+                structure=sql.Literal(json.dumps(transform)),
+                source=source_table,
+            )
+            .as_string(),
+        )
+
+    for a in arrays:
+        if isinstance(a.table_parent, ArrayNode):
+            with profile.step("materialize", a.table_parent.prefix):
+                a.table_parent.materialize(conn)
+        with profile.step("make_temp", a.prefix):
+            a.make_temp(conn)
+        scan_progress.update(1)
+
+    typed = root.typed_nodes()
+    with profile.step("specify_types", ""):
+        specify_types(conn, typed)
+    scan_progress.update(len(typed))
+
+    return [
+        ExpansionStatement(*root.create_statement, None),
+        *[
+            ExpansionStatement(*a.create_statement, a.parent_table[0])
+            for a in root.descendents(ArrayNode)
+        ],
+    ]
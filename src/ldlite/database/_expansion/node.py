@@ -2,15 +2,16 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import duckdb
-import psycopg
+from ldlite._camelcase import snake_case
 
 if TYPE_CHECKING:
     from typing import TypeAlias
 
+    import duckdb
+    import psycopg
     from psycopg import sql
 
-Conn: TypeAlias = duckdb.DuckDBPyConnection | psycopg.Connection
+Conn: TypeAlias = "duckdb.DuckDBPyConnection | psycopg.Connection"
 
 
 class Node:
@@ -20,14 +21,4 @@ class Node:
         self.snake_prop: str | None = None
 
         if self.prop is not None:
-            self.snake_prop = "".join(
-                "_" + c.lower() if c.isupper() else c for c in self.prop
-            )
-
-            # there's also sorts of weird edge cases here that don't come up in practice
-            if (
-                (naked := self.prop.lstrip("_"))
-                and len(naked) > 0
-                and naked[0].isupper()
-            ):
-                self.snake_prop = self.snake_prop.removeprefix("_")
+            self.snake_prop = snake_case(self.prop)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+from threading import Lock, local
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from typing_extensions import Self
+
+C = TypeVar("C")
+
+# The expansion engine creates tables from a single query
+# which are optionally analyzed in the same statement.
+_CREATE_AS = re.compile(
+    r"^CREATE\s+(?:\w+\s+)?TABLE\s+\S+\s+AS\s*(.*?);\s*(?:ANALYZE\b[^;]*;?)?$",
+    re.DOTALL | re.IGNORECASE,
+)
+_SELECT = re.compile(r"^(?:SELECT|WITH)\b", re.IGNORECASE)
+
+
+class ProfiledStatement(NamedTuple):
+    """A statement executed while expanding a prefix.
+
+    Attributes:
+        step: The step of the expansion, like load_columns or create_statement.
+        node: The column prefix or table name the step was run for.
+        statement: The executed sql.
+        duration: The seconds the statement took to execute.
+        rowcount: The number of rows selected or created, if it is known.
+        plan: The EXPLAIN ANALYZE output of the statement, if it was captured.
+    """
+
+    step: str
+    node: str
+    statement: str
+    duration: float
+    rowcount: int | None
+    plan: str | None = None
+
+
+class StatementProfile:
+    """Records the statements executed while a prefix is expanded.
+
+    Statements are only recorded while a step of the expansion is running
+    and nothing is recorded unless the profile is enabled.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.statements: list[ProfiledStatement] = []
+        # Tables are created on multiple threads at once
+        self._current = local()
+        self._lock = Lock()
+
+    @contextmanager
+    def step(self, step: str, node: str) -> Iterator[None]:
+        """Attributes the statements executed on this thread to a step."""
+        if not self.enabled:
+            yield
+            return
+
+        previous = getattr(self._current, "step", None)
+        self._current.step = (step, node)
+        try:
+            yield
+        finally:
+            self._current.step = previous
+
+    def connection(self, conn: C) -> C:
+        """Wraps a connection so that the statements it executes are recorded."""
+        if not self.enabled:
+            return conn
+        return cast("C", _ProfiledConnection(conn, self))
+
+    def _record(self, statement: str, duration: float, rowcount: int) -> None:
+        if (current := getattr(self._current, "step", None)) is None:
+            return
+
+        (step, node) = cast("tuple[str, str]", current)
+        with self._lock:
+            self.statements.append(
+                ProfiledStatement(
+                    step,
+                    node,
+                    statement,
+                    duration,
+                    rowcount if rowcount >= 0 else None,
+                ),
+            )
+
+    def explain(self, slowest: int, explain: Callable[[str], str | None]) -> None:
+        """Captures the plans of the slowest statements which can be re-run."""
+        explainable = [
+            (i, q)
+            for (i, s) in enumerate(self.statements)
+            if (q := _query(s.statement)) is not None
+        ]
+        explainable.sort(key=lambda e: self.statements[e[0]].duration, reverse=True)
+        for i, query in explainable[:slowest]:
+            self.statements[i] = self.statements[i]._replace(plan=explain(query))
+
+
+def _query(statement: str) -> str | None:
+    # Plans are captured for the query of a statement so that
+    # the statement's side effects aren't applied a second time.
+    statement = statement.strip()
+    if _SELECT.match(statement):
+        return statement.rstrip(";")
+    if m := _CREATE_AS.match(statement):
+        return m.group(1)
+    return None
+
+
+class _ProfiledCursor:
+    def __init__(self, cur: Any, profile: StatementProfile):  # noqa: ANN401
+        self._cur = cur
+        self._profile = profile
+
+    def execute(self, query: str, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        started = perf_counter()
+        res = self._cur.execute(query, *args, **kwargs)
+        self._profile._record(  # noqa: SLF001
+            query,
+            perf_counter() - started,
+            self._cur.rowcount,
+        )
+        return res
+
+    def __enter__(self) -> Self:
+        self._cur.__enter__()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._cur.__exit__(*args)
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._cur, name)
+
+
+class _ProfiledConnection:
+    # This stands in for a connection, recording the statements its cursors execute
+    def __init__(self, conn: Any, profile: StatementProfile):  # noqa: ANN401
+        self._conn = conn
+        self._profile = profile
+
+    def cursor(self, *args: Any, **kwargs: Any) -> _ProfiledCursor:  # noqa: ANN401
+        return _ProfiledCursor(self._conn.cursor(*args, **kwargs), self._profile)
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._conn, name)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections import deque
+from functools import cached_property
 from typing import TYPE_CHECKING, TypeVar, cast
 from uuid import uuid4
 
@@ -38,11 +39,14 @@ class RecursiveNode(Node):
             yield p
             p = p.parent
 
-    @property
+    # A node's parents never change once it is built so the properties
+    # which only depend on them are cached, they're used many times over
+    # while composing the sql.
+    @cached_property
     def parents(self) -> list[RecursiveNode]:
         return list(self._parents())
 
-    @property
+    @cached_property
     def table_parent(self) -> RecursiveNode:
         for p in self.parents:
             if isinstance(p, (ArrayNode, RootNode)):
@@ -51,7 +55,7 @@ class RecursiveNode(Node):
         # There's "always" a root node
         return None  # type: ignore[return-value]
 
-    @property
+    @cached_property
     def depth(self) -> int:
         depth = 0
         prev = None
@@ -79,14 +83,11 @@ class RecursiveNode(Node):
             JsonbNode(self.source, self.path, self.prefix),
         )
 
-    @property
-    def path(self) -> sql.Composable:
-        prop_accessor: sql.Composable
-        if self.prop is None:
-            prop_accessor = sql.SQL("")
-        else:
-            prop_accessor = sql.SQL("->") + sql.Literal(self.prop)
+    def _accessor(self, path: sql.Composable, prop: str) -> sql.Composable:
+        return path + sql.SQL("->") + sql.Literal(prop)
 
+    @cached_property
+    def path(self) -> sql.Composable:
         path: list[str] = []
         for p in self.parents:
             if isinstance(p, (ArrayNode, RootNode)):
@@ -94,17 +95,17 @@ class RecursiveNode(Node):
             if p.prop is not None:
                 path.append(p.prop)
 
-        if len(path) == 0:
-            return self.column + prop_accessor
+        path.reverse()
+        if self.prop is not None:
+            path.append(self.prop)
 
-        return (
-            self.column
-            + sql.SQL("->")
-            + sql.SQL("->").join([sql.Literal(p) for p in reversed(path)])
-            + prop_accessor
-        )
+        accessed: sql.Composable = self.column
+        for prop in path:
+            accessed = self._accessor(accessed, prop)
 
-    @property
+        return accessed
+
+    @cached_property
     def prefix(self) -> str:
         if len(self.parents) == 0 or isinstance(self.parents[0], RootNode):
             return self.snake_prop or ""
@@ -201,6 +202,20 @@ ORDER BY MAX(ord), COUNT(*);
                     self._children.append(tnode)
 
 
+def _order_by(root: RootNode, columns: list[FixedValueNode]) -> sql.Composable:
+    # Tables are keyed on the record's id and the position in any arrays
+    keys = [
+        *[c.alias for c in columns if c.alias == "id"],
+        *[c.alias for c in columns if isinstance(c, OrdinalNode)],
+    ]
+    if not root.sort_keys or len(keys) == 0:
+        return sql.SQL("")
+
+    return sql.SQL("\nORDER BY ") + sql.SQL(", ").join(
+        [sql.Identifier(k) for k in keys],
+    )
+
+
 class StampableTable(ABC):
     @property
     @abstractmethod
@@ -212,6 +227,9 @@ class RootNode(ObjectNode, StampableTable):
         self,
         source: sql.Identifier,
         get_output_table: Callable[[str | None], tuple[str, sql.Identifier]],
+        scratch_schema: str | None = None,
+        stream_arrays: bool = False,
+        sort_keys: bool = False,
     ):
         super().__init__(
             source,
@@ -220,6 +238,14 @@ class RootNode(ObjectNode, StampableTable):
             None,
         )
         self.get_output_table = get_output_table
+        # Intermediate tables are usually temporary and only visible to
+        # the connection scanning the data. When they need to be shared
+        # between connections they're created in this schema instead.
+        self.scratch_schema = scratch_schema
+        # Arrays are unnested on demand rather than copied into intermediate tables
+        self.stream_arrays = stream_arrays
+        # Output tables are written in the order of their key columns
+        self.sort_keys = sort_keys
 
     @property
     def create_statement(self) -> tuple[str, sql.Composed]:
@@ -243,9 +269,10 @@ SELECT
                 ],
             )
             + sql.SQL("""
-FROM {source_table};
+FROM {source_table}{order_by};
 ANALYZE {output_table} (__id);""").format(
                 source_table=self.source,
+                order_by=_order_by(self, self.direct(FixedValueNode)),
                 output_table=output_table,
             ),
         )
@@ -260,13 +287,58 @@ class ArrayNode(RecursiveNode, StampableTable):
         parent: RecursiveNode | None,
     ):
         super().__init__(source, prop, column, parent)
-        self.temp = sql.Identifier(str(uuid4()).split("-")[0])
+
+        root = cast("RootNode", self.parents[-1])
+        self.scratch_schema = root.scratch_schema
+        self._temp_name = str(uuid4()).split("-")[0]
+        self.temp = self._scratch_identifier(self._temp_name)
+        # Streamed arrays are views which unnest the data every time they're read
+        self.materialized = not root.stream_arrays
+
+    @property
+    def _analyzed(self) -> sql.Composable:
+        return sql.SQL("p__id, array_jsonb, json_type")
+
+    def _scratch_identifier(self, name: str) -> sql.Identifier:
+        if self.scratch_schema is None:
+            return sql.Identifier(name)
+        return sql.Identifier(self.scratch_schema, name)
+
+    @property
+    def _table_kind(self) -> sql.SQL:
+        # Scratch schemas are only used by postgres, which has UNLOGGED tables
+        return sql.SQL("TEMPORARY" if self.scratch_schema is None else "UNLOGGED")
+
+    @property
+    def _view_kind(self) -> sql.SQL:
+        return sql.SQL("TEMPORARY" if self.scratch_schema is None else "")
+
+    def _create_temp(self, expansion: sql.Composable) -> sql.Composable:
+        if self.materialized:
+            return (
+                sql.SQL("CREATE {kind} TABLE {temp} AS").format(
+                    kind=self._table_kind,
+                    temp=self.temp,
+                )
+                + expansion
+                + sql.SQL(""";
+ANALYZE {temp} ({columns});
+""").format(temp=self.temp, columns=self._analyzed)
+            )
+
+        return (
+            sql.SQL("CREATE {kind} VIEW {temp} AS").format(
+                kind=self._view_kind,
+                temp=self.temp,
+            )
+            + expansion
+            + sql.SQL(";")
+        )
 
     def make_temp(self, conn: Conn) -> Node | None:
         with conn.cursor() as cur:
             expansion = (
                 sql.SQL("""
-CREATE TEMPORARY TABLE {temp} AS
 SELECT
     __id AS p__id
     ,(ROW_NUMBER() OVER (ORDER BY (SELECT NULL)))::integer AS __id
@@ -281,18 +353,16 @@ FROM (
         ,a.ord
     FROM
     (
-        SELECT """).format(temp=self.temp)
+        SELECT """)
                 + self.path
                 + sql.SQL(""" AS ld_value, __id FROM {source}
     ) j
     CROSS JOIN LATERAL jsonb_array_elements(j.ld_value) WITH ORDINALITY a("value", ord)
     WHERE jsonb_typeof(j.ld_value) = 'array'
 ) expansion
-WHERE json_type <> 'null';
-ANALYZE {temp} (p__id, array_jsonb, json_type);
-""").format(source=self.source, temp=self.temp)
+WHERE json_type <> 'null'""").format(source=self.source)
             )
-            cur.execute(expansion.as_string())
+            cur.execute(self._create_temp(expansion).as_string())
 
             type_discovery = sql.SQL("""
 SELECT
@@ -332,21 +402,50 @@ FROM {temp}""").format(temp=self.temp)
 
         return None
 
+    def materialize(self, conn: Conn) -> None:
+        # The ids of a streamed array are generated each time it is read.
+        # Nested arrays need to reference stable ids so they're materialized
+        # into a table the first time they are needed.
+        if self.materialized:
+            return
+
+        view_name = self._temp_name + "_v"
+        with conn.cursor() as cur:
+            cur.execute(
+                sql.SQL("""
+ALTER VIEW {temp} RENAME TO {view_name};
+CREATE {kind} TABLE {temp} AS SELECT * FROM {view};
+ANALYZE {temp} ({columns});
+""")
+                .format(
+                    temp=self.temp,
+                    columns=self._analyzed,
+                    view_name=sql.Identifier(view_name),
+                    kind=self._table_kind,
+                    view=self._scratch_identifier(view_name),
+                )
+                .as_string(),
+            )
+        self.materialized = True
+
     @property
-    def create_statement(self) -> tuple[str, sql.Composed]:
-        table_parent: RecursiveNode = self
-        parents: list[RecursiveNode] = []
-        for p in self.parents:
-            if table_parent == self and isinstance(p, (RootNode, ArrayNode)):
-                table_parent = p
-            parents.append(p)
+    def parent_table(self) -> tuple[str, sql.Identifier]:
+        root = cast("RootNode", self.parents[-1])
+        if not isinstance(self.table_parent, ArrayNode):
+            return root.get_output_table(None)
+
+        return root.get_output_table(self.table_parent.prefix)
 
+    @property
+    def create_statement(self) -> tuple[str, sql.Composed]:
+        parents = self.parents
         root = cast("RootNode", parents[-1])
         (output_table_name, output_table) = root.get_output_table(self.prefix)
-        if not isinstance(table_parent, ArrayNode):
-            (_, parent_table) = root.get_output_table(None)
-        else:
-            (_, parent_table) = root.get_output_table(table_parent.prefix)
+        (_, parent_table) = self.parent_table
+        columns = [
+            *[t for p in reversed(parents) for t in p.direct(FixedValueNode)],
+            *self.direct(FixedValueNode),
+        ]
 
         return (
             output_table_name,
@@ -376,11 +475,12 @@ SELECT
                 + sql.SQL("""
 FROM {source_table} a
 JOIN {parent_table} p ON
-    a.p__id = p.__id;
+    a.p__id = p.__id{order_by};
 ANALYZE {output_table} (__id);
 """).format(
                     source_table=self.temp,
                     parent_table=parent_table,
+                    order_by=_order_by(root, columns),
                     output_table=output_table,
                 )
             ),
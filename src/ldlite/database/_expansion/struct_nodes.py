@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, cast
+
+from psycopg import sql
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import TypeAlias
+
+from .fixed_nodes import JsonbNode, JsonType, OrdinalNode, TypedNode
+from .node import Conn, Node
+from .recursive_nodes import ArrayNode, ObjectNode, RecursiveNode, RootNode
+
+# This is the shape of the type returned by DuckDB's json_structure functions
+Structure: TypeAlias = str | list["Structure"] | dict[str, "Structure"]
+
+_JSON_TYPES: dict[str, JsonType] = {
+    "VARCHAR": "string",
+    "BOOLEAN": "boolean",
+    "BIGINT": "number",
+    "UBIGINT": "number",
+    "HUGEINT": "number",
+    "UHUGEINT": "number",
+    "DOUBLE": "number",
+}
+
+
+def _json_types(structure: str) -> tuple[JsonType, JsonType]:
+    if structure == "NULL":
+        # This mirrors the type discovery of arrays with only null elements
+        return cast("tuple[JsonType, JsonType]", (None, None))
+
+    if (json_type := _JSON_TYPES.get(structure)) is None:
+        # json_structure merges values of different types into JSON
+        return ("object", "string")
+
+    return (json_type, json_type)
+
+
+class StructTypedNode(TypedNode):
+    @property
+    def json_string(self) -> sql.Composable:
+        str_extract = self.path
+        if self.prop is not None:
+            str_extract = (
+                sql.SQL("struct_extract(")
+                + self.path
+                + sql.SQL(", ")
+                + sql.Literal(self.prop)
+                + sql.SQL(")")
+            )
+
+        return sql.SQL("NULLIF(NULLIF(") + str_extract + sql.SQL(", ''), 'null')")
+
+
+class StructJsonbNode(JsonbNode):
+    def __init__(
+        self,
+        source: sql.Identifier,
+        path: sql.Composable,
+        prefix: str,
+        key: str | None,
+    ):
+        super().__init__(source, path, prefix)
+
+        # The key is needed to keep the value as JSON when it is transformed
+        self.key = key
+
+
+class _StructNode(RecursiveNode):
+    def _accessor(self, path: sql.Composable, prop: str) -> sql.Composable:
+        return (
+            sql.SQL("struct_extract(")
+            + path
+            + sql.SQL(", ")
+            + sql.Literal(prop)
+            + sql.SQL(")")
+        )
+
+    def make_jsonb(self) -> None:
+        cast("RecursiveNode", self.parent).replace(
+            self,
+            StructJsonbNode(self.source, self.path, self.prefix, self.prop),
+        )
+
+    def _child(
+        self,
+        source: sql.Identifier,
+        key: str | None,
+        column: sql.Identifier,
+        path: sql.Composable,
+        structure: Structure,
+    ) -> Node | None:
+        if isinstance(structure, list):
+            return StructArrayNode(source, key, column, self, structure)
+        if isinstance(structure, dict):
+            return StructObjectNode(source, key, column, self, structure)
+        if structure == "NULL" and key is not None:
+            return None
+
+        return StructTypedNode(source, key, path, self.prefix, _json_types(structure))
+
+
+class StructObjectNode(_StructNode, ObjectNode):
+    def __init__(
+        self,
+        source: sql.Identifier,
+        prop: str | None,
+        column: sql.Identifier,
+        parent: RecursiveNode | None,
+        structure: dict[str, Structure],
+    ):
+        super().__init__(source, prop, column, parent)
+
+        self.structure = structure
+
+    def load_columns(self, conn: Conn) -> None:  # noqa: ARG002
+        # The columns are already known from the structure so unlike other objects
+        # this doesn't need to scan the data.
+        # Keys are in the order they were first seen rather than their usual position.
+        for key, structure in self.structure.items():
+            node = self._child(self.source, key, self.column, self.path, structure)
+            if node is not None:
+                self._children.append(node)
+
+
+class StructRootNode(StructObjectNode, RootNode):
+    def __init__(
+        self,
+        source: sql.Identifier,
+        get_output_table: Callable[[str | None], tuple[str, sql.Identifier]],
+        structure: dict[str, Structure],
+        stream_arrays: bool = False,
+        sort_keys: bool = False,
+    ):
+        RootNode.__init__(
+            self,
+            source,
+            get_output_table,
+            None,
+            stream_arrays,
+            sort_keys,
+        )
+
+        self.structure = structure
+
+
+class StructArrayNode(_StructNode, ArrayNode):
+    def __init__(
+        self,
+        source: sql.Identifier,
+        prop: str | None,
+        column: sql.Identifier,
+        parent: RecursiveNode | None,
+        structure: list[Structure],
+    ):
+        super().__init__(source, prop, column, parent)
+
+        self.structure = structure
+
+    @property
+    def _analyzed(self) -> sql.Composable:
+        return sql.SQL("p__id, array_jsonb")
+
+    def load_element(self) -> Node:
+        self._children.append(OrdinalNode(self.temp, self.path, self.prefix))
+
+        # json_structure always describes the elements of an array with one type
+        column = sql.Identifier("array_jsonb")
+        element = cast(
+            "Node",
+            self._child(self.temp, None, column, column, self.structure[0]),
+        )
+        self._children.append(element)
+        return element
+
+    def make_temp(self, conn: Conn) -> Node | None:
+        expansion = sql.SQL("""
+SELECT
+    p__id
+    ,(ROW_NUMBER() OVER (ORDER BY (SELECT NULL)))::integer AS __id
+    ,ord::smallint AS __o
+    ,array_jsonb
+FROM (
+    SELECT
+        __id AS p__id
+        ,UNNEST({path}) AS array_jsonb
+        ,GENERATE_SUBSCRIPTS({path}, 1) AS ord
+    FROM {source}
+) expansion
+WHERE array_jsonb IS NOT NULL""").format(path=self.path, source=self.source)
+
+        with conn.cursor() as cur:
+            cur.execute(self._create_temp(expansion).as_string())
+
+        return next(
+            (n for n in self.direct(Node) if not isinstance(n, OrdinalNode)),
+            None,
+        )
+
+
+def transform_structure(node: Node) -> Structure | None:
+    """Builds the type to json_transform the source data into.
+
+    Scalar values are kept as VARCHAR so they are typed the same way as other sources.
+    """
+    if isinstance(node, StructJsonbNode):
+        return "JSON"
+    if isinstance(node, TypedNode):
+        return "VARCHAR"
+    if isinstance(node, StructArrayNode):
+        elements = [transform_structure(n) for n in node.direct(Node)]
+        return [next((e for e in elements if e is not None), "JSON")]
+    if isinstance(node, StructObjectNode):
+        structure = {
+            cast("str", n.key if isinstance(n, StructJsonbNode) else n.prop): s
+            for n in node.direct(Node)
+            if (s := transform_structure(n)) is not None
+        }
+        return structure or None
+
+    return None
+
+
+_STRING_SPECIFICATIONS = sql.SQL(r"""COALESCE(BOOL_AND(
+        {value} LIKE '________-____-____-____-____________'
+    ) FILTER (WHERE {value} IS NOT NULL), TRUE)
+    ,COALESCE(BOOL_AND(
+        {value} ~ '^[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}[T ][0-9]{{2}}:[0-9]{{2}}:[0-9]{{2}}(\.[0-9]{{1,9}})?(Z|[+-][0-9]{{2}}(:?[0-9]{{2}})?)$'
+    ) FILTER (WHERE {value} IS NOT NULL), TRUE)""")  # noqa: E501
+_NUMBER_SPECIFICATIONS = sql.SQL("""COALESCE(BOOL_OR(
+        SCALE({value}::numeric) > 0
+    ) FILTER (WHERE {value} IS NOT NULL), FALSE)
+    ,COALESCE(BOOL_OR(
+        {value}::numeric > 2147483647
+    ) FILTER (WHERE {value} IS NOT NULL), FALSE)""")
+
+
+def specify_types(conn: Conn, nodes: list[TypedNode]) -> None:
+    """Specifies the types of every node reading from the same source at once."""
+    sources: dict[str, list[TypedNode]] = {}
+    for n in nodes:
+        if n.is_mixed or n.json_type not in ["string", "number"]:
+            continue
+        sources.setdefault(n.source.as_string(), []).append(n)
+
+    for typed in sources.values():
+        specifications: list[sql.Composable] = [
+            (
+                _STRING_SPECIFICATIONS
+                if n.json_type == "string"
+                else _NUMBER_SPECIFICATIONS
+            ).format(value=n.json_string)
+            for n in typed
+        ]
+
+        with conn.cursor() as cur:
+            cur.execute(
+                (
+                    sql.SQL("SELECT\n    ")
+                    + sql.SQL("\n    ,").join(specifications)
+                    + sql.SQL("\nFROM {source};").format(source=typed[0].source)
+                ).as_string(),
+            )
+            row = iter(cast("tuple[bool, ...]", cur.fetchone()))
+            for n in typed:
+                if n.json_type == "string":
+                    (n.is_uuid, n.is_datetime) = (next(row), next(row))
+                else:
+                    (n.is_float, n.is_bigint) = (next(row), next(row))
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import TypeAlias
+
+IndexMethod: TypeAlias = Literal["btree", "hash", "brin"]
+
+
+class Index(NamedTuple):
+    table: str
+    columns: tuple[str, ...]
+    # None uses the default method of the database
+    method: IndexMethod | None = None
+
+
+@dataclass(frozen=True)
+class IndexPolicy:
+    """Configures which columns of the transformed tables are indexed.
+
+    Patterns are matched against column names using fnmatch.
+    Patterns containing a period are matched against table.column instead.
+
+    The default policy indexes uuid columns, id columns, and *_id columns.
+
+    Attributes:
+        include: Columns matching any of these patterns are indexed.
+        exclude: Columns matching any of these patterns are never indexed.
+        uuids: Whether uuid columns are indexed even if they aren't included.
+        uuid_method: The method used to index uuid columns.
+            Hash indexes are smaller but only support equality lookups.
+        brin_id: Whether to create a BRIN index on the __id of each table.
+            DuckDB doesn't have BRIN indexes, they're skipped with a warning.
+        composite_arrays: Whether to index array tables on the id of the
+            record they belong to and their ordinal columns.
+        skip_unused: Skip indexes that weren't scanned during this many loads.
+            Only Postgres tracks index usage, other databases build every index.
+            Usage is only tracked while this is set and only the last
+            skip_unused snapshots of each index are kept.
+            Skipped indexes are built again after being skipped for as many loads
+            to measure their usage again, or once the prefix is dropped.
+    """
+
+    include: tuple[str, ...] = ("id", "*_id")
+    exclude: tuple[str, ...] = ("__id",)
+    uuids: bool = True
+    uuid_method: IndexMethod | None = None
+    brin_id: bool = False
+    composite_arrays: bool = False
+    skip_unused: int | None = None
+
+    @staticmethod
+    def _matches(patterns: tuple[str, ...], table: str, column: str) -> bool:
+        return any(
+            fnmatchcase(f"{table}.{column}" if "." in p else column, p)
+            for p in patterns
+        )
+
+    def indexes(self, table: str, columns: Sequence[tuple[str, str]]) -> list[Index]:
+        """Lists the indexes to create for a table's (column, data type) pairs."""
+        indexes: list[Index] = []
+        if self.brin_id and any(c == "__id" for (c, _) in columns):
+            indexes.append(Index(table, ("__id",), "brin"))
+
+        for column, data_type in columns:
+            if self._matches(self.exclude, table, column):
+                continue
+
+            is_uuid = data_type.lower() == "uuid"
+            if is_uuid and self.uuids:
+                indexes.append(Index(table, (column,), self.uuid_method))
+            elif self._matches(self.include, table, column):
+                indexes.append(Index(table, (column,)))
+
+        ordinals = tuple(c for (c, _) in columns if c.endswith("__o"))
+        has_id = any(c == "id" for (c, _) in columns)
+        if self.composite_arrays and has_id and len(ordinals) > 0:
+            indexes.append(Index(table, ("id", *ordinals)))
+
+        return indexes
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import deque
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
+
+import psycopg
+from psycopg.pq import TransactionStatus
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+
+class _Idle(NamedTuple):
+    conn: psycopg.Connection
+    created: float
+    returned: float
+
+
+class ConnectionPool:
+    """Keeps closed Postgres connections open to be reused instead of reconnecting.
+
+    At most *max_idle* connections are kept, checkouts are never blocked because
+    loads hold a connection while their concurrent workers check out more.
+    Connections idle for longer than *check_after* seconds are checked before they
+    are reused and connections older than *max_lifetime* seconds are replaced.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], psycopg.Connection],
+        max_idle: int,
+        check_after: float = 30,
+        max_lifetime: float = 3600,
+    ):
+        self._connect = connect
+        self._max_idle = max_idle
+        self._check_after = check_after
+        self._max_lifetime = max_lifetime
+        self._idle: deque[_Idle] = deque()
+        self._lock = Lock()
+        self._closed = False
+
+    def getconn(self, autocommit: bool) -> psycopg.Connection:
+        """Checks out a connection which is returned to the pool when closed."""
+        while True:
+            with self._lock:
+                idle = self._idle.pop() if len(self._idle) > 0 else None
+
+            if idle is None:
+                (conn, created) = (self._connect(), monotonic())
+                break
+
+            (conn, created, returned) = idle
+            if conn.closed or monotonic() - created > self._max_lifetime:
+                conn.close()
+                continue
+            if monotonic() - returned > self._check_after:
+                try:
+                    conn.execute("SELECT 1;")
+                except psycopg.Error:
+                    conn.close()
+                    continue
+            break
+
+        conn.autocommit = autocommit
+        return cast("psycopg.Connection", _PooledConnection(self, conn, created))
+
+    def _putconn(self, conn: psycopg.Connection, created: float) -> None:
+        if conn.closed or conn.broken:
+            return
+
+        try:
+            if conn.info.transaction_status != TransactionStatus.IDLE:
+                conn.rollback()
+            conn.autocommit = True
+            # Expansions leave temporary tables behind and indexing changes settings
+            conn.execute("DISCARD TEMP; RESET ALL;")
+        except psycopg.Error:
+            conn.close()
+            return
+
+        with self._lock:
+            if not self._closed and len(self._idle) < self._max_idle:
+                self._idle.append(_Idle(conn, created, monotonic()))
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Closes every idle connection and any checked out one once it's returned."""
+        with self._lock:
+            self._closed = True
+            (idle, self._idle) = (self._idle, deque())
+        for i in idle:
+            i.conn.close()
+
+
+class _PooledConnection:
+    # This stands in for a psycopg.Connection, returning it to the pool when closed
+    def __init__(self, pool: ConnectionPool, conn: psycopg.Connection, created: float):
+        self._pool = pool
+        self._conn = conn
+        self._created = created
+        self._returned = False
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        if not self._returned:
+            self._returned = True
+            self._pool._putconn(self._conn, self._created)  # noqa: SLF001
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        # This mirrors psycopg.Connection which commits unless there was an error
+        if not self._conn.closed:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        self.close()
@@ -1,31 +1,62 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
+from collections import defaultdict
+from contextlib import closing, contextmanager
 from datetime import datetime, timezone
 from itertools import count
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
 import psycopg
 from psycopg import sql
 
+from ._pool import ConnectionPool
 from ._prefix import Prefix
 from ._typed_database import TypedDatabase
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Iterator, Sequence
+
+    from ._index_policy import Index
+    from ._telemetry import DownloadStats
 
 
 class PostgresDatabase(TypedDatabase[psycopg.Connection]):
-    def __init__(self, dsn: str):
-        try:
+    def __init__(  # noqa: PLR0913
+        self,
+        dsn: str,
+        concurrency: int = 1,
+        stream_arrays: bool = False,
+        maintenance_work_mem: str | None = None,
+        max_parallel_maintenance_workers: int | None = None,
+        pool_size: int | None = None,
+        profile_statements: bool = False,
+        explain_slowest: int = 0,
+    ):
+        # These are only set for the sessions building indexes
+        self._index_settings = {
+            k: str(v)
+            for k, v in [
+                ("maintenance_work_mem", maintenance_work_mem),
+                ("max_parallel_maintenance_workers", max_parallel_maintenance_workers),
+            ]
+            if v is not None
+        }
+        # Every phase of a load uses its own connection(s), reconnecting each time
+        # is slow when the server is remote and connections are encrypted.
+        # By default enough connections are kept for the concurrent phases.
+        self._pool = ConnectionPool(
             # RawCursor lets us use $1, $2, etc to use the
             # same sql between duckdb and postgres
+            lambda: psycopg.connect(dsn, cursor_factory=psycopg.RawCursor),
+            pool_size if pool_size is not None else concurrency + 1,
+        )
+        self._explain_slowest = explain_slowest
+        try:
             super().__init__(
-                lambda transact: psycopg.connect(
-                    dsn,
-                    cursor_factory=psycopg.RawCursor,
-                    autocommit=not transact,
-                ),
+                lambda transact: self._pool.getconn(autocommit=not transact),
+                concurrency,
+                stream_arrays,
+                profile_statements,
             )
         except psycopg.errors.UniqueViolation:
             # postgres throws a couple of errors when multiple threads try to create
@@ -37,16 +68,187 @@ class PostgresDatabase(TypedDatabase[psycopg.Connection]):
             if str(e) != "tuple concurrently updated":
                 raise
 
+    def close(self) -> None:
+        self._pool.close()
+
     @property
     def _default_schema(self) -> str:
         return "public"
 
+    def _explain(self, conn: psycopg.Connection, query: str) -> str | None:
+        try:
+            # The savepoint keeps the transform going if the query can't be re-run
+            with conn.transaction(), conn.cursor() as cur:
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + query)
+                return "\n".join(cast("str", r[0]) for r in cur.fetchall())
+        except psycopg.Error:
+            return None
+
+    def _prepare_system_tables(self, conn: psycopg.Connection) -> None:
+        with conn.cursor() as cur:
+            cur.execute("""
+CREATE TABLE IF NOT EXISTS "ldlite_system"."index_usage_v1" (
+    "table_prefix" TEXT
+    ,"table_name" TEXT
+    ,"columns" TEXT[]
+    ,"idx_scan" BIGINT
+    ,"snapshot_time" TIMESTAMPTZ
+);""")
+
+    def drop_prefix(
+        self,
+        prefix: str,
+    ) -> None:
+        super().drop_prefix(prefix)
+        with closing(self._conn_factory(True)) as conn:
+            conn.execute(
+                """
+DELETE FROM "ldlite_system"."index_usage_v1"
+WHERE "table_prefix" = $1;
+""",
+                (Prefix(prefix).load_history_key,),
+            )
+            conn.commit()
+
+    def _snapshot_index_usage(
+        self,
+        conn: psycopg.Connection,
+        prefix: Prefix,
+        tables: list[str],
+        keep: int,
+    ) -> None:
+        if len(tables) == 0:
+            return
+
+        # Indexes are rebuilt with a new name every load
+        # so they're identified by their table and columns instead.
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+INSERT INTO "ldlite_system"."index_usage_v1"
+SELECT
+    $1
+    ,s.relname
+    ,ARRAY(
+        SELECT a.attname::text
+        FROM UNNEST(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, n)
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+        ORDER BY k.n
+    )
+    ,s.idx_scan
+    ,$2
+FROM pg_stat_user_indexes s
+JOIN pg_index i ON i.indexrelid = s.indexrelid
+WHERE s.schemaname = $3 AND s.relname = ANY($4);
+""",
+                (
+                    prefix.load_history_key,
+                    datetime.now(timezone.utc),
+                    prefix.schema or self._default_schema,
+                    tables,
+                ),
+            )
+            # Anything older than the oldest snapshot being kept is no longer needed
+            cur.execute(
+                """
+DELETE FROM "ldlite_system"."index_usage_v1" u
+USING (
+    SELECT "table_name", "columns", "snapshot_time"
+    FROM (
+        SELECT
+            "table_name"
+            ,"columns"
+            ,"snapshot_time"
+            ,ROW_NUMBER() OVER (
+                PARTITION BY "table_name", "columns"
+                ORDER BY "snapshot_time" DESC
+            ) AS "load"
+        FROM "ldlite_system"."index_usage_v1"
+        WHERE "table_prefix" = $1 AND "idx_scan" IS NOT NULL
+    ) AS "snapshots"
+    WHERE "load" = $2
+) AS "oldest"
+WHERE
+    u."table_prefix" = $1 AND
+    u."table_name" = "oldest"."table_name" AND
+    u."columns" = "oldest"."columns" AND
+    u."snapshot_time" < "oldest"."snapshot_time";
+""",
+                (prefix.load_history_key, keep),
+            )
+
+    def _unused_indexes(
+        self,
+        conn: psycopg.Connection,
+        prefix: Prefix,
+        indexes: Sequence[Index],
+        loads: int,
+    ) -> set[tuple[str, tuple[str, ...]]]:
+        # Skipped indexes are recorded without an idx_scan,
+        # snapshots are listed from the most recent one.
+        usage: dict[tuple[str, tuple[str, ...]], list[int | None]] = defaultdict(list)
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+SELECT "table_name", "columns", "idx_scan"
+FROM "ldlite_system"."index_usage_v1"
+WHERE "table_prefix" = $1
+ORDER BY "table_name", "columns", "snapshot_time" DESC;
+""",
+                (prefix.load_history_key,),
+            )
+            for t, c, s in cur.fetchall():
+                usage[(t, tuple(c))].append(s)
+
+        unused: set[tuple[str, tuple[str, ...]]] = set()
+        for key, scans in usage.items():
+            skipped = next(
+                (n for (n, s) in enumerate(scans) if s is not None),
+                len(scans),
+            )
+            measured = [s for s in scans if s is not None][:loads]
+            # Unused indexes are built again after being skipped for as many loads
+            # so their usage is measured again.
+            if len(measured) == loads and not any(measured) and skipped < loads:
+                unused.add(key)
+
+        unused &= {(i.table, i.columns) for i in indexes}
+        if len(unused) > 0:
+            snapshot_time = datetime.now(timezone.utc)
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+INSERT INTO "ldlite_system"."index_usage_v1"
+VALUES ($1, $2, $3, NULL, $4);
+""",
+                    [
+                        (prefix.load_history_key, t, list(c), snapshot_time)
+                        for (t, c) in sorted(unused)
+                    ],
+                )
+
+        return unused
+
     @property
     def _create_raw_table_sql(self) -> sql.SQL:
         return sql.SQL(
             "CREATE TABLE IF NOT EXISTS {table} (__id integer, jsonb jsonb);",
         )
 
+    @property
+    def _create_transient_table_sql(self) -> sql.SQL:
+        return sql.SQL(
+            "CREATE UNLOGGED TABLE IF NOT EXISTS {table} (__id integer, jsonb jsonb);",
+        )
+
+    def _prepare_index_session(self, conn: psycopg.Connection) -> None:
+        with conn.cursor() as cur:
+            for setting, value in self._index_settings.items():
+                cur.execute(
+                    "SELECT set_config($1, $2, false);",
+                    (setting, value),
+                )
+
     @contextmanager
     def _begin(self, conn: psycopg.Connection) -> Iterator[None]:
         with conn.transaction():
@@ -56,19 +258,21 @@ class PostgresDatabase(TypedDatabase[psycopg.Connection]):
         self,
         prefix: str,
         records: Iterator[bytes],
+        transient: bool = False,
+        stats: DownloadStats | None = None,
     ) -> int:
         pfx = Prefix(prefix)
         download_started = datetime.now(timezone.utc)
         pkey = count(1)
         with self._conn_factory(True) as conn:
-            self._prepare_raw_table(conn, pfx)
+            raw_table = self._prepare_raw_table(conn, pfx, transient)
 
             with (
                 conn.cursor() as cur,
                 cur.copy(
                     sql.SQL(
                         "COPY {table} (__id, jsonb) FROM STDIN (FORMAT BINARY)",
-                    ).format(table=pfx.raw_table.id),
+                    ).format(table=raw_table),
                 ) as copy,
             ):
                 # postgres jsonb is always version 1
@@ -82,11 +286,11 @@ class PostgresDatabase(TypedDatabase[psycopg.Connection]):
 
             with conn.cursor() as cur:
                 cur.execute(
-                    sql.SQL("ANALYZE {table} (jsonb);").format(table=pfx.raw_table.id),
+                    sql.SQL("ANALYZE {table} (jsonb);").format(table=raw_table),
                 )
 
             total = next(pkey) - 1
-            self._download_complete(conn, pfx, total, download_started)
+            self._download_complete(conn, pfx, total, download_started, stats)
             conn.commit()
 
-        return next(pkey) - 1
+        return total
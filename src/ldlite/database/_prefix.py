@@ -1,4 +1,7 @@
+import os
+from functools import cached_property
 from typing import NamedTuple
+from uuid import uuid4
 
 from psycopg import sql
 
@@ -30,6 +33,10 @@ class Prefix:
     def raw_table(self) -> PrefixedTable:
         return self._prefixed_table(self._prefix)
 
+    @property
+    def transient_table(self) -> str:
+        return ("" if self.schema is None else self.schema + "_") + self._prefix
+
     @property
     def _output_table(self) -> str:
         return self._prefix + "__t"
@@ -39,6 +46,10 @@ class Prefix:
             self._output_table + ("" if prefix is None else "__" + prefix),
         )
 
+    def shadow_output_table(self, prefix: str | None) -> PrefixedTable:
+        (name, _) = self.output_table(prefix)
+        return PrefixedTable(name, sql.Identifier(self.shadow_schema, name))
+
     @property
     def catalog_table(self) -> PrefixedTable:
         return self._prefixed_table(self._prefix + "__tcatalog")
@@ -65,6 +76,15 @@ class Prefix:
             + "_origin",
         )
 
+    @cached_property
+    def shadow_schema(self) -> str:
+        # Concurrent loads of the same prefix each get their own shadow schema
+        return (
+            ("" if self.schema is None else self.schema + "_")
+            + self._output_table
+            + f"_shadow_{os.getpid()}_{uuid4().hex[:6]}"
+        )
+
     def transform_table(self, count: int) -> sql.Identifier:
         return sql.Identifier(
             ("" if self.schema is None else self.schema + "_")
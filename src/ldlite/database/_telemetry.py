@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
+from datetime import timedelta
+from math import ceil
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@dataclass
+class DownloadStats:
+    """Counts the requests made to FOLIO while downloading records.
+
+    Attributes:
+        requests: The number of http requests made.
+        bytes: The number of bytes received, before decompression.
+        latencies: The seconds each request took to respond.
+        on_request: Called with the latency and size of each request.
+    """
+
+    requests: int = 0
+    bytes: int = 0
+    latencies: list[float] = field(default_factory=list)
+    on_request: Callable[[float, int], None] | None = field(default=None, repr=False)
+
+    def request(self, latency: float, size: int) -> None:
+        """Records a single request to FOLIO."""
+        self.requests += 1
+        self.bytes += size
+        self.latencies.append(latency)
+        if self.on_request is not None:
+            self.on_request(latency, size)
+
+    def latency(self, percentile: float) -> timedelta | None:
+        """The nearest rank percentile (between 0 and 1) of request latencies."""
+        if len(self.latencies) == 0:
+            return None
+
+        ranked = sorted(self.latencies)
+        return timedelta(seconds=ranked[max(ceil(percentile * len(ranked)), 1) - 1])
+
+
+def peak_rss() -> int | None:
+    """The most memory in bytes this process has used, if it is known."""
+    if sys.platform == "win32":
+        return None
+
+    import resource  # noqa: PLC0415
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS reports bytes
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import inspect
+import os
+import warnings
 from abc import abstractmethod
-from contextlib import closing, contextmanager
-from datetime import datetime, timezone
+from collections import defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import closing, contextmanager, suppress
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
 from typing import TYPE_CHECKING, Any, Generic, NoReturn, TypeVar, cast
 from uuid import uuid4
 
@@ -11,8 +23,10 @@ from psycopg import sql
 from tqdm import tqdm
 
 from . import Database
-from ._expansion import non_srs_statements
-from ._prefix import Prefix
+from ._expansion import ExpansionStatement, StatementProfile, non_srs_statements
+from ._index_policy import Index, IndexMethod, IndexPolicy
+from ._prefix import Prefix, PrefixedTable
+from ._telemetry import DownloadStats, peak_rss
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterator, Sequence
@@ -24,9 +38,46 @@ if TYPE_CHECKING:
 DB = TypeVar("DB", bound="duckdb.DuckDBPyConnection | psycopg.Connection")
 
 
+def _caller_stacklevel() -> int:
+    """Returns the stacklevel of the first caller outside of ldlite."""
+    package = str(Path(__file__).parents[1]) + os.sep
+    level = 1
+    frame = inspect.currentframe()
+    # The frame of this function isn't counted by warnings.warn
+    frame = frame.f_back if frame is not None else None
+    while frame is not None and frame.f_code.co_filename.startswith(package):
+        level += 1
+        frame = frame.f_back
+    return level
+
+
+def _execute_create(
+    cur: duckdb.DuckDBPyConnection | psycopg.Cursor[Any],
+    statement: str,
+    on_create_statement: Callable[[str, float], None] | None,
+) -> None:
+    if on_create_statement is None:
+        cur.execute(statement)
+        return
+
+    started = perf_counter()
+    cur.execute(statement)
+    on_create_statement(statement, perf_counter() - started)
+
+
 class TypedDatabase(Database, Generic[DB]):
-    def __init__(self, conn_factory: Callable[[bool], DB]):
+    def __init__(
+        self,
+        conn_factory: Callable[[bool], DB],
+        concurrency: int = 1,
+        stream_arrays: bool = False,
+        profile_statements: bool = False,
+    ):
         self._conn_factory = conn_factory
+        self._concurrency = concurrency
+        self._stream_arrays = stream_arrays
+        self._profile_statements = profile_statements
+        self._unsupported_methods: set[IndexMethod] = set()
         with closing(self._conn_factory(True)) as conn:
             with conn.cursor() as cur:
                 cur.execute('CREATE SCHEMA IF NOT EXISTS "ldlite_system";')
@@ -49,13 +100,72 @@ CREATE TABLE IF NOT EXISTS "ldlite_system"."load_history_v1" (
     ,"transform_time" INTERVAL -- 11
     ,"index_time" INTERVAL -- 12
 );""")
+                cur.execute("""
+CREATE TABLE IF NOT EXISTS "ldlite_system"."load_history_v2" (
+    "table_prefix" TEXT UNIQUE
+    ,"folio_path" TEXT -- 1
+    ,"query_text" TEXT -- 2
+    ,"load_start" TIMESTAMPTZ -- 3
+
+    ,"rowcount" INTEGER -- 4
+    ,"download_complete" TIMESTAMPTZ -- 5
+
+    ,"final_rowcount" INTEGER -- 6
+    ,"transform_complete" TIMESTAMPTZ -- 7
+    ,"data_refresh_start" TIMESTAMPTZ -- 8
+    ,"data_refresh_end" TIMESTAMPTZ -- 9
+
+    ,"download_time" INTERVAL -- 10
+    ,"transform_time" INTERVAL -- 11
+    ,"index_time" INTERVAL -- 12
+
+    ,"download_bytes" BIGINT -- 13
+    ,"download_requests" INTEGER -- 14
+    ,"request_latency_p50" INTERVAL -- 15
+    ,"request_latency_p95" INTERVAL -- 16
+    ,"records_per_second" FLOAT8 -- 17
+
+    ,"scan_time" INTERVAL -- 18
+    ,"create_time" INTERVAL -- 19
+    ,"tables_created" INTEGER -- 20
+    ,"indexes_created" INTEGER -- 21
+
+    ,"peak_rss" BIGINT -- 22
+);""")
+                cur.execute("""
+CREATE TABLE IF NOT EXISTS "ldlite_system"."statement_profile_v1" (
+    "table_prefix" TEXT
+    ,"transform_start" TIMESTAMPTZ
+    ,"ordinal" INTEGER
+    ,"step" TEXT
+    ,"node" TEXT
+    ,"statement" TEXT
+    ,"duration" INTERVAL
+    ,"rowcount" BIGINT
+    ,"plan" TEXT
+);""")
+            self._prepare_system_tables(conn)
 
             conn.commit()
 
+    def _prepare_system_tables(self, conn: DB) -> None:
+        """Creates any ldlite_system tables specific to the database."""
+
     @property
     @abstractmethod
     def _default_schema(self) -> str: ...
 
+    # Databases without a need for indexes can sort their tables instead
+    _sort_keys = False
+
+    # Databases which can explain statements capture plans for this many of
+    # the slowest statements when statements are profiled
+    _explain_slowest = 0
+
+    def _explain(self, conn: DB, query: str) -> str | None:  # noqa: ARG002
+        """Returns the plan of a query or None if it can't be explained."""
+        return None
+
     @contextmanager
     def _begin(self, conn: DB) -> Iterator[None]:  # noqa: ARG002
         yield
@@ -68,13 +178,20 @@ CREATE TABLE IF NOT EXISTS "ldlite_system"."load_history_v1" (
         with closing(self._conn_factory(True)) as conn:
             self._drop_extracted_tables(conn, pfx)
             self._drop_raw_table(conn, pfx)
-            conn.execute(
-                """
-DELETE FROM "ldlite_system"."load_history_v1"
+            for system_table in [
+                "load_history_v1",
+                "load_history_v2",
+                "statement_profile_v1",
+            ]:
+                conn.execute(
+                    sql.SQL("""
+DELETE FROM {system_table}
 WHERE "table_prefix" = $1;
-""",
-                (pfx.load_history_key,),
-            )
+""")
+                    .format(system_table=sql.Identifier("ldlite_system", system_table))
+                    .as_string(),
+                    (pfx.load_history_key,),
+                )
             conn.commit()
 
     def drop_raw_table(
@@ -90,12 +207,17 @@ WHERE "table_prefix" = $1;
         conn: DB,
         prefix: Prefix,
     ) -> None:
+        tables = [prefix.raw_table.id]
+        if (transient := self._transient_table(prefix)) != prefix.raw_table.id:
+            tables.append(transient)
+
         with closing(conn.cursor()) as cur:
-            cur.execute(
-                sql.SQL("DROP TABLE IF EXISTS {table};")
-                .format(table=prefix.raw_table.id)
-                .as_string(),
-            )
+            for t in tables:
+                cur.execute(
+                    sql.SQL("DROP TABLE IF EXISTS {table};")
+                    .format(table=t)
+                    .as_string(),
+                )
 
     def drop_extracted_tables(
         self,
@@ -109,6 +231,7 @@ WHERE "table_prefix" = $1;
         self,
         conn: DB,
         prefix: Prefix,
+        skip_unused: int | None = None,
     ) -> None:
         tables: list[Sequence[Sequence[Any]]] = []
         with closing(conn.cursor()) as cur:
@@ -139,6 +262,13 @@ WHERE table_schema = $1 and table_name IN ($2, $3);""",
                     )
                     tables.extend(cur.fetchall())
 
+        if skip_unused is not None:
+            self._snapshot_index_usage(
+                conn,
+                prefix,
+                [cast("str", et).split(".")[-1] for (et,) in tables],
+                skip_unused,
+            )
         with closing(conn.cursor()) as cur:
             for (et,) in tables:
                 cur.execute(
@@ -157,14 +287,54 @@ WHERE table_schema = $1 and table_name IN ($2, $3);""",
                 .as_string(),
             )
 
+    def _snapshot_index_usage(
+        self,
+        conn: DB,
+        prefix: Prefix,
+        tables: list[str],
+        keep: int,
+    ) -> None:
+        """Records how often the indexes of tables were used before they're dropped.
+
+        Only the last keep snapshots of each index are kept.
+        """
+
+    def _unused_indexes(
+        self,
+        conn: DB,  # noqa: ARG002
+        prefix: Prefix,  # noqa: ARG002
+        indexes: Sequence[Index],  # noqa: ARG002
+        loads: int,  # noqa: ARG002
+    ) -> set[tuple[str, tuple[str, ...]]]:
+        """Lists the (table, columns) of indexes unused during the last loads.
+
+        The listed indexes are recorded as skipped so they can be built again
+        after they've been skipped for as many loads.
+        """
+        return set()
+
     @property
     @abstractmethod
     def _create_raw_table_sql(self) -> sql.SQL: ...
+
+    # Transient records don't need to survive a crash
+    # so they can skip the durability guarantees of the raw table.
+    @property
+    def _create_transient_table_sql(self) -> sql.SQL:
+        return self._create_raw_table_sql
+
+    def _transient_table(self, prefix: Prefix) -> sql.Identifier:
+        return prefix.raw_table.id
+
+    def _source_table(self, conn: DB, prefix: Prefix) -> sql.Identifier:  # noqa: ARG002
+        return prefix.raw_table.id
+
     def _prepare_raw_table(
         self,
         conn: DB,
         prefix: Prefix,
-    ) -> None:
+        transient: bool = False,
+    ) -> sql.Identifier:
         with closing(conn.cursor()) as cur:
             if prefix.schema is not None:
                 cur.execute(
@@ -173,26 +343,32 @@ WHERE table_schema = $1 and table_name IN ($2, $3);""",
                     .as_string(),
                 )
         self._drop_raw_table(conn, prefix)
+
+        table = prefix.raw_table.id
+        create = self._create_raw_table_sql
+        if transient:
+            table = self._transient_table(prefix)
+            create = self._create_transient_table_sql
         with closing(conn.cursor()) as cur:
-            cur.execute(
-                self._create_raw_table_sql.format(
-                    table=prefix.raw_table.id,
-                ).as_string(),
-            )
+            cur.execute(create.format(table=table).as_string())
+
+        return table
 
-    def expand_prefix(
+    def expand_prefix(  # noqa: PLR0913
         self,
         prefix: str,
         json_depth: int,
         keep_raw: bool,
         scan_progress: tqdm[NoReturn] | None = None,
         transform_progress: tqdm[NoReturn] | None = None,
+        on_create_statement: Callable[[str, float], None] | None = None,
+        skip_unused: int | None = None,
     ) -> list[str]:
         pfx = Prefix(prefix)
         transform_started = datetime.now(timezone.utc)
         if json_depth < 1:
             with closing(self._conn_factory(True)) as conn:
-                self._drop_extracted_tables(conn, pfx)
+                self._drop_extracted_tables(conn, pfx, skip_unused)
                 if not keep_raw:
                     self._drop_raw_table(conn, pfx)
                 self._transform_complete(conn, pfx, 0, transform_started)
@@ -201,69 +377,287 @@ WHERE table_schema = $1 and table_name IN ($2, $3);""",
                 return []
 
         with closing(self._conn_factory(False)) as conn:
-            tables_to_create = non_srs_statements(
+            shadow_schema: str | None = None
+            output_table: Callable[[str | None], PrefixedTable] = pfx.output_table
+            if self._concurrency > 1:
+                # Tables are built in parallel using multiple connections
+                # so they can't be created in the same transaction.
+                # Instead they're built in a shadow schema and swapped in.
+                shadow_schema = pfx.shadow_schema
+                output_table = pfx.shadow_output_table
+                self._prepare_shadow_schema(conn, shadow_schema)
+
+            try:
+                created = self._expand_prefix(
+                    conn,
+                    pfx,
+                    json_depth,
+                    keep_raw,
+                    output_table,
+                    shadow_schema,
+                    scan_progress
+                    if scan_progress is not None
+                    else tqdm(disable=True, total=0),
+                    transform_progress
+                    if transform_progress is not None
+                    else tqdm(disable=True, total=0),
+                    transform_started,
+                    on_create_statement,
+                    skip_unused,
+                )
+            except Exception:
+                if shadow_schema is not None:
+                    # The original error is more useful than a failed cleanup
+                    with suppress(Exception):
+                        conn.rollback()
+                        self._drop_shadow_schema(conn, shadow_schema)
+                raise
+
+            if shadow_schema is not None:
+                self._drop_shadow_schema(conn, shadow_schema)
+            return created
+
+    def _expand_prefix(  # noqa: PLR0913
+        self,
+        conn: DB,
+        pfx: Prefix,
+        json_depth: int,
+        keep_raw: bool,
+        output_table: Callable[[str | None], PrefixedTable],
+        shadow_schema: str | None,
+        scan_progress: tqdm[NoReturn],
+        transform_progress: tqdm[NoReturn],
+        transform_started: datetime,
+        on_create_statement: Callable[[str, float], None] | None,
+        skip_unused: int | None,
+    ) -> list[str]:
+        profile = StatementProfile(self._profile_statements)
+        profiled = profile.connection(conn)
+
+        scan_started = datetime.now(timezone.utc)
+        tables_to_create = self._expansion_statements(
+            profiled,
+            self._source_table(conn, pfx),
+            json_depth,
+            output_table,
+            shadow_schema,
+            scan_progress,
+            profile,
+        )
+        create_started = datetime.now(timezone.utc)
+
+        transform_progress.total = (
+            (transform_progress.total if transform_progress.total is not None else 0)
+            + len(tables_to_create)
+            + 1
+        )
+        transform_progress.update(1)
+
+        if shadow_schema is not None:
+            self._create_tables_concurrently(
+                tables_to_create,
+                transform_progress,
+                on_create_statement,
+                profile,
+            )
+            self._explain_profile(conn, profile)
+
+        with self._begin(conn):
+            self._drop_extracted_tables(conn, pfx, skip_unused)
+            with profiled.cursor() as cur:
+                for table in tables_to_create:
+                    if shadow_schema is None:
+                        with profile.step("create_statement", table.table):
+                            _execute_create(
+                                cur,
+                                table.statement.as_string(),
+                                on_create_statement,
+                            )
+                        transform_progress.update(1)
+                        continue
+
+                    cur.execute(
+                        sql.SQL("ALTER TABLE {table} SET SCHEMA {schema};")
+                        .format(
+                            table=sql.Identifier(shadow_schema, table.table),
+                            schema=sql.Identifier(
+                                pfx.schema or self._default_schema,
+                            ),
+                        )
+                        .as_string(),
+                    )
+            create_time = datetime.now(timezone.utc) - create_started
+            if shadow_schema is None:
+                self._explain_profile(conn, profile)
+
+            if not keep_raw:
+                self._drop_raw_table(conn, pfx)
+
+            total = 0
+            with conn.cursor() as cur:
+                create_catalog = sql.SQL(
+                    """CREATE TABLE {catalog_table} (table_name text)""",
+                ).format(catalog_table=pfx.catalog_table.id)
+                cur.execute(create_catalog.as_string())
+                if len(tables_to_create) > 0:
+                    insert_catalog = sql.SQL(
+                        "INSERT INTO {catalog_table} VALUES ($1)",
+                    ).format(catalog_table=pfx.catalog_table.id)
+                    cur.executemany(
+                        insert_catalog.as_string(),
+                        [(pfx.catalog_table_row(t.table),) for t in tables_to_create],
+                    )
+
+                    count = sql.SQL("SELECT COUNT(*) FROM {table}").format(
+                        table=pfx.output_table(None).id,
+                    )
+                    cur.execute(count.as_string())
+                    total = cast("tuple[int]", cur.fetchone())[0]
+                transform_progress.update(1)
+
+            if profile.enabled:
+                self._profile_complete(conn, pfx, profile, transform_started)
+            self._transform_complete(
                 conn,
-                pfx.raw_table[1],
-                pfx.output_table,
-                json_depth,
-                scan_progress
-                if scan_progress is not None
-                else tqdm(disable=True, total=0),
+                pfx,
+                total,
+                transform_started,
+                create_started - scan_started,
+                create_time,
+                len(tables_to_create),
             )
 
-            transform_progress = (
-                transform_progress
-                if transform_progress is not None
-                else tqdm(disable=True, total=0)
+        return [pfx.catalog_table_row(t.table) for t in tables_to_create]
+
+    def _expansion_statements(  # noqa: PLR0913
+        self,
+        conn: DB,
+        source_table: sql.Identifier,
+        json_depth: int,
+        output_table: Callable[[str | None], PrefixedTable],
+        shadow_schema: str | None,
+        scan_progress: tqdm[NoReturn],
+        profile: StatementProfile,
+    ) -> list[ExpansionStatement]:
+        return non_srs_statements(
+            conn,
+            source_table,
+            output_table,
+            json_depth,
+            scan_progress,
+            shadow_schema,
+            self._stream_arrays,
+            self._sort_keys,
+            profile,
+        )
+
+    def _explain_profile(self, conn: DB, profile: StatementProfile) -> None:
+        # This has to happen while the scratch and output tables are where
+        # the profiled statements expect them to be.
+        if profile.enabled and self._explain_slowest > 0:
+            profile.explain(
+                self._explain_slowest,
+                lambda query: self._explain(conn, query),
             )
-            transform_progress.total = (
-                (
-                    transform_progress.total
-                    if transform_progress.total is not None
-                    else 0
-                )
-                + len(tables_to_create)
-                + 1
+
+    def _profile_complete(
+        self,
+        conn: DB,
+        pfx: Prefix,
+        profile: StatementProfile,
+        transform_start: datetime,
+    ) -> None:
+        # Only the most recent transform of a prefix is kept
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+DELETE FROM "ldlite_system"."statement_profile_v1"
+WHERE "table_prefix" = $1;
+""",
+                (pfx.load_history_key,),
             )
-            transform_progress.update(1)
+            if len(profile.statements) == 0:
+                return
 
-            with self._begin(conn):
-                self._drop_extracted_tables(conn, pfx)
-                with conn.cursor() as cur:
-                    for _, table in tables_to_create:
-                        cur.execute(table.as_string())
-                        transform_progress.update(1)
+            cur.executemany(
+                """
+INSERT INTO "ldlite_system"."statement_profile_v1"
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9);
+""",
+                [
+                    (
+                        pfx.load_history_key,
+                        transform_start,
+                        i,
+                        s.step,
+                        s.node,
+                        s.statement,
+                        timedelta(seconds=s.duration),
+                        s.rowcount,
+                        s.plan,
+                    )
+                    for (i, s) in enumerate(profile.statements)
+                ],
+            )
 
-                if not keep_raw:
-                    self._drop_raw_table(conn, pfx)
+    def _prepare_shadow_schema(self, conn: DB, shadow_schema: str) -> None:
+        with closing(conn.cursor()) as cur:
+            cur.execute(
+                sql.SQL("CREATE SCHEMA {schema};")
+                .format(schema=sql.Identifier(shadow_schema))
+                .as_string(),
+            )
+        conn.commit()
 
-                total = 0
-                with conn.cursor() as cur:
-                    create_catalog = sql.SQL(
-                        """CREATE TABLE {catalog_table} (table_name text)""",
-                    ).format(catalog_table=pfx.catalog_table.id)
-                    cur.execute(create_catalog.as_string())
-                    if len(tables_to_create) > 0:
-                        insert_catalog = sql.SQL(
-                            "INSERT INTO {catalog_table} VALUES ($1)",
-                        ).format(catalog_table=pfx.catalog_table.id)
-                        cur.executemany(
-                            insert_catalog.as_string(),
-                            [(pfx.catalog_table_row(t[0]),) for t in tables_to_create],
-                        )
+    def _drop_shadow_schema(self, conn: DB, shadow_schema: str) -> None:
+        with closing(conn.cursor()) as cur:
+            cur.execute(
+                sql.SQL("DROP SCHEMA IF EXISTS {schema} CASCADE;")
+                .format(schema=sql.Identifier(shadow_schema))
+                .as_string(),
+            )
+        conn.commit()
 
-                        count = sql.SQL("SELECT COUNT(*) FROM {table}").format(
-                            table=pfx.output_table(None).id,
-                        )
-                        cur.execute(count.as_string())
-                        total = cast("tuple[int]", cur.fetchone())[0]
+    def _create_tables_concurrently(
+        self,
+        tables_to_create: list[ExpansionStatement],
+        transform_progress: tqdm[NoReturn],
+        on_create_statement: Callable[[str, float], None] | None,
+        profile: StatementProfile,
+    ) -> None:
+        # Array tables join to the table of their closest array (or root) parent
+        # so they can be created as soon as that table exists
+        dependents: dict[str | None, list[ExpansionStatement]] = defaultdict(list)
+        for t in tables_to_create:
+            dependents[t.parent].append(t)
+
+        def create(table: ExpansionStatement) -> None:
+            with (
+                profile.step("create_statement", table.table),
+                closing(profile.connection(self._conn_factory(False))) as conn,
+                conn.cursor() as cur,
+            ):
+                _execute_create(cur, table.statement.as_string(), on_create_statement)
+
+        with ThreadPoolExecutor(max_workers=self._concurrency) as pool:
+            creating = {pool.submit(create, t): t for t in dependents[None]}
+            while creating:
+                (done, _) = wait(creating, return_when=FIRST_COMPLETED)
+                for f in done:
+                    created = creating.pop(f)
+                    f.result()
                     transform_progress.update(1)
+                    creating.update(
+                        {pool.submit(create, t): t for t in dependents[created.table]},
+                    )
 
-                self._transform_complete(conn, pfx, total, transform_started)
-
-        return [pfx.catalog_table_row(t[0]) for t in tables_to_create]
-
-    def index_prefix(self, prefix: str, progress: tqdm[NoReturn] | None = None) -> None:
+    def index_prefix(
+        self,
+        prefix: str,
+        progress: tqdm[NoReturn] | None = None,
+        policy: IndexPolicy | None = None,
+        on_create_statement: Callable[[str, float], None] | None = None,
+    ) -> None:
         pfx = Prefix(prefix)
         index_started = datetime.now(timezone.utc)
         with closing(self._conn_factory(False)) as conn:
@@ -280,58 +674,143 @@ WHERE table_schema = $1 and table_name = $2;""",
                 if len(cur.fetchall()) < 1:
                     return
 
+            columns: dict[str, list[tuple[str, str]]] = defaultdict(list)
             with closing(conn.cursor()) as cur:
                 cur.execute(
                     sql.SQL(
-                        r"""
-SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS
+                        """
+SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS
 WHERE
     TABLE_SCHEMA = $1 AND
-    TABLE_NAME IN (SELECT SPLIT_PART(TABLE_NAME, '.', -1) FROM {catalog}) AND
-    (
-        DATA_TYPE IN ('UUID', 'uuid') OR
-        COLUMN_NAME = 'id' OR
-        (COLUMN_NAME LIKE '%\_id' AND COLUMN_NAME <> '__id')
-    );
+    TABLE_NAME IN (SELECT SPLIT_PART(TABLE_NAME, '.', -1) FROM {catalog})
+ORDER BY TABLE_NAME, ORDINAL_POSITION;
 """,
                     )
                     .format(catalog=pfx.catalog_table.id)
                     .as_string(),
                     (pfx.schema or self._default_schema,),
                 )
-                indexes = cur.fetchall()
+                for table, column, data_type in cur.fetchall():
+                    columns[table].append((column, data_type))
+
+            policy = policy or IndexPolicy()
+            indexes = [
+                (pfx.schema or self._default_schema, index)
+                for table, table_columns in columns.items()
+                for index in policy.indexes(table, table_columns)
+                if self._supports_index(index)
+            ]
+            if policy.skip_unused is not None:
+                unused = self._unused_indexes(
+                    conn,
+                    pfx,
+                    [index for (_, index) in indexes],
+                    policy.skip_unused,
+                )
+                indexes = [
+                    (schema, index)
+                    for (schema, index) in indexes
+                    if (index.table, index.columns) not in unused
+                ]
 
             if progress is not None:
                 progress.total = len(indexes)
                 progress.refresh()
 
-            for index in indexes:
-                with closing(conn.cursor()) as cur:
-                    cur.execute(
-                        sql.SQL("CREATE INDEX {name} ON {table} ({column});")
-                        .format(
-                            name=sql.Identifier(str(uuid4()).split("-")[0]),
-                            table=sql.Identifier(index[0], index[1]),
-                            column=sql.Identifier(index[2]),
-                        )
-                        .as_string(),
-                    )
+            if self._concurrency > 1:
+                self._create_indexes_concurrently(
+                    indexes,
+                    progress,
+                    on_create_statement,
+                )
+            else:
+                self._prepare_index_session(conn)
+                for index in indexes:
+                    self._create_index(conn, *index, on_create_statement)
+                    if progress is not None:
+                        progress.update(1)
+
+            self._index_complete(conn, pfx, index_started, len(indexes))
+            conn.commit()
+
+    def _prepare_index_session(self, conn: DB) -> None:
+        """Configures a connection before it is used to build indexes."""
+
+    def _index_method(self, method: IndexMethod) -> sql.Composable | None:
+        """Returns the USING clause for a method or None if it isn't supported."""
+        return sql.SQL(" USING {method}").format(method=sql.Identifier(method))
+
+    def _supports_index(self, index: Index) -> bool:
+        if index.method is None or self._index_method(index.method) is not None:
+            return True
+
+        if index.method not in self._unsupported_methods:
+            self._unsupported_methods.add(index.method)
+            warnings.warn(
+                f"{index.method} indexes aren't supported by "
+                f"{type(self).__name__}, they're skipped",
+                stacklevel=_caller_stacklevel(),
+            )
+        return False
+
+    def _create_index(
+        self,
+        conn: DB,
+        schema: str,
+        index: Index,
+        on_create_statement: Callable[[str, float], None] | None,
+    ) -> None:
+        using: sql.Composable | None = sql.SQL("")
+        if index.method is not None:
+            using = self._index_method(index.method)
+        if using is None:
+            return
+
+        with closing(conn.cursor()) as cur:
+            _execute_create(
+                cur,
+                sql.SQL("CREATE INDEX {name} ON {table}{using} ({columns});")
+                .format(
+                    name=sql.Identifier(str(uuid4()).split("-")[0]),
+                    table=sql.Identifier(schema, index.table),
+                    using=using,
+                    columns=sql.SQL(", ").join(
+                        [sql.Identifier(c) for c in index.columns],
+                    ),
+                )
+                .as_string(),
+                on_create_statement,
+            )
+
+    def _create_indexes_concurrently(
+        self,
+        indexes: Sequence[tuple[str, Index]],
+        progress: tqdm[NoReturn] | None,
+        on_create_statement: Callable[[str, float], None] | None,
+    ) -> None:
+        def create(schema: str, index: Index) -> None:
+            with closing(self._conn_factory(False)) as conn:
+                self._prepare_index_session(conn)
+                self._create_index(conn, schema, index, on_create_statement)
+
+        with ThreadPoolExecutor(max_workers=self._concurrency) as pool:
+            for f in as_completed([pool.submit(create, *i) for i in indexes]):
+                f.result()
                 if progress is not None:
                     progress.update(1)
 
-            self._index_complete(conn, pfx, index_started)
-            conn.commit()
-
     def prepare_history(
         self,
         prefix: str,
         path: str,
         query: str | None,
     ) -> None:
+        load_start = datetime.now(timezone.utc)
         with closing(self._conn_factory(True)) as conn, closing(conn.cursor()) as cur:
-            cur.execute(
-                """
-INSERT INTO "ldlite_system"."load_history_v1"
+            for history in ["load_history_v1", "load_history_v2"]:
+                cur.execute(
+                    sql.SQL("""
+INSERT INTO {history}
 (
     "table_prefix"
     ,"folio_path"
@@ -343,15 +822,29 @@ ON CONFLICT ("table_prefix") DO UPDATE SET
     "folio_path" = EXCLUDED."folio_path"
     ,"query_text" = EXCLUDED."query_text"
     ,"load_start" = EXCLUDED."load_start"
+""")
+                    .format(history=sql.Identifier("ldlite_system", history))
+                    .as_string(),
+                    (
+                        Prefix(prefix).load_history_key,
+                        path,
+                        query,
+                        load_start,
+                    ),
+                )
+            conn.commit()
+
+    def history_rowcount(self, prefix: str) -> int | None:
+        with closing(self._conn_factory(False)) as conn, closing(conn.cursor()) as cur:
+            cur.execute(
+                """
+SELECT "rowcount" FROM "ldlite_system"."load_history_v1"
+WHERE "table_prefix" = $1;
 """,
-                (
-                    Prefix(prefix).load_history_key,
-                    path,
-                    query,
-                    datetime.now(timezone.utc),
-                ),
+                (Prefix(prefix).load_history_key,),
             )
-            conn.commit()
+            row = cur.fetchone()
+            return None if row is None else cast("int | None", row[0])
 
     def _download_complete(
         self,
@@ -359,7 +852,11 @@ ON CONFLICT ("table_prefix") DO UPDATE SET
         pfx: Prefix,
         rowcount: int,
         download_start: datetime,
+        stats: DownloadStats | None = None,
     ) -> None:
+        download_complete = datetime.now(timezone.utc)
+        download_time = download_complete - download_start
+        stats = stats if stats is not None else DownloadStats()
         with conn.cursor() as cur:
             cur.execute(
                 """
@@ -372,18 +869,49 @@ WHERE "table_prefix" = $1;
                 (
                     pfx.load_history_key,
                     rowcount,
-                    datetime.now(timezone.utc),
-                    datetime.now(timezone.utc) - download_start,
+                    download_complete,
+                    download_time,
+                ),
+            )
+            cur.execute(
+                """
+UPDATE "ldlite_system"."load_history_v2" SET
+    "rowcount" = $2
+    ,"download_complete" = $3
+    ,"download_time" = $4
+    ,"download_bytes" = $5
+    ,"download_requests" = $6
+    ,"request_latency_p50" = $7
+    ,"request_latency_p95" = $8
+    ,"records_per_second" = $9
+    ,"peak_rss" = $10
+WHERE "table_prefix" = $1;
+""",
+                (
+                    pfx.load_history_key,
+                    rowcount,
+                    download_complete,
+                    download_time,
+                    stats.bytes,
+                    stats.requests,
+                    stats.latency(0.5),
+                    stats.latency(0.95),
+                    rowcount / max(download_time.total_seconds(), 1e-6),
+                    peak_rss(),
                 ),
             )
 
-    def _transform_complete(
+    def _transform_complete(  # noqa: PLR0913
         self,
         conn: DB,
         pfx: Prefix,
         final_rowcount: int,
         transform_start: datetime,
+        scan_time: timedelta | None = None,
+        create_time: timedelta | None = None,
+        tables_created: int = 0,
     ) -> None:
+        transform_complete = datetime.now(timezone.utc)
         with conn.cursor() as cur:
             cur.execute(
                 """
@@ -399,8 +927,35 @@ WHERE "table_prefix" = $1
                 (
                     pfx.load_history_key,
                     final_rowcount,
-                    datetime.now(timezone.utc),
-                    datetime.now(timezone.utc) - transform_start,
+                    transform_complete,
+                    transform_complete - transform_start,
+                ),
+            )
+            cur.execute(
+                """
+UPDATE "ldlite_system"."load_history_v2" SET
+    "final_rowcount" = $2
+    ,"transform_complete" = $3
+    ,"transform_time" = $4
+    ,"index_time" = NULL
+    ,"indexes_created" = NULL
+    ,"data_refresh_start" = "load_start"
+    ,"data_refresh_end" = "download_complete"
+    ,"scan_time" = $5
+    ,"create_time" = $6
+    ,"tables_created" = $7
+    ,"peak_rss" = $8
+WHERE "table_prefix" = $1
+""",
+                (
+                    pfx.load_history_key,
+                    final_rowcount,
+                    transform_complete,
+                    transform_complete - transform_start,
+                    scan_time,
+                    create_time,
+                    tables_created,
+                    peak_rss(),
                 ),
             )
 
@@ -409,7 +964,9 @@ WHERE "table_prefix" = $1
         conn: DB,
         pfx: Prefix,
         index_start: datetime,
+        indexes_created: int = 0,
     ) -> None:
+        index_time = datetime.now(timezone.utc) - index_start
         with conn.cursor() as cur:
             cur.execute(
                 """
@@ -419,6 +976,21 @@ WHERE "table_prefix" = $1
 """,
                 (
                     pfx.load_history_key,
-                    datetime.now(timezone.utc) - index_start,
+                    index_time,
+                ),
+            )
+            cur.execute(
+                """
+UPDATE "ldlite_system"."load_history_v2" SET
+    "index_time" = $2
+    ,"indexes_created" = $3
+    ,"peak_rss" = $4
+WHERE "table_prefix" = $1
+""",
+                (
+                    pfx.load_history_key,
+                    index_time,
+                    indexes_created,
+                    peak_rss(),
                 ),
             )
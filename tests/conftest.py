@@ -1,5 +1,6 @@
 import contextlib
 from collections.abc import Callable
+from typing import cast
 
 import psycopg
 import pytest
@@ -9,6 +10,7 @@ from psycopg import sql
 
 def pytest_addoption(parser: pytest.Parser) -> None:
     parser.addoption("--pg-host", action="store")
+    parser.addoption("--duckdb-extension", action="store")
     parser.addoption("--folio-base-url", action="store")
     parser.addoption("--folio-tenant", action="store")
     parser.addoption("--folio-username", action="store")
@@ -49,3 +51,8 @@ def pg_dsn(pytestconfig: pytest.Config) -> None | Callable[[str], str]:
         return base_dsn + f" dbname={db}"
 
     return setup
+
+
+@pytest.fixture(scope="session")
+def duckdb_extension(pytestconfig: pytest.Config) -> str | None:
+    return cast("str | None", pytestconfig.getoption("duckdb_extension"))
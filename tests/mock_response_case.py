@@ -19,6 +19,7 @@ class Call:
     json_depth: int = 3
     limit: int | None = None
     keep_raw: bool = True
+    index_policy: "ldlite.IndexPolicy | None" = None
 
     @property
     def returns_list(self) -> list["ldlite._jsonx.Json"]:
@@ -76,4 +77,39 @@ class MockedResponseTestCase:
 
             side_effects.extend([total_mock, *value_mocks, end_mock])
 
+        for res in side_effects:
+            res.num_bytes_downloaded = len(res.text)
+
         client_get_mock.side_effect = side_effects
+
+
+def patch_folio_paths(
+    client_get_mock: MagicMock,
+    httpx_post_mock: MagicMock,
+    records: dict[str, int],
+) -> None:
+    httpx_post_mock.return_value.cookies.__getitem__.return_value = "token"
+
+    # Loads run in parallel so responses are keyed by path instead of call order
+    calls: dict[str, int] = {}
+
+    def get(path: str, **_: object) -> MagicMock:
+        if path == "/fail":
+            msg = "FOLIO is down"
+            raise RuntimeError(msg)
+
+        calls[path] = calls.get(path, -1) + 1
+        res = MagicMock()
+        if calls[path] == 0:
+            res.text = f'{{"records": [{{"id": ""}}], "totalRecords": {records[path]}}}'
+        elif calls[path] == 1:
+            res.text = json.dumps(
+                {"records": [{"id": f"{path}-{i}"} for i in range(records[path])]},
+            )
+        else:
+            res.text = '{"records": []}'
+            del calls[path]
+        res.num_bytes_downloaded = len(res.text)
+        return res
+
+    client_get_mock.side_effect = get
@@ -0,0 +1,472 @@
+"""A local stand-in for FOLIO serving seeded, synthetic records.
+
+The records are generated on demand from their position so any volume can be
+served without holding it in memory. Ids increase with the position which lets
+the server answer id paging without sorting.
+"""
+
+import json
+import random
+import threading
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from typing import TYPE_CHECKING, Any, Literal, cast
+from urllib.parse import parse_qs, urlsplit
+
+from httpx_folio.auth import FolioParams
+
+if TYPE_CHECKING:
+    from ldlite import LDLite
+
+Kind = Literal["instances", "items", "users", "srs"]
+
+_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+_WORDS = (
+    "library",
+    "alpha",
+    "beta",
+    "circulation",
+    "data",
+    "folio",
+    "gamma",
+    "history",
+    "journal",
+    "knowledge",
+    "letters",
+    "maps",
+    "notes",
+    "omega",
+    "poetry",
+    "quarterly",
+    "review",
+    "science",
+    "theory",
+    "university",
+    "volume",
+    "world",
+)
+
+
+def _uuid(rng: random.Random) -> str:
+    return (
+        f"{rng.getrandbits(32):08x}-{rng.getrandbits(16):04x}-"
+        f"4{rng.getrandbits(12):03x}-{8 | rng.getrandbits(2):x}"
+        f"{rng.getrandbits(12):03x}-{rng.getrandbits(48):012x}"
+    )
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _date(rng: random.Random) -> str:
+    d = _EPOCH + timedelta(seconds=rng.randrange(5 * 365 * 24 * 60 * 60))
+    return d.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _metadata(rng: random.Random) -> dict[str, Any]:
+    return {
+        "createdDate": _date(rng),
+        "createdByUserId": _uuid(rng),
+        "updatedDate": _date(rng),
+        "updatedByUserId": _uuid(rng),
+    }
+
+
+@dataclass(frozen=True)
+class SyntheticRecords:
+    """A seeded set of FOLIO-shaped records.
+
+    Attributes:
+        kind: The shape of the records.
+        count: The number of records.
+        seed: Records with the same seed, kind, and position are identical.
+        array_size: The most elements in each generated array.
+        nesting: Levels of nested arrays of objects added to each record.
+    """
+
+    kind: Kind
+    count: int
+    seed: int = 0
+    array_size: int = 3
+    nesting: int = 0
+
+    @property
+    def key(self) -> str:
+        """The property holding the records in a page of results."""
+        return "records" if self.kind == "srs" else self.kind
+
+    def id(self, i: int) -> str:
+        """The id of the record at position *i*, ids sort in position order."""
+        return f"{i:08x}-{self.seed % 0x10000:04x}-4000-8000-{i * 7919 % 16**12:012x}"
+
+    def after(self, last_id: str) -> int:
+        """The position of the first record with an id greater than *last_id*."""
+        i = int(last_id[:8], 16)
+        return i if self.id(i) > last_id.lower() else i + 1
+
+    def record(self, i: int) -> dict[str, Any]:
+        """The record at position *i*."""
+        rng = random.Random(f"{self.seed}:{self.kind}:{i}")
+        r = cast("dict[str, Any]", getattr(self, "_" + self.kind)(rng, i))
+        if self.nesting > 0:
+            r["extensions"] = self._extensions(rng, self.nesting)
+        return r
+
+    def records(self, start: int = 0, stop: int | None = None) -> Iterator[bytes]:
+        """The serialized records from position *start* up to *stop*."""
+        for i in range(start, min(self.count, stop or self.count)):
+            yield json.dumps(self.record(i)).encode()
+
+    def _array(self, rng: random.Random) -> range:
+        return range(rng.randint(0, self.array_size))
+
+    def _extensions(self, rng: random.Random, depth: int) -> list[dict[str, Any]]:
+        return [
+            {
+                "name": _words(rng, 1),
+                "value": rng.randrange(1000),
+                **(
+                    {"extensions": self._extensions(rng, depth - 1)}
+                    if depth > 1
+                    else {}
+                ),
+            }
+            for _ in range(max(self.array_size, 1))
+        ]
+
+    def _instances(self, rng: random.Random, i: int) -> dict[str, Any]:
+        return {
+            "id": self.id(i),
+            "_version": rng.randint(1, 5),
+            "hrid": f"in{i:011}",
+            "source": rng.choice(["FOLIO", "MARC"]),
+            "title": _words(rng, rng.randint(2, 8)).capitalize(),
+            "instanceTypeId": _uuid(rng),
+            "discoverySuppress": rng.random() < 0.05,
+            "previouslyHeld": False,
+            "catalogedDate": _date(rng)[:10],
+            "identifiers": [
+                {
+                    "value": f"{rng.randrange(10**12):013}",
+                    "identifierTypeId": _uuid(rng),
+                }
+                for _ in self._array(rng)
+            ],
+            "contributors": [
+                {
+                    "name": _words(rng, 2).title(),
+                    "contributorNameTypeId": _uuid(rng),
+                    "primary": n == 0,
+                }
+                for n in self._array(rng)
+            ],
+            "subjects": [{"value": _words(rng, 3)} for _ in self._array(rng)],
+            "publication": [
+                {
+                    "publisher": _words(rng, 2).title(),
+                    "place": _words(rng, 1).title(),
+                    "dateOfPublication": str(rng.randint(1800, 2025)),
+                }
+                for _ in self._array(rng)
+            ],
+            "languages": [rng.choice(["eng", "fre", "ger", "spa"])],
+            "tags": {"tagList": [_words(rng, 1) for _ in self._array(rng)]},
+            "metadata": _metadata(rng),
+        }
+
+    def _items(self, rng: random.Random, i: int) -> dict[str, Any]:
+        return {
+            "id": self.id(i),
+            "_version": rng.randint(1, 5),
+            "hrid": f"it{i:011}",
+            "holdingsRecordId": _uuid(rng),
+            "barcode": str(rng.randrange(10**13)),
+            "copyNumber": str(rng.randint(1, 3)),
+            "status": {
+                "name": rng.choice(["Available", "Checked out", "Missing"]),
+                "date": _date(rng),
+            },
+            "materialTypeId": _uuid(rng),
+            "permanentLoanTypeId": _uuid(rng),
+            "effectiveLocationId": _uuid(rng),
+            "effectiveCallNumberComponents": {
+                "callNumber": f"QA{rng.randrange(1000)} .{_words(rng, 1)[0].upper()}",
+                "typeId": _uuid(rng),
+            },
+            "yearCaption": [str(rng.randint(1900, 2025)) for _ in self._array(rng)],
+            "notes": [
+                {
+                    "note": _words(rng, 6),
+                    "itemNoteTypeId": _uuid(rng),
+                    "staffOnly": rng.random() < 0.5,
+                }
+                for _ in self._array(rng)
+            ],
+            "circulationNotes": [
+                {
+                    "id": _uuid(rng),
+                    "noteType": rng.choice(["Check in", "Check out"]),
+                    "note": _words(rng, 4),
+                    "source": {
+                        "id": _uuid(rng),
+                        "personal": {"lastName": _words(rng, 1).title()},
+                    },
+                    "date": _date(rng),
+                }
+                for _ in self._array(rng)
+            ],
+            "metadata": _metadata(rng),
+        }
+
+    def _users(self, rng: random.Random, i: int) -> dict[str, Any]:
+        first, last = _words(rng, 1).title(), _words(rng, 1).title()
+        return {
+            "id": self.id(i),
+            "username": f"{first[0]}{last}{i}".lower(),
+            "barcode": str(rng.randrange(10**10)),
+            "active": rng.random() < 0.9,
+            "type": "patron",
+            "patronGroup": _uuid(rng),
+            "departments": [_uuid(rng) for _ in self._array(rng)],
+            "personal": {
+                "lastName": last,
+                "firstName": first,
+                "email": f"{first}.{last}@example.edu".lower(),
+                "addresses": [
+                    {
+                        "addressTypeId": _uuid(rng),
+                        "city": _words(rng, 1).title(),
+                        "postalCode": f"{rng.randrange(10**5):05}",
+                        "primaryAddress": n == 0,
+                    }
+                    for n in self._array(rng)
+                ],
+                "preferredContactTypeId": "002",
+            },
+            "enrollmentDate": _date(rng),
+            "expirationDate": _date(rng),
+            "metadata": _metadata(rng),
+        }
+
+    def _srs(self, rng: random.Random, i: int) -> dict[str, Any]:
+        instance_id = _uuid(rng)
+        return {
+            "id": self.id(i),
+            "snapshotId": _uuid(rng),
+            "matchedId": _uuid(rng),
+            "generation": 0,
+            "recordType": "MARC_BIB",
+            "state": "ACTUAL",
+            "order": i,
+            "deleted": False,
+            "parsedRecord": {
+                "id": _uuid(rng),
+                "content": {
+                    "leader": "01234cam a2200301 a 4500",
+                    "fields": [
+                        {"001": f"in{i:011}"},
+                        {"008": f"{rng.randrange(10**6):06}s2000 xx eng d"},
+                        *[
+                            {
+                                tag: {
+                                    "ind1": " ",
+                                    "ind2": str(rng.randint(0, 9)),
+                                    "subfields": [
+                                        {code: _words(rng, 3)}
+                                        for code in "abc"[: rng.randint(1, 3)]
+                                    ],
+                                },
+                            }
+                            for tag in ("100", "245", "260", "300", "650")
+                        ],
+                        {
+                            "999": {
+                                "ind1": "f",
+                                "ind2": "f",
+                                "subfields": [{"i": instance_id}, {"s": self.id(i)}],
+                            },
+                        },
+                    ],
+                },
+            },
+            "externalIdsHolder": {"instanceId": instance_id, "instanceHrid": f"in{i}"},
+            "additionalInfo": {"suppressDiscovery": False},
+            "metadata": _metadata(rng),
+        }
+
+
+def connect(ld: "LDLite", params: FolioParams) -> None:
+    """Points ld at a synthetic FOLIO.
+
+    connect_folio only accepts https urls so the client is given to ld directly.
+    """
+    from ldlite._folio import FolioClient
+
+    ld._folio = FolioClient(params)  # noqa: SLF001
+
+
+_STREAMS = {
+    "/source-storage/stream/records": "/source-storage/records",
+    "/source-storage/stream/source-records": "/source-storage/source-records",
+}
+
+
+@dataclass
+class SyntheticFolio:
+    """Serves synthetic records over http on a random local port.
+
+    Only the parts of FOLIO used by LDLite are implemented: logging in,
+    totalRecords stats, offset and id paging, and the SRS streaming endpoints.
+    Queries other than id ranges are ignored and return every record.
+
+    Example:
+        with SyntheticFolio({"/users": SyntheticRecords("users", 1000)}) as folio:
+            connect(ld, folio.params)
+
+    Attributes:
+        datasets: The records served by each path.
+        latency: The seconds to wait before responding to each request.
+        requests: The number of requests received, including logging in.
+    """
+
+    datasets: Mapping[str, SyntheticRecords]
+    latency: float = 0
+    requests: int = field(default=0, init=False)
+    _server: ThreadingHTTPServer | None = field(default=None, init=False, repr=False)
+    # Requests are handled on their own threads
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock,
+        init=False,
+        repr=False,
+    )
+
+    @property
+    def url(self) -> str:
+        """The base url to connect to."""
+        if self._server is None:
+            msg = "The server is not running."
+            raise RuntimeError(msg)
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def params(self) -> FolioParams:
+        """Connection parameters for the server, any credentials are accepted."""
+        return FolioParams(self.url, "tenant", "user", "password")
+
+    def start(self) -> None:
+        """Starts serving in a background thread."""
+        folio = self
+
+        class Handler(_Handler):
+            server_folio = folio
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "SyntheticFolio":
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_folio: SyntheticFolio
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_: Any) -> None:  # noqa: ANN401
+        # keep the test and benchmark output clean
+        pass
+
+    def _respond(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _wait(self) -> None:
+        with self.server_folio._lock:  # noqa: SLF001
+            self.server_folio.requests += 1
+        if self.server_folio.latency > 0:
+            sleep(self.server_folio.latency)
+
+    def do_POST(self) -> None:
+        self._wait()
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if urlsplit(self.path).path != "/authn/login-with-expiry":
+            self._respond(HTTPStatus.NOT_FOUND, b"{}")
+            return
+
+        self._respond(
+            HTTPStatus.CREATED,
+            b"{}",
+            {"Set-Cookie": "folioAccessToken=synthetic; Path=/"},
+        )
+
+    def do_GET(self) -> None:
+        self._wait()
+        if self.headers.get("x-okapi-token") != "synthetic":
+            self._respond(HTTPStatus.UNAUTHORIZED, b"{}")
+            return
+
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path in _STREAMS and (
+            records := self.server_folio.datasets.get(_STREAMS[url.path])
+        ):
+            self._stream(records)
+            return
+
+        if (records := self.server_folio.datasets.get(url.path)) is None:
+            self._respond(HTTPStatus.NOT_FOUND, b"{}")
+            return
+
+        limit = int(params.get("limit", params.get("perPage", 10)))
+        start = int(params.get("offset", 0))
+        query = params.get("query", "")
+        if query.startswith("id>"):
+            start = records.after(query[3:].split(" ", 1)[0])
+
+        page = b",".join(records.records(start, start + limit))
+        self._respond(
+            HTTPStatus.OK,
+            b'{"%s": [%s], "totalRecords": %d}'
+            % (records.key.encode(), page, records.count),
+        )
+
+    def _stream(self, records: SyntheticRecords) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for r in records.records():
+                chunk = r + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        except ConnectionError:
+            # LDLite stops reading the stream once it reaches the limit
+            self.close_connection = True
@@ -0,0 +1,38 @@
+from pytest_cases import parametrize
+
+
+@parametrize(
+    "value,expected",
+    [
+        ("", ""),
+        ("id", "id"),
+        ("holdingsRecordId", "holdings_record_id"),
+        ("ISBNValue", "isbn_value"),
+        ("URL", "url"),
+        ("HTMLParser2XML", "html_parser2_xml"),
+        ("_camelCase", "_camel_case"),
+        ("already_snake", "already_snake"),
+    ],
+)
+def test_decode_camel_case(value: str, expected: str) -> None:
+    from ldlite._camelcase import decode_camel_case
+
+    assert decode_camel_case(value) == expected
+
+
+@parametrize(
+    "value,expected",
+    [
+        ("", ""),
+        ("id", "id"),
+        ("holdingsRecordId", "holdings_record_id"),
+        ("ISBNValue", "i_s_b_n_value"),
+        ("CamelCase", "camel_case"),
+        ("_camelCase", "_camel_case"),
+        ("__CamelCase", "__camel_case"),
+    ],
+)
+def test_snake_case(value: str, expected: str) -> None:
+    from ldlite._camelcase import snake_case
+
+    assert snake_case(value) == expected
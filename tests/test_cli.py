@@ -0,0 +1,153 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+from unittest import mock
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import psycopg
+import pytest
+
+from .mock_response_case import patch_folio_paths
+
+MANIFEST = """
+[[tables]]
+table = "small"
+path = "/small"
+
+[[tables]]
+table = "large"
+path = "/large"
+
+[[tables]]
+table = "failed"
+path = "/fail"
+"""
+
+
+def test_required_arguments(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    from ldlite._cli import main
+
+    monkeypatch.delenv("LDLITE_FOLIO_PASSWORD", raising=False)
+    with pytest.raises(SystemExit) as exit_info:
+        main(["manifest.toml", "--dsn=host=localhost"])
+
+    assert exit_info.value.code == 2
+    assert "--folio-url is required" in capsys.readouterr().err
+
+
+@mock.patch("httpx_folio.auth.httpx.post")
+@mock.patch("httpx_folio.factories.httpx.Client.get")
+def test_unreachable_database(
+    client_get_mock: MagicMock,
+    httpx_post_mock: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    from ldlite._cli import main
+
+    patch_folio_paths(client_get_mock, httpx_post_mock, {})
+    manifest = tmp_path / "manifest.toml"
+    manifest.write_text(MANIFEST)
+
+    monkeypatch.setenv("LDLITE_FOLIO_PASSWORD", "")
+    with pytest.raises(SystemExit) as exit_info:
+        main(
+            [
+                str(manifest),
+                "--dsn=host=127.0.0.1 port=1 connect_timeout=1",
+                "--folio-url=https://doesnt.matter",
+                "--folio-tenant=",
+                "--folio-user=",
+            ],
+        )
+
+    assert exit_info.value.code == 2
+    (error,) = capsys.readouterr().err.splitlines()[-1:]
+    assert error.startswith("ldlite: error: connection")
+
+
+def test_recently_loaded_without_history(
+    pg_dsn: None | Callable[[str], str],
+) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite._cli import _recently_loaded
+
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    assert _recently_loaded(dsn, ["small"], 1) == set()
+
+
+def _statuses(summary: Path) -> dict[str, str]:
+    return {t["table"]: t["status"] for t in json.loads(summary.read_text())["tables"]}
+
+
+@mock.patch("httpx_folio.auth.httpx.post")
+@mock.patch("httpx_folio.factories.httpx.Client.get")
+def test_main(
+    client_get_mock: MagicMock,
+    httpx_post_mock: MagicMock,
+    pg_dsn: None | Callable[[str], str],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite._cli import main
+
+    patch_folio_paths(client_get_mock, httpx_post_mock, {"/small": 1, "/large": 3})
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    manifest = tmp_path / "manifest.toml"
+    manifest.write_text(MANIFEST)
+    summary = tmp_path / "summary.json"
+
+    monkeypatch.setenv("LDLITE_DSN", dsn)
+    monkeypatch.setenv("LDLITE_FOLIO_URL", "https://doesnt.matter")
+    monkeypatch.setenv("LDLITE_FOLIO_TENANT", "")
+    monkeypatch.setenv("LDLITE_FOLIO_USER", "")
+    monkeypatch.setenv("LDLITE_FOLIO_PASSWORD", "")
+    args = [str(manifest), "--quiet", "--folio-concurrency=2", f"--summary={summary}"]
+
+    assert main(args) == 1
+    assert _statuses(summary) == {
+        "small": "loaded",
+        "large": "loaded",
+        "failed": "failed",
+    }
+    with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM public.large__t")
+        assert cur.fetchone() == (3,)
+
+    client_get_mock.reset_mock()
+    assert main([*args, f"--resume={summary}"]) == 1
+    assert _statuses(summary) == {
+        "small": "skipped",
+        "large": "skipped",
+        "failed": "failed",
+    }
+    assert {c.args[0] for c in client_get_mock.call_args_list} == {"/fail"}
+
+    # Tables which were only skipped by the previous run are loaded again
+    assert main([*args, f"--resume={summary}"]) == 1
+    assert _statuses(summary) == {
+        "small": "loaded",
+        "large": "loaded",
+        "failed": "failed",
+    }
+
+    client_get_mock.reset_mock()
+    assert main([*args, "--incremental=1"]) == 1
+    assert _statuses(summary) == {
+        "small": "skipped",
+        "large": "skipped",
+        "failed": "failed",
+    }
+
+    assert main([*args, "--incremental=0"]) == 1
+    assert _statuses(summary)["large"] == "loaded"
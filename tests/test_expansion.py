@@ -2,6 +2,7 @@ from collections.abc import Callable
 from contextlib import closing
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, cast
+from unittest import mock
 from uuid import uuid4
 
 import duckdb
@@ -41,6 +42,7 @@ class ExpansionTC:
     assertions: list[Assertion]
     json_depth: int = 999
     keep_raw: bool = True
+    transient: bool = False
 
 
 def case_typed_columns() -> ExpansionTC:
@@ -772,6 +774,40 @@ WHERE COLUMN_NAME IN (
     )
 
 
+def case_sorted_keys() -> ExpansionTC:
+    return ExpansionTC(
+        records=[
+            b"""{ "id": "id2", "list": [3, 2] }""",
+            b"""{ "id": "id3", "list": [1] }""",
+            b"""{ "id": "id1", "list": [5, 4] }""",
+        ],
+        assertions=[
+            Assertion(
+                "SELECT id FROM tests.prefix__t",
+                exp_pg=[("id2",), ("id3",), ("id1",)],
+                exp_duck=[("id1",), ("id2",), ("id3",)],
+            ),
+            Assertion(
+                "SELECT id, list__o, list FROM tests.prefix__t__list",
+                exp_pg=[
+                    ("id2", 1, 3),
+                    ("id2", 2, 2),
+                    ("id3", 1, 1),
+                    ("id1", 1, 5),
+                    ("id1", 2, 4),
+                ],
+                exp_duck=[
+                    ("id1", 1, 5),
+                    ("id1", 2, 4),
+                    ("id2", 1, 3),
+                    ("id2", 2, 2),
+                    ("id3", 1, 1),
+                ],
+            ),
+        ],
+    )
+
+
 def case_keep_raw() -> ExpansionTC:
     return ExpansionTC(
         keep_raw=True,
@@ -812,6 +848,34 @@ WHERE TABLE_NAME = 'prefix'
     )
 
 
+def case_transient_raw() -> ExpansionTC:
+    return ExpansionTC(
+        keep_raw=False,
+        transient=True,
+        records=[
+            b"""{ "id": "id1" }""",
+            b"""{ "id": "id2" }""",
+        ],
+        assertions=[
+            Assertion(
+                """
+SELECT COUNT(*)
+FROM INFORMATION_SCHEMA.TABLES
+WHERE TABLE_NAME = 'prefix'
+""",
+                0,
+            ),
+            Assertion(
+                """
+SELECT COUNT(*)
+FROM tests.prefix__t
+""",
+                2,
+            ),
+        ],
+    )
+
+
 def _assert(
     conn: "dbapi.DBAPIConnection",
     db: str,
@@ -834,25 +898,47 @@ def _assert(
                     assert actual[0] == a.expected(db)
 
 
+@parametrize(raw_json=[False, True])
+@parametrize(native_expansion=[False, True])
+@parametrize(stream_arrays=[False, True])
 @parametrize_with_cases("tc", cases=".")
-def test_duckdb(tc: ExpansionTC) -> None:
+def test_duckdb(
+    tc: ExpansionTC,
+    stream_arrays: bool,
+    native_expansion: bool,
+    raw_json: bool,
+) -> None:
     from ldlite import LDLite
 
     dsn = f":memory:{_db()}"
 
     ld = LDLite()
-    ld.connect_db(dsn)
+    ld.connect_db(
+        dsn,
+        stream_arrays=stream_arrays,
+        native_expansion=native_expansion,
+        raw_json=raw_json,
+    )
     assert ld.database_experimental is not None
 
-    ld.database_experimental.ingest_records("tests.prefix", iter(tc.records))
+    ld.database_experimental.ingest_records(
+        "tests.prefix",
+        iter(tc.records),
+        tc.transient,
+    )
     ld.database_experimental.expand_prefix("tests.prefix", tc.json_depth, tc.keep_raw)
 
     with duckdb.connect(dsn) as conn:
         _assert(cast("dbapi.DBAPIConnection", conn), "duckdb", tc)
 
 
+@parametrize(stream_arrays=[False, True])
 @parametrize_with_cases("tc", cases=".")
-def test_postgres(pg_dsn: None | Callable[[str], str], tc: ExpansionTC) -> None:
+def test_postgres(
+    pg_dsn: None | Callable[[str], str],
+    tc: ExpansionTC,
+    stream_arrays: bool,
+) -> None:
     if pg_dsn is None:
         pytest.skip("Specify the pg host using --pg-host to run")
 
@@ -861,11 +947,100 @@ def test_postgres(pg_dsn: None | Callable[[str], str], tc: ExpansionTC) -> None:
     dsn = pg_dsn(_db())
 
     ld = LDLite()
-    ld.connect_db_postgresql(dsn)
+    ld.connect_db_postgresql(dsn, stream_arrays=stream_arrays)
     assert ld.database_experimental is not None
 
-    ld.database_experimental.ingest_records("tests.prefix", iter(tc.records))
+    ld.database_experimental.ingest_records(
+        "tests.prefix",
+        iter(tc.records),
+        tc.transient,
+    )
     ld.database_experimental.expand_prefix("tests.prefix", tc.json_depth, tc.keep_raw)
 
     with psycopg.connect(dsn, cursor_factory=psycopg.RawCursor) as conn:
         _assert(cast("dbapi.DBAPIConnection", conn), "postgres", tc)
+
+
+@parametrize(stream_arrays=[False, True])
+@parametrize_with_cases("tc", cases=".")
+def test_postgres_concurrent(
+    pg_dsn: None | Callable[[str], str],
+    tc: ExpansionTC,
+    stream_arrays: bool,
+) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite import LDLite
+
+    dsn = pg_dsn(_db())
+
+    ld = LDLite()
+    ld.connect_db_postgresql(dsn, concurrency=4, stream_arrays=stream_arrays)
+    assert ld.database_experimental is not None
+
+    ld.database_experimental.ingest_records(
+        "tests.prefix",
+        iter(tc.records),
+        tc.transient,
+    )
+    ld.database_experimental.expand_prefix("tests.prefix", tc.json_depth, tc.keep_raw)
+
+    with psycopg.connect(dsn, cursor_factory=psycopg.RawCursor) as conn:
+        _assert(cast("dbapi.DBAPIConnection", conn), "postgres", tc)
+
+        with closing(conn.cursor()) as cur:
+            cur.execute(
+                """
+SELECT COUNT(*) FROM INFORMATION_SCHEMA.SCHEMATA
+WHERE SCHEMA_NAME LIKE 'tests_prefix__t_shadow%'
+""",
+            )
+            assert cur.fetchone() == (0,)
+
+
+def test_postgres_concurrent_failure(pg_dsn: None | Callable[[str], str]) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite import LDLite
+
+    dsn = pg_dsn(_db())
+
+    ld = LDLite()
+    ld.connect_db_postgresql(dsn, concurrency=4)
+    assert ld.database_experimental is not None
+
+    ld.database_experimental.ingest_records(
+        "tests.prefix",
+        iter([b'{"id": "id1", "value": "value1"}']),
+    )
+    with (
+        mock.patch(
+            "ldlite.database._typed_database.TypedDatabase._create_tables_concurrently",
+            side_effect=RuntimeError("expansion failed"),
+        ),
+        pytest.raises(RuntimeError, match="expansion failed"),
+    ):
+        ld.database_experimental.expand_prefix("tests.prefix", 999, True)
+
+    with psycopg.connect(dsn) as conn, closing(conn.cursor()) as cur:
+        cur.execute(
+            """
+SELECT COUNT(*) FROM INFORMATION_SCHEMA.SCHEMATA
+WHERE SCHEMA_NAME LIKE 'tests_prefix__t_shadow%'
+""",
+        )
+        assert cur.fetchone() == (0,)
+
+
+def test_shadow_schema_per_load() -> None:
+    from ldlite.database._prefix import Prefix
+
+    pfx = Prefix("tests.prefix")
+    assert pfx.shadow_schema == pfx.shadow_schema
+    assert pfx.shadow_output_table(None).id == psycopg.sql.Identifier(
+        pfx.shadow_schema,
+        "prefix__t",
+    )
+    assert pfx.shadow_schema != Prefix("tests.prefix").shadow_schema
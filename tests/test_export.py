@@ -0,0 +1,237 @@
+import csv
+import gzip
+import sys
+from collections.abc import Callable
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+import duckdb
+import pytest
+
+if TYPE_CHECKING:
+    from ldlite import LDLite
+
+
+def _read(path: Path) -> list[list[str]]:
+    if path.suffix == ".gz":
+        with gzip.open(path, "rt", newline="") as f:
+            return list(csv.reader(f))
+    with path.open(newline="") as f:
+        return list(csv.reader(f))
+
+
+VALUES = "SELECT * FROM (VALUES (1, 'a,\"b\"'), (2, NULL)) v(id, s)"
+ROWS = [["id", "s"], ["1", 'a,"b"'], ["2", ""]]
+
+
+def test_export_csv_duckdb(tmp_path: Path) -> None:
+    from ldlite import LDLite
+
+    ld = LDLite()
+    db = ld.connect_db()
+    db.execute("CREATE TABLE t AS " + VALUES)
+
+    ld.export_csv(str(tmp_path / "t.csv"), "t")
+    assert _read(tmp_path / "t.csv") == ROWS
+    ld.export_csv(str(tmp_path / "n.csv"), "t", header=False)
+    assert _read(tmp_path / "n.csv") == ROWS[1:]
+    ld.export_csv(str(tmp_path / "t.csv.gz"), "t", compression="gzip")
+    assert _read(tmp_path / "t.csv.gz") == ROWS
+
+    with pytest.raises(ValueError, match="compression"):
+        ld.export_csv(str(tmp_path / "t.csv"), "t", compression="zip")
+
+
+def test_export_csv_copy_postgres(
+    pg_dsn: None | Callable[[str], str],
+    tmp_path: Path,
+) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite import LDLite
+
+    ld = LDLite()
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    with closing(ld.connect_db_postgresql(dsn)) as pg:
+        pg.execute("CREATE SCHEMA s")
+        pg.execute("CREATE TABLE s.t AS " + VALUES)
+        # More rows than a single write
+        pg.execute(
+            "CREATE TABLE big AS SELECT i AS id, repeat('x', 100) AS s "
+            "FROM generate_series(1, 20000) i",
+        )
+
+        ld.export_csv(str(tmp_path / "t.csv"), "s.t", use_copy=True)
+        ld.export_csv(str(tmp_path / "n.csv"), "s.t", header=False, use_copy=True)
+        ld.export_csv(
+            str(tmp_path / "t.csv.gz"),
+            "s.t",
+            compression="gzip",
+            use_copy=True,
+        )
+        ld.export_csv(str(tmp_path / "big.csv"), "big", use_copy=True)
+        if sys.version_info < (3, 14):
+            with pytest.raises(ValueError, match="zstd"):
+                ld.export_csv(
+                    str(tmp_path / "t.csv.zst"),
+                    "big",
+                    compression="zstd",
+                    use_copy=True,
+                )
+
+        # The table isn't locked by the export
+        pg.execute("DROP TABLE s.t")
+
+    # The rows are copied without DuckDB
+    assert ld._attached is None  # noqa: SLF001
+    assert _read(tmp_path / "t.csv") == ROWS
+    assert _read(tmp_path / "n.csv") == ROWS[1:]
+    assert _read(tmp_path / "t.csv.gz") == ROWS
+    big = _read(tmp_path / "big.csv")
+    assert len(big) == 20001
+    assert big[-1] == ["20000", "x" * 100]
+
+
+def test_attached_postgres(
+    pg_dsn: None | Callable[[str], str],
+    duckdb_extension: str | None,
+    tmp_path: Path,
+) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite import LDLite
+
+    ld = LDLite()
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    pg = ld.connect_db_postgresql(dsn, duckdb_extension=duckdb_extension)
+    with closing(pg):
+        pg.execute("CREATE TABLE t AS SELECT * FROM (VALUES (1, 'a')) v(id, s)")
+        ld.export_parquet(str(tmp_path / "t.parquet"), "t")
+        attached = ld._attached  # noqa: SLF001
+
+        # Tables created after the session was attached are exported too
+        pg.execute("CREATE TABLE u AS SELECT 'b' AS s")
+        ld.select("u")
+        ld.export_csv(str(tmp_path / "u.csv.zst"), "u", compression="zstd")
+
+    assert ld._attached is attached  # noqa: SLF001
+    with duckdb.connect() as duck:
+        assert duck.execute(
+            f"SELECT * FROM read_csv('{tmp_path / 'u.csv.zst'}')",
+        ).fetchall() == [("b",)]
+
+
+RECORDS = [
+    b'{"id": "b096504a-3d54-4664-9bf5-1b872466fd66", "tags": ["x"]}',
+    b'{"id": "b096504a-9999-4664-9bf5-1b872466fd66", "tags": ["y"]}',
+]
+
+
+def test_export_parquet_duckdb(tmp_path: Path) -> None:
+    import duckdb
+
+    from ldlite import LDLite
+
+    ld = LDLite()
+    db = ld.connect_db()
+    db.execute(
+        "CREATE TABLE t AS SELECT range AS __id, "
+        "CASE WHEN range < 3000 THEN 'a' ELSE 'b' END AS s FROM range(5000)",
+    )
+
+    ld.export_parquet(str(tmp_path / "t.parquet"), "t", row_group_size=2048)
+    with duckdb.connect() as duck:
+        assert duck.execute(
+            "SELECT compression, row_group_num_rows "
+            f"FROM parquet_metadata('{tmp_path / 't.parquet'}') "
+            "WHERE path_in_schema = 's' ORDER BY row_group_id",
+        ).fetchall() == [("ZSTD", 2048), ("ZSTD", 2048), ("ZSTD", 904)]
+
+    ld.export_parquet(str(tmp_path / "p"), "t", partition_by=["s"])
+    assert sorted(p.name for p in (tmp_path / "p").iterdir()) == ["s=a", "s=b"]
+    with duckdb.connect() as duck:
+        assert duck.execute(
+            "SELECT s, COUNT(*) FROM read_parquet("
+            f"'{tmp_path / 'p'}/**', hive_partitioning=true) GROUP BY s ORDER BY s",
+        ).fetchall() == [("a", 3000), ("b", 2000)]
+
+    with pytest.raises(ValueError, match="compression"):
+        ld.export_parquet(str(tmp_path / "t.parquet"), "t", compression="zip")
+
+
+def _export_tables(ld: "LDLite", directory: Path) -> None:
+    assert ld.database_experimental is not None
+    ld.database_experimental.ingest_records("s.prefix", iter(RECORDS))
+    ld.database_experimental.expand_prefix("s.prefix", 2, keep_raw=True)
+
+    assert ld.export_parquet_tables(
+        str(directory),
+        "s.prefix",
+        partition_by=["tags"],
+        compression="snappy",
+    ) == ["s.prefix__t", "s.prefix__t__tags"]
+
+    # Only the table of the tags array has the column to partition by
+    assert sorted(p.name for p in directory.iterdir()) == [
+        "s.prefix__t.parquet",
+        "s.prefix__t__tags",
+    ]
+    assert (directory / "s.prefix__t.parquet").is_file()
+    assert sorted(p.name for p in (directory / "s.prefix__t__tags").iterdir()) == [
+        "tags=x",
+        "tags=y",
+    ]
+
+
+def test_export_parquet_tables_partitioned(tmp_path: Path) -> None:
+    from ldlite import LDLite
+
+    ld = LDLite()
+    ld.connect_db()
+    assert ld.database_experimental is not None
+    ld.database_experimental.ingest_records("s.prefix", iter(RECORDS))
+    ld.database_experimental.expand_prefix("s.prefix", 2, keep_raw=True)
+
+    # Every table has an id so every table is partitioned
+    assert ld.export_parquet_tables(str(tmp_path), "s.prefix", partition_by=["id"]) == [
+        "s.prefix__t",
+        "s.prefix__t__tags",
+    ]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "s.prefix__t",
+        "s.prefix__t__tags",
+    ]
+    with duckdb.connect() as duck:
+        assert duck.execute(
+            "SELECT tags FROM read_parquet("
+            f"'{tmp_path / 's.prefix__t__tags'}/**', hive_partitioning=true) "
+            "ORDER BY id",
+        ).fetchall() == [("x",), ("y",)]
+
+
+def test_export_parquet_tables_duckdb(tmp_path: Path) -> None:
+    from ldlite import LDLite
+
+    ld = LDLite()
+    ld.connect_db()
+    _export_tables(ld, tmp_path / "exports")
+
+
+def test_export_parquet_tables_postgres(
+    pg_dsn: None | Callable[[str], str],
+    duckdb_extension: str | None,
+    tmp_path: Path,
+) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite import LDLite
+
+    ld = LDLite()
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    with closing(ld.connect_db_postgresql(dsn, duckdb_extension=duckdb_extension)):
+        _export_tables(ld, tmp_path / "exports")
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest_cases import parametrize
+
+SRC = str(Path(__file__).parent.parent / "src")
+
+
+def _importtime(statement: str) -> dict[str, int]:
+    # -X importtime writes "import time: self [us] | cumulative | module" to stderr
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": SRC},
+    )
+    times: dict[str, int] = {}
+    for line in res.stderr.splitlines()[1:]:
+        (_, cumulative, module) = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@parametrize(
+    "statement,unexpected",
+    [
+        (
+            "import ldlite",
+            ["duckdb", "psycopg", "tqdm", "httpx_folio", "ldlite._jsonx"],
+        ),
+        (
+            "import ldlite._folio",
+            ["duckdb", "psycopg", "ldlite._jsonx"],
+        ),
+        (
+            "from ldlite.database._postgres import PostgresDatabase",
+            ["duckdb", "ldlite._jsonx"],
+        ),
+        (
+            "import ldlite._cli",
+            ["duckdb", "psycopg", "tqdm", "httpx_folio"],
+        ),
+    ],
+)
+def test_lazy_imports(statement: str, unexpected: list[str]) -> None:
+    times = _importtime(statement)
+
+    assert [m for m in unexpected if m in times] == []
+    # Times are in microseconds, a second leaves plenty of room for slow CI runners
+    assert times["ldlite"] < 1_000_000
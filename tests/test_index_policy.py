@@ -0,0 +1,216 @@
+import warnings
+from collections.abc import Callable
+from typing import cast
+from unittest import mock
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import duckdb
+import psycopg
+import pytest
+from pytest_cases import parametrize
+
+from .mock_response_case import patch_folio_paths
+
+
+@parametrize(
+    "policy_args,expected",
+    [
+        (
+            {},
+            [(("id",), None), (("other_id",), None), (("some_uuid",), None)],
+        ),
+        (
+            {"exclude": ("__id", "other_*")},
+            [(("id",), None), (("some_uuid",), None)],
+        ),
+        (
+            {"include": ("prefix__t__lines.lines__value",), "uuids": False},
+            [(("lines__value",), None)],
+        ),
+        (
+            {"uuid_method": "hash", "brin_id": True},
+            [
+                (("__id",), "brin"),
+                (("id",), None),
+                (("other_id",), None),
+                (("some_uuid",), "hash"),
+            ],
+        ),
+        (
+            {"composite_arrays": True, "include": ()},
+            [(("some_uuid",), None), (("id", "lines__o"), None)],
+        ),
+    ],
+)
+def test_indexes(
+    policy_args: dict[str, object],
+    expected: list[tuple[tuple[str, ...], str | None]],
+) -> None:
+    from ldlite import IndexPolicy
+
+    policy = IndexPolicy(**policy_args)  # type: ignore[arg-type]
+    indexes = policy.indexes(
+        "prefix__t__lines",
+        [
+            ("__id", "integer"),
+            ("id", "text"),
+            ("other_id", "text"),
+            ("some_uuid", "uuid"),
+            ("lines__o", "smallint"),
+            ("lines__value", "text"),
+        ],
+    )
+
+    assert [(i.columns, i.method) for i in indexes] == expected
+
+
+def test_skip_unused(pg_dsn: None | Callable[[str], str]) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite import IndexPolicy
+    from ldlite.database._postgres import PostgresDatabase
+
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    db = PostgresDatabase(dsn)
+    policy = IndexPolicy(skip_unused=2)
+
+    def load() -> list[str]:
+        db.ingest_records("prefix", iter([b'{"id": "a", "other_id": "b"}']))
+        db.expand_prefix("prefix", 1, keep_raw=False, skip_unused=policy.skip_unused)
+        db.index_prefix("prefix", policy=policy)
+
+        with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT a.attname FROM pg_index i "
+                "JOIN pg_attribute a ON a.attrelid = i.indrelid "
+                "AND a.attnum = ANY(i.indkey) "
+                "WHERE i.indrelid = 'public.prefix__t'::regclass "
+                "ORDER BY a.attname;",
+            )
+            return [c for (c,) in cur.fetchall()]
+
+    def scan_id() -> None:
+        with psycopg.connect(dsn, autocommit=True) as conn, conn.cursor() as cur:
+            cur.execute("SET enable_seqscan = off;")
+            cur.execute("SELECT pg_stat_force_next_flush();")
+            cur.execute("SELECT * FROM public.prefix__t WHERE id = 'a';")
+
+    def snapshots() -> int:
+        with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+            cur.execute(
+                'SELECT COUNT(*) FROM "ldlite_system"."index_usage_v1" '
+                "WHERE columns = '{other_id}';",
+            )
+            return cast("int", cur.fetchone()[0])  # type: ignore[index]
+
+    assert load() == ["id", "other_id"]
+    scan_id()
+    # other_id has only been unused for one load
+    assert load() == ["id", "other_id"]
+    scan_id()
+    assert load() == ["id"]
+    scan_id()
+    assert load() == ["id"]
+    scan_id()
+    # other_id is built again after being skipped for two loads
+    assert load() == ["id", "other_id"]
+    scan_id()
+    assert load() == ["id"]
+    # The oldest snapshot of other_id is gone,
+    # the last two are kept along with the three loads it was skipped
+    assert snapshots() == 5
+
+    db.drop_prefix("prefix")
+    assert load() == ["id", "other_id"]
+
+
+def test_skip_unused_untracked(pg_dsn: None | Callable[[str], str]) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite.database._postgres import PostgresDatabase
+
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    db = PostgresDatabase(dsn)
+    for _ in range(2):
+        db.ingest_records("prefix", iter([b'{"id": "a", "other_id": "b"}']))
+        db.expand_prefix("prefix", 1, keep_raw=False)
+        db.index_prefix("prefix")
+
+    with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute('SELECT COUNT(*) FROM "ldlite_system"."index_usage_v1";')
+        assert cur.fetchone() == (0,)
+
+
+def test_unsupported_methods() -> None:
+    from ldlite import IndexPolicy
+    from ldlite.database._duckdb import DuckDbDatabase
+
+    dsn = ":memory:" + str(uuid4()).split("-")[0]
+    db = DuckDbDatabase(duckdb.connect(dsn))
+    policy = IndexPolicy(brin_id=True)
+
+    def load() -> int:
+        db.prepare_history("prefix", "/patched", None)
+        db.ingest_records("prefix", iter([b'{"id": "a", "other_id": "b"}']))
+        db.expand_prefix("prefix", 1, keep_raw=False)
+        db.index_prefix("prefix", policy=policy)
+
+        with duckdb.connect(dsn) as conn:
+            created = conn.execute(
+                'SELECT "indexes_created" FROM "ldlite_system"."load_history_v2";',
+            ).fetchone()
+            return cast("int", created[0])  # type: ignore[index]
+
+    # DuckDB doesn't have BRIN indexes so only id and other_id are created
+    with pytest.warns(UserWarning, match="brin indexes aren't supported") as warned:
+        assert load() == 2
+    assert warned[0].filename == __file__
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert load() == 2
+
+
+@mock.patch("httpx_folio.auth.httpx.post")
+@mock.patch("httpx_folio.factories.httpx.Client.get")
+def test_unsupported_methods_query(
+    client_get_mock: MagicMock,
+    httpx_post_mock: MagicMock,
+) -> None:
+    from ldlite import IndexPolicy, LDLite
+
+    uut = LDLite()
+    uut.quiet(enable=True)
+    patch_folio_paths(client_get_mock, httpx_post_mock, {"/patched": 3})
+    uut.connect_folio("https://doesnt.matter", "", "", "")
+    uut.connect_db()
+
+    # The warning points at the call to query
+    with pytest.warns(UserWarning, match="brin indexes aren't supported") as warned:
+        uut.query(table="t", path="/patched", index_policy=IndexPolicy(brin_id=True))
+    assert [w.filename for w in warned if "brin" in str(w.message)] == [__file__]
+
+
+@parametrize(
+    "policy_args,expected",
+    [({}, 2), ({"include": (), "uuids": False}, 0)],
+)
+def test_duckdb_indexes(policy_args: dict[str, object], expected: int) -> None:
+    from ldlite import IndexPolicy
+    from ldlite.database._duckdb import DuckDbDatabase
+
+    conn = duckdb.connect(":memory:" + str(uuid4()).split("-")[0])
+    db = DuckDbDatabase(conn)
+    db.ingest_records("prefix", iter([b'{"id": "a", "other_id": "b"}']))
+    db.expand_prefix("prefix", 1, keep_raw=False)
+    # DuckDB tables are indexed by default even though they're sorted
+    db.index_prefix(
+        "prefix",
+        policy=IndexPolicy(**policy_args) if policy_args else None,  # type: ignore[arg-type]
+    )
+
+    assert conn.execute("SELECT COUNT(*) FROM duckdb_indexes()").fetchone() == (
+        expected,
+    )
@@ -0,0 +1,120 @@
+import json
+from collections.abc import Callable
+from contextlib import closing
+from typing import TYPE_CHECKING, cast
+from uuid import uuid4
+
+import duckdb
+import psycopg
+import pytest
+
+if TYPE_CHECKING:
+    from _typeshed import dbapi
+
+    from ldlite._sqlx import DBType
+    from ldlite.database import Database
+
+RECORDS = [
+    {
+        "id": "b096504a-3d54-4664-9bf5-1b872466fd66",
+        "title": "It's a \\ back\\slash,\n\ttab and 'quote' é\u2028",
+        "count": 2,
+        "ratio": 0.5,
+        "active": True,
+        "object": {"key": "value"},
+        "lines": [
+            {"line": "a'b", "codes": [1, 2]},
+            None,
+            {"line": "c\\d", "flag": False},
+        ],
+        "tags": ["x'y", "z"],
+    },
+    {
+        "id": "b5d8cdc4-9441-487c-90cf-0c7ec97728eb",
+        "count": 3,
+        "ratio": 1.25,
+        "active": False,
+        "lines": [],
+    },
+    *[
+        {"id": str(uuid4()), "count": i, "tags": [str(i)]}
+        # More rows than a single batch
+        for i in range(1100)
+    ],
+]
+
+
+def _transform(db: "Database", conn: "dbapi.DBAPIConnection", dbtype: "DBType") -> None:
+    from ldlite._jsonx import transform_json
+    from ldlite._sqlx import autocommit
+
+    db.prepare_history("prefix", "/patched", None)
+    db.ingest_records("prefix", (json.dumps(r).encode() for r in RECORDS))
+    autocommit(conn, dbtype, False)
+    (tables, _) = transform_json(conn, dbtype, "prefix", len(RECORDS), True, 2)
+    autocommit(conn, dbtype, True)
+    assert tables == [
+        "prefix__t",
+        "prefix__t__lines",
+        "prefix__t__tags",
+        "prefix__tcatalog",
+    ]
+
+    with closing(conn.cursor()) as cur:
+        cur.execute(
+            "SELECT __id, id::text, title, count, ratio, active, object__key "
+            "FROM prefix__t ORDER BY __id LIMIT 2",
+        )
+        rows = cast("list[tuple[object, ...]]", cur.fetchall())
+        assert [r[:4] for r in rows] == [
+            (1, RECORDS[0]["id"], RECORDS[0]["title"], 2),
+            (2, RECORDS[1]["id"], None, 3),
+        ]
+        assert [float(cast("float", r[4])) for r in rows] == [0.5, 1.25]
+        assert [r[5] for r in rows] == [True, False]
+        assert [r[6] for r in rows] == ["value", None]
+
+        cur.execute(
+            "SELECT __id, id::text, lines__o, lines__line, lines__flag "
+            "FROM prefix__t__lines ORDER BY __id",
+        )
+        assert cur.fetchall() == [
+            (1, RECORDS[0]["id"], 1, "a'b", None),
+            (2, RECORDS[0]["id"], 3, "c\\d", False),
+        ]
+
+        cur.execute("SELECT COUNT(*), MAX(__id) FROM prefix__t__tags")
+        assert cur.fetchone() == (1102, 1102)
+        cur.execute("SELECT tags FROM prefix__t__tags WHERE tags__o = 1 LIMIT 1")
+        assert cur.fetchone() == ("x'y",)
+
+        cur.execute("SELECT table_name FROM prefix__tcatalog ORDER BY 1")
+        assert cur.fetchall() == [(t,) for t in tables[:-1]]
+
+
+def test_duckdb() -> None:
+    from ldlite._sqlx import DBType
+    from ldlite.database._duckdb import DuckDbDatabase
+
+    conn = duckdb.connect()
+    _transform(
+        DuckDbDatabase(conn),
+        cast("dbapi.DBAPIConnection", conn),
+        DBType.DUCKDB,
+    )
+
+
+def test_postgres(pg_dsn: None | Callable[[str], str]) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite._sqlx import DBType
+    from ldlite.database._postgres import PostgresDatabase
+
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    with psycopg.connect(dsn) as conn:
+        _transform(
+            PostgresDatabase(dsn),
+            cast("dbapi.DBAPIConnection", conn),
+            DBType.POSTGRES,
+        )
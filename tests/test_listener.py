@@ -0,0 +1,105 @@
+from collections.abc import Callable
+from unittest import mock
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from pytest_cases import parametrize
+
+from .mock_response_case import patch_folio_paths
+
+
+@mock.patch("httpx_folio.auth.httpx.post")
+@mock.patch("httpx_folio.factories.httpx.Client.get")
+@parametrize("db", ["duckdb", "postgres"])
+def test_listener(
+    client_get_mock: MagicMock,
+    httpx_post_mock: MagicMock,
+    pg_dsn: None | Callable[[str], str],
+    db: str,
+) -> None:
+    from ldlite import IndexPolicy, LDLite, Listener
+
+    class Recorder(Listener):
+        def __init__(self) -> None:
+            self.events: list[tuple[object, ...]] = []
+
+        def phase_started(self, table: str, phase: str) -> None:
+            self.events.append(("started", table, phase))
+
+        def phase_progressed(
+            self,
+            table: str,
+            phase: str,
+            n: int,
+            total: float | None,
+        ) -> None:
+            self.events.append(("progressed", table, phase, n, total))
+
+        def phase_finished(self, table: str, phase: str, duration: float) -> None:
+            assert duration >= 0
+            self.events.append(("finished", table, phase))
+
+        def page_fetched(self, table: str, size: int, latency: float) -> None:
+            assert size > 0
+            assert latency >= 0
+            self.events.append(("page", table))
+
+        def records_ingested(self, table: str, n: int) -> None:
+            self.events.append(("ingested", table, n))
+
+        def create_statement_executed(
+            self,
+            table: str,
+            statement: str,
+            duration: float,
+        ) -> None:
+            assert duration >= 0
+            self.events.append(("statement", table, statement.split("(")[0].strip()))
+
+    uut = LDLite()
+    uut.quiet(enable=True)
+    patch_folio_paths(client_get_mock, httpx_post_mock, {"/patched": 3})
+    uut.connect_folio("https://doesnt.matter", "", "", "")
+    if db == "duckdb":
+        uut.connect_db()
+    else:
+        if pg_dsn is None:
+            pytest.skip("Specify the pg host using --pg-host to run")
+        uut.connect_db_postgresql(pg_dsn("db" + str(uuid4()).split("-")[0]), 2)
+
+    recorder = Recorder()
+    uut.add_listener(recorder)
+    uut.query(table="t", path="/patched", index_policy=IndexPolicy(uuids=False))
+
+    phases = [e[::2] for e in recorder.events if e[0] in ("started", "finished")]
+    assert phases == [
+        ("started", "download"),
+        ("finished", "download"),
+        ("started", "scan"),
+        ("finished", "scan"),
+        ("started", "transform"),
+        ("finished", "transform"),
+        ("started", "index"),
+        ("finished", "index"),
+    ]
+    # The records are counted, fetched, then an empty page ends the download
+    assert recorder.events.count(("page", "t")) == 3
+    assert ("ingested", "t", 3) in recorder.events
+    assert [
+        e[3:] for e in recorder.events if e[:3] == ("progressed", "t", "download")
+    ] == [
+        (1, 3),
+        (1, 3),
+        (1, 3),
+    ]
+    statements = [str(e[2]) for e in recorder.events if e[0] == "statement"]
+    assert [s for s in statements if s.startswith("CREATE TABLE")] != []
+    assert [s for s in statements if s.startswith("CREATE INDEX")] != []
+    # Only the statements creating tables and indexes are sent
+    assert all(s.startswith(("CREATE TABLE", "CREATE INDEX")) for s in statements)
+
+    uut.remove_listener(recorder)
+    recorder.events.clear()
+    uut.query(table="t", path="/patched")
+    assert recorder.events == []
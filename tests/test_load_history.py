@@ -154,6 +154,28 @@ def _assert(
             assert d[12] > timedelta(microseconds=0)
             assert d[12] < timedelta(seconds=1)
 
+            cur.execute(
+                'SELECT * FROM "ldlite_system"."load_history_v2" '
+                'WHERE "table_prefix" = $1',
+                (tn,),
+            )
+            assert (d2 := cur.fetchone()) is not None
+            assert d2[:13] == d
+
+            # the mocked records are counted, then fetched with a page and an empty page
+            assert d2[13] > 0
+            assert d2[14] == 3
+            assert timedelta(microseconds=0) < d2[15] <= d2[16]
+            assert d2[17] > 0
+
+            assert d2[18] > timedelta(microseconds=0)
+            assert d2[19] > timedelta(microseconds=0)
+            assert d2[18] + d2[19] <= d[11]
+            assert d2[20] == 1
+            assert d2[21] is not None
+
+            assert d2[22] > 0
+
 
 @mock.patch("httpx_folio.auth.httpx.post")
 @mock.patch("httpx_folio.factories.httpx.Client.get")
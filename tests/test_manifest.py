@@ -0,0 +1,226 @@
+from collections.abc import Callable
+from itertools import pairwise
+from pathlib import Path
+from threading import Event, Lock, get_ident
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+from unittest import mock
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_cases import parametrize
+
+from .mock_response_case import patch_folio_paths
+from .synthetic_folio import SyntheticFolio, SyntheticRecords, connect
+
+if TYPE_CHECKING:
+    from ldlite._listener import Phase
+
+
+def test_read_manifest_list() -> None:
+    from ldlite import ManifestEntry
+    from ldlite._manifest import read_manifest
+
+    assert read_manifest(
+        [
+            {"table": "g", "path": "/groups"},
+            {"table": "u", "path": "/users", "query": "active==true", "json_depth": 1},
+        ],
+    ) == [
+        ManifestEntry("g", "/groups"),
+        ManifestEntry("u", "/users", "active==true", 1),
+    ]
+
+
+@parametrize(
+    "name,contents",
+    [
+        (
+            "manifest.toml",
+            """
+[[tables]]
+table = "g"
+path = "/groups"
+
+[[tables]]
+table = "u"
+path = "/users"
+keep_raw = false
+""",
+        ),
+        (
+            "manifest.yaml",
+            """
+- table: g
+  path: /groups
+- table: u
+  path: /users
+  keep_raw: false
+""",
+        ),
+    ],
+)
+def test_read_manifest_file(tmp_path: Path, name: str, contents: str) -> None:
+    if name.endswith(".yaml"):
+        pytest.importorskip("yaml")
+
+    from ldlite import ManifestEntry
+    from ldlite._manifest import read_manifest
+
+    manifest = tmp_path / name
+    manifest.write_text(contents)
+
+    expected = [
+        ManifestEntry("g", "/groups"),
+        ManifestEntry("u", "/users", keep_raw=False),
+    ]
+    assert read_manifest(manifest) == expected
+    assert read_manifest(str(manifest)) == expected
+
+
+@parametrize(
+    "manifest,error",
+    [
+        ({"table": "g", "path": "/groups"}, TypeError),
+        (["g"], TypeError),
+        ([{"table": "g"}], ValueError),
+        ([{"table": "g", "path": "/groups", "limit": 1}], ValueError),
+        ([{"table": "g", "path": "/groups"}, {"table": "g", "path": "/g"}], ValueError),
+    ],
+)
+def test_read_manifest_invalid(manifest: object, error: type[Exception]) -> None:
+    from ldlite._manifest import read_manifest
+
+    with pytest.raises(error):
+        read_manifest(manifest)  # type: ignore[arg-type]
+
+
+def test_run_manifest_downloads_while_waiting() -> None:
+    from ldlite import LDLite
+
+    # Every table is downloaded while the first one is transformed
+    downloads: list[str] = []
+    downloaded = Event()
+    threads: dict[str, set[int]] = {"download": set(), "transform": set()}
+    lock = Lock()
+
+    def download(table: str, *_: object, **__: object) -> Callable[[], list[str]]:
+        with lock:
+            threads["download"].add(get_ident())
+            downloads.append(table)
+            if len(downloads) == 8:
+                downloaded.set()
+
+        def transform() -> list[str]:
+            with lock:
+                threads["transform"].add(get_ident())
+            if not downloaded.wait(5):
+                raise TimeoutError(table)
+            return [table]
+
+        return transform
+
+    uut = LDLite()
+    uut.quiet(enable=True)
+    uut._folio = MagicMock()  # noqa: SLF001
+    uut.connect_db()
+    with mock.patch.object(uut, "_download", side_effect=download):
+        results = uut.run_manifest(
+            [{"table": f"t{n}", "path": "/patched"} for n in range(8)],
+            folio_concurrency=2,
+            db_concurrency=1,
+        )
+
+    assert [r.tables for r in results] == [[f"t{n}"] for n in range(8)]
+    # The concurrency settings also limit the threads used
+    assert len(threads["download"]) <= 2
+    assert len(threads["transform"]) == 1
+
+
+@mock.patch("httpx_folio.auth.httpx.post")
+@mock.patch("httpx_folio.factories.httpx.Client.get")
+def test_run_manifest(client_get_mock: MagicMock, httpx_post_mock: MagicMock) -> None:
+    from ldlite import LDLite
+
+    records = {"/small": 1, "/large": 3, "/medium": 2}
+    patch_folio_paths(client_get_mock, httpx_post_mock, records)
+
+    uut = LDLite()
+    uut.quiet(enable=True)
+    uut.connect_folio("https://doesnt.matter", "", "", "")
+    db = uut.connect_db()
+
+    manifest: list[dict[str, Any]] = [
+        {"table": "small", "path": "/small"},
+        {"table": "large", "path": "/large", "json_depth": 0},
+        {"table": "failed", "path": "/fail"},
+        {"table": "medium", "path": "/medium", "keep_raw": False},
+    ]
+
+    results = uut.run_manifest(manifest, folio_concurrency=2, db_concurrency=2)
+    assert [r.entry.table for r in results] == ["small", "large", "failed", "medium"]
+    assert [r.tables for r in results] == [
+        ["small", "small__t"],
+        ["large"],
+        [],
+        ["medium__t"],
+    ]
+    assert isinstance(results[2].error, RuntimeError)
+    for table, rowcount in [("small", 1), ("large", 3), ("medium__t", 2)]:
+        db.execute(f"SELECT COUNT(*) FROM {table}")
+        assert db.fetchone() == (rowcount,)
+
+    # The previous load's rowcounts put the largest tables first
+    results = uut.run_manifest(manifest)
+    assert [r.entry.table for r in results] == ["large", "medium", "small", "failed"]
+    assert all(r.error is None for r in results if r.entry.table != "failed")
+
+
+def test_run_manifest_concurrent_duckdb() -> None:
+    from ldlite import LDLite, Listener
+
+    class Phases(Listener):
+        def __init__(self) -> None:
+            self.started: dict[tuple[str, Phase], float] = {}
+            self.finished: dict[tuple[str, Phase], float] = {}
+
+        def phase_started(self, table: str, phase: "Phase") -> None:
+            self.started[(table, phase)] = perf_counter()
+
+        def phase_finished(self, table: str, phase: "Phase", _: float) -> None:
+            self.finished[(table, phase)] = perf_counter()
+
+    datasets = {
+        "/users": SyntheticRecords("users", 30),
+        "/groups": SyntheticRecords("users", 30, seed=1),
+        "/inventory/instances": SyntheticRecords("instances", 30),
+        "/item-storage/items": SyntheticRecords("items", 30),
+    }
+    paths = list(datasets)
+    phases = Phases()
+    with SyntheticFolio(datasets, latency=0.05) as folio:
+        uut = LDLite()
+        uut.quiet(enable=True)
+        uut.page_size = 10
+        uut.add_listener(phases)
+        connect(uut, folio.params)
+        db = uut.connect_db()
+
+        results = uut.run_manifest(
+            [{"table": f"t{n}", "path": p} for n, p in enumerate(paths)],
+            folio_concurrency=2,
+            db_concurrency=2,
+        )
+
+    assert [r.error for r in results] == [None] * 4
+    for n in range(4):
+        db.execute(f"SELECT COUNT(*) FROM t{n}__t")
+        assert db.fetchone() == (30,)
+
+    # Some tables were downloading at the same time as another one
+    downloads = sorted(
+        (phases.started[(t, p)], phases.finished[(t, p)])
+        for (t, p) in phases.started
+        if p == "download"
+    )
+    assert any(s < f for ((_, f), (s, _)) in pairwise(downloads))
@@ -0,0 +1,111 @@
+from collections.abc import Callable
+from contextlib import closing
+from unittest import mock
+from uuid import uuid4
+
+import psycopg
+import pytest
+
+
+@pytest.fixture
+def dsn(pg_dsn: None | Callable[[str], str]) -> str:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    return pg_dsn("db" + str(uuid4()).split("-")[0])
+
+
+def test_reuse(dsn: str) -> None:
+    from ldlite.database._pool import ConnectionPool
+
+    pool = ConnectionPool(lambda: psycopg.connect(dsn), 1)
+    with closing(pool.getconn(autocommit=False)) as conn:
+        pid = conn.info.backend_pid
+        conn.execute("CREATE TEMPORARY TABLE scratch (id integer);")
+        conn.execute("SET work_mem = '1MB';")
+        # uncommitted work is rolled back when the connection is returned
+        conn.execute("CREATE TABLE uncommitted (id integer);")
+
+    with pool.getconn(autocommit=True) as conn:
+        assert conn.info.backend_pid == pid
+        assert conn.autocommit
+        assert conn.execute("SHOW work_mem;").fetchone() != ("1MB",)
+        assert conn.execute(
+            "SELECT COUNT(*) FROM pg_tables "
+            "WHERE tablename IN ('scratch', 'uncommitted');",
+        ).fetchone() == (0,)
+
+    pool.close()
+
+
+def test_max_idle(dsn: str) -> None:
+    from ldlite.database._pool import ConnectionPool
+
+    pool = ConnectionPool(lambda: psycopg.connect(dsn), 2)
+    conns = [pool.getconn(autocommit=True) for _ in range(3)]
+    pids = {c.info.backend_pid for c in conns}
+    for c in conns:
+        c.close()
+
+    conns = [pool.getconn(autocommit=True) for _ in range(3)]
+    assert len(pids & {c.info.backend_pid for c in conns}) == 2
+    for c in conns:
+        c.close()
+    pool.close()
+
+
+def test_broken_connections(dsn: str) -> None:
+    from ldlite.database._pool import ConnectionPool
+
+    pool = ConnectionPool(lambda: psycopg.connect(dsn), 1, check_after=0)
+    with pool.getconn(autocommit=True) as conn:
+        pid = conn.info.backend_pid
+
+    with psycopg.connect(dsn, autocommit=True) as admin:
+        admin.execute("SELECT pg_terminate_backend(%s);", (pid,))
+
+    with pool.getconn(autocommit=True) as conn:
+        assert conn.info.backend_pid != pid
+        assert conn.execute("SELECT 1;").fetchone() == (1,)
+
+    pool.close()
+
+
+def test_close(dsn: str) -> None:
+    from ldlite.database._pool import ConnectionPool
+
+    pool = ConnectionPool(lambda: psycopg.connect(dsn), 2)
+    (idle, checked_out) = (pool.getconn(autocommit=True) for _ in range(2))
+    idle.close()
+
+    pool.close()
+    assert idle.closed
+    assert not checked_out.closed
+    # connections returned after the pool is closed aren't kept
+    checked_out.close()
+    assert checked_out.closed
+
+
+def test_reconnect_closes_database(dsn: str) -> None:
+    from ldlite import LDLite
+
+    ld = LDLite()
+    with mock.patch("ldlite.database._postgres.PostgresDatabase.close") as close:
+        ld.connect_db_postgresql(dsn).close()
+        close.assert_not_called()
+        ld.connect_db_postgresql(dsn).close()
+        close.assert_called_once()
+
+
+def test_postgres_database_reuses_connections(dsn: str) -> None:
+    from ldlite.database._postgres import PostgresDatabase
+
+    with mock.patch("psycopg.connect", wraps=psycopg.connect) as connect:
+        db = PostgresDatabase(dsn)
+        for _ in range(2):
+            db.prepare_history("prefix", "/patched", None)
+            db.ingest_records("prefix", iter([b'{"id": "a", "value": "b"}']))
+            db.expand_prefix("prefix", 1, keep_raw=False)
+            db.index_prefix("prefix")
+
+    assert connect.call_count == 1
@@ -617,6 +617,41 @@ def case_indexing_id_like() -> QueryTC:
     )
 
 
+def case_index_policy() -> QueryTC:
+    from ldlite import IndexPolicy
+
+    return QueryTC(
+        Call(
+            "tests.prefix",
+            json_depth=4,
+            index_policy=IndexPolicy(
+                exclude=("__id", "*_by_user_id", "prefix__t__lines.id"),
+                composite_arrays=True,
+            ),
+            returns={
+                "purchaseOrders": [
+                    {
+                        "id": "b096504a-3d54-4664-9bf5-1b872466fd66",
+                        "createdByUserId": "b096504a-3d54-4664-9bf5-1b872466fd66",
+                        "lines": [{"value": "value"}],
+                    },
+                ],
+            },
+        ),
+        expected_tables=[
+            "prefix",
+            "prefix__t",
+            "prefix__t__lines",
+            "prefix__tcatalog",
+        ],
+        expected_values={},
+        expected_indexes=[
+            ("prefix__t", "(id)"),
+            ("prefix__t__lines", "(id, lines__o)"),
+        ],
+    )
+
+
 @parametrize(json_depth=range(1, 2))
 def case_drop_raw(json_depth: int) -> QueryTC:
     return QueryTC(
@@ -725,6 +760,7 @@ def _act(uut: "ldlite.LDLite", tc: QueryTC) -> None:
             path="/patched",
             json_depth=call.json_depth,
             keep_raw=call.keep_raw,
+            index_policy=call.index_policy,
         )
 
 
@@ -821,19 +857,29 @@ def test_duckdb(
 
 @mock.patch("httpx_folio.auth.httpx.post")
 @mock.patch("httpx_folio.factories.httpx.Client.get")
+@parametrize(concurrency=[1, 4])
 @parametrize_with_cases("tc", cases=".")
 def test_postgres(
     client_get_mock: MagicMock,
     httpx_post_mock: MagicMock,
     pg_dsn: None | Callable[[str], str],
     tc: QueryTC,
+    concurrency: int,
 ) -> None:
     if pg_dsn is None:
         pytest.skip("Specify the pg host using --pg-host to run")
 
     uut = _arrange(client_get_mock, httpx_post_mock, tc)
     dsn = pg_dsn(tc.db)
-    uut.connect_db_postgresql(dsn)
+    if concurrency > 1:
+        uut.connect_db_postgresql(
+            dsn,
+            concurrency=concurrency,
+            maintenance_work_mem="128MB",
+            max_parallel_maintenance_workers=0,
+        )
+    else:
+        uut.connect_db_postgresql(dsn)
 
     _act(uut, tc)
 
@@ -0,0 +1,43 @@
+from collections import Counter
+from collections.abc import Iterator
+from unittest import mock
+
+from .wide_schema import wide_tree
+
+
+def test_memoized_properties() -> None:
+    from ldlite.database._expansion.recursive_nodes import ArrayNode, ObjectNode
+
+    root = wide_tree(2, 2)
+    deepest = max(root.descendents(ObjectNode), key=lambda o: len(o.parents))
+    assert deepest.prefix == "array_prop2__array_prop1"
+    assert deepest.depth == 2
+
+    parents = deepest.parents
+    assert deepest.parents is parents
+
+    array = deepest.table_parent
+    assert isinstance(array, ArrayNode)
+    assert array.parent_table[0] == "prefix__t__array_prop2"
+
+
+def test_wide_schema() -> None:
+    from ldlite.database._expansion.recursive_nodes import ArrayNode, RecursiveNode
+
+    computed: Counter[int] = Counter()
+    parents = RecursiveNode._parents  # noqa: SLF001
+
+    def counted(self: RecursiveNode) -> Iterator[RecursiveNode]:
+        computed[id(self)] += 1
+        return parents(self)
+
+    with mock.patch.object(RecursiveNode, "_parents", counted):
+        root = wide_tree(1000, 4)
+        statements = [
+            root.create_statement[1].as_string(),
+            *[a.create_statement[1].as_string() for a in root.descendents(ArrayNode)],
+        ]
+
+    assert len(statements) == 16
+    # the parents of each node are only walked once however wide the schema is
+    assert set(computed.values()) == {1}
@@ -0,0 +1,113 @@
+import json
+from collections.abc import Callable
+from contextlib import closing
+from typing import TYPE_CHECKING, cast
+from uuid import uuid4
+
+import duckdb
+import psycopg
+import pytest
+from pytest_cases import parametrize
+
+if TYPE_CHECKING:
+    from _typeshed import dbapi
+
+    from ldlite.database import Database
+
+RECORDS = [
+    json.dumps(
+        {
+            "id": f"{i:08}-0000-0000-0000-000000000000",
+            "value": i,
+            "lines": [{"line": "a", "codes": [1, 2]}],
+        },
+    ).encode()
+    for i in range(5)
+]
+
+
+def _expand_twice(db: "Database") -> None:
+    # Each transform replaces the previous profile of the prefix
+    for _ in range(2):
+        db.prepare_history("prefix", "/patched", None)
+        db.ingest_records("prefix", iter(RECORDS))
+        db.expand_prefix("prefix", 3, keep_raw=True)
+
+
+def _profile(conn: "dbapi.DBAPIConnection") -> list[tuple[str, str, int | None, bool]]:
+    with closing(conn.cursor()) as cur:
+        cur.execute(
+            'SELECT "step", "node", "rowcount", "plan" IS NOT NULL '
+            'FROM "ldlite_system"."statement_profile_v1" '
+            'WHERE "table_prefix" = $1 ORDER BY "ordinal"',
+            ("prefix",),
+        )
+        return cast("list[tuple[str, str, int | None, bool]]", cur.fetchall())
+
+
+def _assert_steps(profile: list[tuple[str, str, int | None, bool]]) -> None:
+    assert profile[0][:2] == ("load_columns", "")
+    assert {(s, n) for (s, n, *_) in profile} >= {
+        ("make_temp", "lines"),
+        ("make_temp", "lines__codes"),
+        ("specify_type", "id"),
+        ("create_statement", "prefix__t"),
+        ("create_statement", "prefix__t__lines"),
+        ("create_statement", "prefix__t__lines__codes"),
+    }
+
+
+def test_duckdb() -> None:
+    from ldlite.database._duckdb import DuckDbDatabase
+
+    dsn = ":memory:" + str(uuid4()).split("-")[0]
+    db = DuckDbDatabase(duckdb.connect(dsn), profile_statements=True)
+    _expand_twice(db)
+
+    with duckdb.connect(dsn) as conn:
+        profile = _profile(cast("dbapi.DBAPIConnection", conn))
+        _assert_steps(profile)
+        # DuckDB doesn't report rowcounts and plans aren't captured
+        assert {(r, p) for (*_, r, p) in profile} == {(None, False)}
+
+        db.drop_prefix("prefix")
+        assert _profile(cast("dbapi.DBAPIConnection", conn)) == []
+
+
+@parametrize(concurrency=[1, 2])
+def test_postgres(pg_dsn: None | Callable[[str], str], concurrency: int) -> None:
+    if pg_dsn is None:
+        pytest.skip("Specify the pg host using --pg-host to run")
+
+    from ldlite.database._postgres import PostgresDatabase
+
+    dsn = pg_dsn("db" + str(uuid4()).split("-")[0])
+    db = PostgresDatabase(
+        dsn,
+        concurrency,
+        profile_statements=True,
+        explain_slowest=3,
+    )
+    _expand_twice(db)
+
+    with psycopg.connect(dsn, cursor_factory=psycopg.RawCursor) as conn:
+        profile = _profile(cast("dbapi.DBAPIConnection", conn))
+        _assert_steps(profile)
+        assert ("create_statement", "prefix__t__lines__codes", 10) in [
+            p[:3] for p in profile
+        ]
+        assert len([p for (*_, p) in profile if p]) == 3
+
+        db.drop_prefix("prefix")
+        assert _profile(cast("dbapi.DBAPIConnection", conn)) == []
+
+
+def test_disabled() -> None:
+    from ldlite.database._duckdb import DuckDbDatabase
+
+    dsn = ":memory:" + str(uuid4()).split("-")[0]
+    db = duckdb.connect(dsn)
+    _expand_twice(DuckDbDatabase(db))
+
+    with duckdb.connect(dsn) as conn:
+        assert _profile(cast("dbapi.DBAPIConnection", conn)) == []
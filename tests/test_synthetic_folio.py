@@ -0,0 +1,64 @@
+from contextlib import closing
+from typing import cast
+
+import pytest
+from pytest_cases import parametrize
+
+from .synthetic_folio import Kind, SyntheticFolio, SyntheticRecords, connect
+
+
+def test_records_are_seeded() -> None:
+    records = SyntheticRecords("items", 10, seed=1, nesting=2)
+    assert records.record(3) == SyntheticRecords("items", 10, seed=1).record(3) | {
+        "extensions": records.record(3)["extensions"],
+    }
+    assert records.record(3) != SyntheticRecords("items", 10, seed=2).record(3)
+    assert records.record(3)["extensions"][0]["extensions"] != []
+
+    ids = [records.id(i) for i in range(10)]
+    assert ids == sorted(ids)
+    assert records.after("00000000-0000-0000-0000-000000000000") == 0
+    assert records.after(ids[4]) == 5
+    assert len(list(records.records(8, 20))) == 2
+
+
+@parametrize(
+    "path,query,kind",
+    [
+        # paged by id
+        ("/inventory/instances", None, "instances"),
+        # paged by offset
+        ("/item-storage/items", "cql.allRecords=1 sortBy barcode", "items"),
+        # streamed
+        ("/source-storage/stream/records", None, "srs"),
+    ],
+)
+def test_download(path: str, query: str | None, kind: Kind) -> None:
+    from ldlite import LDLite
+
+    stats_path = path.replace("/stream", "")
+    with SyntheticFolio(
+        {stats_path: SyntheticRecords(kind, 25, array_size=2)},
+    ) as folio:
+        uut = LDLite()
+        uut.quiet(enable=True)
+        uut.page_size = 10
+        connect(uut, folio.params)
+        db = uut.connect_db()
+
+        uut.query(table="t", path=path, query=query, json_depth=1)
+
+        with closing(db.cursor()) as cur:
+            cur.execute("SELECT COUNT(DISTINCT id) FROM t__t;")
+            assert cast("tuple[int]", cur.fetchone())[0] == 25
+
+        # login, stats, then 3 pages and an empty page unless streamed
+        assert folio.requests == (3 if kind == "srs" else 6)
+
+
+@parametrize("url", ["http://folio.example.edu", "http://127.0.0.1:9130"])
+def test_connect_folio_requires_https(url: str) -> None:
+    from ldlite import LDLite
+
+    with pytest.raises(ValueError, match="https"):
+        LDLite().connect_folio(url, "", "", "")
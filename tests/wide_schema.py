@@ -0,0 +1,51 @@
+"""Trees of expansion nodes as wide and deep as needed, built without a database."""
+
+from typing import TYPE_CHECKING
+
+from psycopg import sql
+
+if TYPE_CHECKING:
+    from ldlite.database._expansion.recursive_nodes import ObjectNode, RootNode
+
+
+def _output_table(prefix: str | None) -> tuple[str, sql.Identifier]:
+    name = "prefix__t" + ("" if prefix is None else "__" + prefix)
+    return (name, sql.Identifier("tests", name))
+
+
+def _expand(o: "ObjectNode", width: int, depth: int) -> None:
+    # This mirrors what load_columns and make_temp do without a database
+    from ldlite.database._expansion.fixed_nodes import OrdinalNode, TypedNode
+    from ldlite.database._expansion.recursive_nodes import ArrayNode, ObjectNode
+
+    for i in range(width):
+        o._children.append(  # noqa: SLF001
+            TypedNode(
+                o.source,
+                f"typedProp{i}",
+                o.path,
+                o.prefix,
+                ("string", "string"),
+            ),
+        )
+    if depth == 0:
+        return
+
+    obj = ObjectNode(o.source, f"objectProp{depth}", o.column, o)
+    o._children.append(obj)  # noqa: SLF001
+    _expand(obj, width, depth - 1)
+
+    arr = ArrayNode(o.source, f"arrayProp{depth}", o.column, o)
+    o._children.append(arr)  # noqa: SLF001
+    arr._children.append(OrdinalNode(arr.temp, arr.path, arr.prefix))  # noqa: SLF001
+    elem = ObjectNode(arr.temp, None, sql.Identifier("array_jsonb"), arr)
+    arr._children.append(elem)  # noqa: SLF001
+    _expand(elem, width, depth - 1)
+
+
+def wide_tree(width: int, depth: int) -> "RootNode":
+    from ldlite.database._expansion.recursive_nodes import RootNode
+
+    root = RootNode(sql.Identifier("tests", "prefix"), _output_table)
+    _expand(root, width, depth)
+    return root